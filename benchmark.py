@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for TikTok Content Generator
+Measures throughput, latency and peak memory of every generator entry point
+and compares the results against a saved JSON baseline
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+from tiktok_content import TikTokContentGenerator, _import_numpy
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Timings are machine-specific, so no baseline is committed; --save-baseline
+# writes one next to this file
+DEFAULT_BASELINE = os.path.join(HERE, "benchmark_baseline.json")
+
+# Fractional slowdown (or memory growth) tolerated before --check fails
+DEFAULT_THRESHOLD = 0.3
+
+# Absolute slack on top of the threshold, so timer jitter on microsecond
+# latencies and allocator noise on tiny peaks never count as regressions
+LATENCY_SLACK_US = 5.0
+MEMORY_SLACK_KIB = 64.0
+
+START_DATE = datetime(2024, 1, 1)
+
+STARTUP_TYPES = ("ideas", "post", "caption", "hashtags", "concept", "calendar")
+
+# The single-file script the project started from: `--startup --check` fails
+# when running content_generator.py as a script is slower than running it
+STARTUP_BASELINE_REVISION = "56208ad"
+
+
+def _case_calls(name: str, scale: int, generator: TikTokContentGenerator) -> Tuple[int, Callable[[], Any]]:
+    """Return (number of operations, zero-argument call) for one benchmark case
+
+    For single-item methods the scale is the number of calls; for the
+    calendar and batches it is the size of each call.
+    """
+    if name == "generate_hook":
+        return scale, generator.generate_hook
+    if name == "generate_caption":
+        return scale, generator.generate_caption
+    if name == "generate_hashtags":
+        return scale, generator.generate_hashtags
+    if name == "generate_video_concept":
+        return scale, generator.generate_video_concept
+    if name == "generate_post":
+        return scale, generator.generate_post
+    if name == "generate_content_calendar":
+        return max(3, 3650 // scale), lambda: generator.generate_content_calendar(scale, START_DATE)
+    if name.startswith("generate_batch"):
+        backend = name[len("generate_batch["):-1]
+        return 5, lambda: sum(1 for _ in generator.generate_batch("post", scale, backend=backend))
+    raise ValueError(f"Unknown benchmark case {name!r}")
+
+
+def benchmark_cases() -> List[Tuple[str, int]]:
+    """Return every (entry point, scale) pair the suite measures"""
+    cases = []
+    for name in ("generate_hook", "generate_caption", "generate_hashtags", "generate_video_concept", "generate_post"):
+        cases.extend((name, scale) for scale in (1000, 10000))
+    cases.extend(("generate_content_calendar", days) for days in (7, 30, 365))
+    backends = ["python"] + (["numpy"] if _import_numpy() else [])
+    cases.extend((f"generate_batch[{backend}]", n) for backend in backends for n in (1000, 10000))
+    return cases
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_case(name: str, scale: int, repeat: int) -> Dict[str, float]:
+    """Measure one case
+
+    Throughput and latency come from the fastest of `repeat` timed runs;
+    peak memory comes from one extra run under tracemalloc, which is kept
+    separate because tracing slows every allocation down.
+    """
+    best = None
+    for run in range(repeat):
+        ops, call = _case_calls(name, scale, TikTokContentGenerator(seed=run))
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(ops):
+            call_start = time.perf_counter()
+            call()
+            latencies.append(time.perf_counter() - call_start)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best[0]:
+            best = (elapsed, ops, latencies)
+
+    elapsed, ops, latencies = best
+    ops, call = _case_calls(name, scale, TikTokContentGenerator(seed=0))
+    tracemalloc.start()
+    for _ in range(ops):
+        call()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "ops": ops,
+        "ops_per_sec": ops / elapsed,
+        "p50_us": _percentile(latencies, 0.50) * 1e6,
+        "p99_us": _percentile(latencies, 0.99) * 1e6,
+        "peak_kib": peak / 1024
+    }
+
+
+def run_suite(repeat: int, only: str = None) -> Dict[str, Dict[str, float]]:
+    """Run every case (optionally only those whose name contains `only`)"""
+    results = {}
+    for name, scale in benchmark_cases():
+        if only and only not in name:
+            continue
+        results[f"{name}@{scale}"] = run_case(name, scale, repeat)
+    return results
+
+
+def _startup_env() -> Dict[str, str]:
+    """Environment for child interpreters, with bytecode and catalog caches enabled"""
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def _result(samples: List[float]) -> Dict[str, float]:
+    samples = sorted(samples)
+    return {
+        "ops": len(samples),
+        "ops_per_sec": len(samples) / sum(samples),
+        "p50_us": _percentile(samples, 0.50) * 1e6,
+        "p99_us": _percentile(samples, 0.99) * 1e6,
+        "peak_kib": 0.0
+    }
+
+
+def import_times() -> List[Tuple[str, int, int]]:
+    """Return (module, self us, cumulative us) for every module content_generator imports"""
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import content_generator"],
+        cwd=HERE, env=_startup_env(), capture_output=True, text=True, check=True
+    ).stderr
+    times = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        times.append((name.strip(), int(own), int(cumulative)))
+    return times
+
+
+def _time_command(command: List[str], cwd: str = HERE) -> float:
+    """Return the wall time of one run of command, in seconds"""
+    start = time.perf_counter()
+    subprocess.run(command, cwd=cwd, env=_startup_env(), stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+def run_startup(repeat: int, only: str = None) -> Dict[str, Dict[str, float]]:
+    """Measure import time and the wall time of one CLI call per --type
+
+    Each command runs once to warm the bytecode and catalog caches, then
+    `repeat` timed times. Calls are measured both as a script (which Python
+    recompiles every time) and with -m (which uses the cached bytecode).
+    """
+    results = {}
+    if not only or "import" in only:
+        import_times()
+        samples = []
+        for _ in range(repeat):
+            cumulative = dict((name, total) for name, _, total in import_times())
+            samples.append(cumulative["content_generator"] / 1e6)
+        results["import[content_generator]"] = _result(samples)
+
+    for style, entry in (("script", ["content_generator.py"]), ("module", ["-m", "content_generator"])):
+        for kind in STARTUP_TYPES:
+            name = f"startup[{style}:{kind}]"
+            if only and only not in name:
+                continue
+            command = [sys.executable, *entry, "--type", kind, "--seed", "1", "--count", "1", "--days", "1"]
+            samples = [_time_command(command) for _ in range(repeat + 1)]
+            results[name] = _result(samples[1:])
+    return results
+
+
+def baseline_script(revision: str, directory: str) -> str:
+    """Write content_generator.py as of a git revision into directory and return its path"""
+    source = subprocess.run(
+        ["git", "show", f"{revision}:content_generator.py"],
+        cwd=HERE, capture_output=True, check=True
+    ).stdout
+    path = os.path.join(directory, "content_generator.py")
+    with open(path, "wb") as f:
+        f.write(source)
+    return path
+
+
+def run_startup_baseline(repeat: int, revision: str) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """Time `content_generator.py --type hashtags` as a script, now and at revision
+
+    Returns (current, baseline). Runs alternate between the two trees, so
+    load on the machine slows both alike.
+    """
+    import tempfile
+
+    arguments = ["--type", "hashtags", "--count", "1"]
+    with tempfile.TemporaryDirectory() as directory:
+        old = baseline_script(revision, directory)
+        _time_command([sys.executable, old, *arguments], directory)
+        _time_command([sys.executable, "content_generator.py", *arguments])
+        current = []
+        baseline = []
+        for _ in range(repeat):
+            baseline.append(_time_command([sys.executable, old, *arguments], directory))
+            current.append(_time_command([sys.executable, "content_generator.py", *arguments]))
+    return _result(current), _result(baseline)
+
+
+def format_import_table(times: List[Tuple[str, int, int]], limit: int = 10) -> str:
+    """Render the slowest imports by self time"""
+    header = f"{'module':<38} {'self ms':>10} {'cumulative ms':>14}"
+    lines = [header, "-" * len(header)]
+    for name, own, cumulative in sorted(times, key=lambda t: t[1], reverse=True)[:limit]:
+        lines.append(f"{name:<38} {own / 1e3:>10.1f} {cumulative / 1e3:>14.1f}")
+    return "\n".join(lines)
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """Return a message for every metric that regressed beyond threshold"""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if result["ops_per_sec"] < base["ops_per_sec"] * (1 - threshold):
+            regressions.append(
+                f"{key}: {result['ops_per_sec']:,.0f} ops/sec vs baseline {base['ops_per_sec']:,.0f}"
+            )
+        if result["p99_us"] > base["p99_us"] * (1 + threshold) + LATENCY_SLACK_US:
+            regressions.append(
+                f"{key}: p99 {result['p99_us']:,.1f}us vs baseline {base['p99_us']:,.1f}us"
+            )
+        if result["peak_kib"] > base["peak_kib"] * (1 + threshold) + MEMORY_SLACK_KIB:
+            regressions.append(
+                f"{key}: peak {result['peak_kib']:,.0f} KiB vs baseline {base['peak_kib']:,.0f} KiB"
+            )
+    return regressions
+
+
+def format_table(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]] = None) -> str:
+    """Render results as a text table, with the ops/sec change against a baseline"""
+    header = f"{'case':<38} {'ops/sec':>12} {'p50 us':>10} {'p99 us':>10} {'peak KiB':>10}"
+    if baseline:
+        header += f" {'vs base':>8}"
+    lines = [header, "-" * len(header)]
+    for key, result in results.items():
+        line = (
+            f"{key:<38} {result['ops_per_sec']:>12,.0f} {result['p50_us']:>10,.1f} "
+            f"{result['p99_us']:>10,.1f} {result['peak_kib']:>10,.1f}"
+        )
+        if baseline and key in baseline:
+            change = result["ops_per_sec"] / baseline[key]["ops_per_sec"] - 1
+            line += f" {change:>+8.0%}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark TikTok Content Generator"
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Timed runs per case; the fastest is reported"
+    )
+    parser.add_argument(
+        "--only",
+        type=str,
+        help="Only run cases whose name contains this text (e.g. generate_post)"
+    )
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        default=DEFAULT_BASELINE,
+        help="Baseline JSON file to compare against or save to (default: benchmark_baseline.json next to this script)"
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store these results as the new baseline"
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit with status 1 if any case regressed beyond --threshold"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Tolerated fractional regression for --check (default 0.3 = 30%%)"
+    )
+    parser.add_argument(
+        "--startup",
+        action="store_true",
+        help="Measure import time and CLI start-up per --type instead of generator throughput"
+    )
+    parser.add_argument(
+        "--baseline-revision",
+        type=str,
+        default=STARTUP_BASELINE_REVISION,
+        help="Git revision whose script start-up --startup --check must match or beat"
+    )
+    parser.add_argument(
+        "--json",
+        type=str,
+        help="Also write the results to this JSON file"
+    )
+    args = parser.parse_args()
+
+    if args.check and not args.startup and not os.path.exists(args.baseline):
+        parser.error(f"--check needs a baseline, but {args.baseline} does not exist; run with --save-baseline first")
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    startup_baseline = None
+    if args.startup:
+        results = run_startup(max(args.repeat, 10), args.only)
+        if args.check:
+            try:
+                current, startup_baseline = run_startup_baseline(max(args.repeat, 20), args.baseline_revision)
+            except (OSError, subprocess.CalledProcessError) as e:
+                print(f"❌ Cannot run content_generator.py as of {args.baseline_revision} (needs a git checkout): {e}")
+                sys.exit(1)
+            results["startup[script:hashtags]"] = current
+            results[f"startup[{args.baseline_revision}:hashtags]"] = startup_baseline
+        print(format_import_table(import_times()))
+        print()
+    else:
+        results = run_suite(args.repeat, args.only)
+    print(format_table(results, baseline))
+
+    report = {
+        "python": sys.version.split()[0],
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "results": results
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        if baseline:
+            report["results"] = {**baseline, **results}
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Baseline saved to {args.baseline}")
+
+    if args.check:
+        if not baseline and startup_baseline is None:
+            print(f"\n⚠️  No baseline at {args.baseline}; run with --save-baseline first")
+            sys.exit(1)
+        regressions = compare(results, baseline, args.threshold)
+        if startup_baseline is not None and results["startup[script:hashtags]"]["p50_us"] > startup_baseline["p50_us"]:
+            regressions.append(
+                f"script start-up: {results['startup[script:hashtags]']['p50_us'] / 1e3:.1f}ms vs "
+                f"{startup_baseline['p50_us'] / 1e3:.1f}ms at {args.baseline_revision}"
+            )
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for message in regressions:
+                print(f"  • {message}")
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
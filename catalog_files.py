@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Catalog files for TikTok Content Generator
+Loads content catalogs from JSON files or directories, caches each parse by
+file mtime and content hash, and reloads changed files in a running process
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from typing import Any, Dict, Iterable, List, Tuple
+
+from tiktok_content import (
+    ContentCatalog,
+    HashtagGroup,
+    VideoConcept,
+    compile_caption_templates,
+    default_catalog,
+    duration_bucket
+)
+
+
+SECTIONS = ("hooks", "video_concepts", "topics", "trending_angles", "hashtag_groups", "caption_templates")
+STRING_SECTIONS = ("hooks", "topics", "trending_angles", "caption_templates")
+
+# path -> (mtime_ns, size, content digest, parsed sections or the ValueError
+# the content raised, so a broken file is not reparsed until it changes)
+_parse_cache = {}
+
+
+def _strings(value: Any, where: str) -> Tuple[str, ...]:
+    if not isinstance(value, list) or not all(isinstance(item, str) and item for item in value):
+        raise ValueError(f"{where} must be a list of non-empty strings")
+    return tuple(value)
+
+
+def _video_concept(value: Any, where: str) -> VideoConcept:
+    if not isinstance(value, dict):
+        raise ValueError(f"{where} must be an object")
+    missing = [key for key in ("title", "description", "shots", "duration", "difficulty") if key not in value]
+    if missing:
+        raise ValueError(f"{where} is missing {', '.join(missing)}")
+    unknown = set(value) - {"title", "description", "shots", "duration", "difficulty", "topics"}
+    if unknown:
+        raise ValueError(f"{where} has unknown keys {', '.join(sorted(unknown))}")
+    for key in ("title", "description", "duration", "difficulty"):
+        if not isinstance(value[key], str) or not value[key]:
+            raise ValueError(f"{where}.{key} must be a non-empty string")
+    duration_bucket(value["duration"])
+    return VideoConcept(
+        title=value["title"],
+        description=value["description"],
+        shots=_strings(value["shots"], f"{where}.shots"),
+        duration=value["duration"],
+        difficulty=value["difficulty"],
+        topics=_strings(value.get("topics", []), f"{where}.topics")
+    )
+
+
+def _weight(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0
+
+
+def _hashtag_group(value: Any, where: str) -> HashtagGroup:
+    if not isinstance(value, dict) or not {"name", "tags", "quota"} <= set(value) <= {"name", "tags", "quota", "weights", "weight"}:
+        raise ValueError(f"{where} must be an object with name, tags and quota, and optionally weights and weight")
+    if not isinstance(value["quota"], int) or isinstance(value["quota"], bool) or value["quota"] < 0:
+        raise ValueError(f"{where}.quota must be a non-negative integer")
+    tags = _strings(value["tags"], f"{where}.tags")
+    weights = value.get("weights", [])
+    if not isinstance(weights, list) or not all(map(_weight, weights)) or len(weights) not in (0, len(tags)):
+        raise ValueError(f"{where}.weights must be a list of non-negative numbers, one per tag")
+    if not _weight(value.get("weight", 1.0)):
+        raise ValueError(f"{where}.weight must be a non-negative number")
+    return HashtagGroup(str(value["name"]), tags, value["quota"], tuple(weights), value.get("weight", 1.0))
+
+
+def hashtag_group_to_dict(group: HashtagGroup) -> Dict[str, Any]:
+    """Return a hashtag group in the JSON catalog file format, leaving out default weights"""
+    data = {"name": group.name, "tags": list(group.tags), "quota": group.quota}
+    if group.weights:
+        data["weights"] = list(group.weights)
+    if group.weight != 1.0:
+        data["weight"] = group.weight
+    return data
+
+
+def parse_catalog_data(data: Any, source: str = "catalog") -> Dict[str, Tuple[Any, ...]]:
+    """Validate decoded catalog JSON and return its sections as catalog tuples"""
+    if not isinstance(data, dict):
+        raise ValueError(f"{source}: a catalog file must hold a JSON object")
+    unknown = set(data) - set(SECTIONS)
+    if unknown:
+        raise ValueError(f"{source}: unknown sections {', '.join(sorted(unknown))}, expected {', '.join(SECTIONS)}")
+
+    sections = {}
+    for name, value in data.items():
+        where = f"{source}: {name}"
+        if name in STRING_SECTIONS:
+            sections[name] = _strings(value, where)
+        elif not isinstance(value, list):
+            raise ValueError(f"{where} must be a list")
+        elif name == "video_concepts":
+            sections[name] = tuple(_video_concept(item, f"{where}[{i}]") for i, item in enumerate(value))
+        else:
+            sections[name] = tuple(_hashtag_group(item, f"{where}[{i}]") for i, item in enumerate(value))
+    if "caption_templates" in sections:
+        try:
+            sections["caption_templates"] = compile_caption_templates(sections["caption_templates"])
+        except ValueError as e:
+            raise ValueError(f"{source}: {e}") from None
+    return sections
+
+
+def parse_catalog_file(path: str) -> Dict[str, Tuple[Any, ...]]:
+    """Return the sections of one JSON catalog file
+
+    The parse is cached: an unchanged mtime and size skip reading the file,
+    and an unchanged content hash skips parsing it. Unchanged files return
+    the very same sections object, so callers can compare by identity.
+    """
+    stat = os.stat(path)
+    cached = _parse_cache.get(path)
+    if cached is None or cached[:2] != (stat.st_mtime_ns, stat.st_size):
+        with open(path, "rb") as f:
+            content = f.read()
+        digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+        if cached is not None and cached[2] == digest:
+            sections = cached[3]
+        else:
+            try:
+                sections = parse_catalog_data(json.loads(content), path)
+            except json.JSONDecodeError as e:
+                sections = ValueError(f"{path}: invalid JSON: {e}")
+            except ValueError as e:
+                sections = e
+        cached = _parse_cache[path] = (stat.st_mtime_ns, stat.st_size, digest, sections)
+
+    if isinstance(cached[3], ValueError):
+        raise ValueError(str(cached[3]))
+    return cached[3]
+
+
+def catalog_paths(path: str) -> List[str]:
+    """Return the catalog files at path: the file itself, or a directory's *.json files by name"""
+    if not os.path.isdir(path):
+        return [path]
+    paths = sorted(
+        os.path.join(path, name)
+        for name in os.listdir(path)
+        if name.endswith(".json") and not name.startswith(".")
+    )
+    if not paths:
+        raise ValueError(f"No .json catalog files in {path}")
+    return paths
+
+
+def build_catalog(parsed: Iterable[Dict[str, Tuple[Any, ...]]], base: ContentCatalog = None) -> ContentCatalog:
+    """Combine parsed sections into one catalog
+
+    Sections found in several files are concatenated in file order; sections
+    no file defines are taken from base (default: the built-in catalog).
+    """
+    base = base if base is not None else default_catalog()
+    merged = {}
+    for sections in parsed:
+        for name, items in sections.items():
+            merged[name] = merged.get(name, ()) + items
+    empty = [name for name, items in merged.items() if not items]
+    if empty:
+        raise ValueError(f"Catalog sections must not be empty: {', '.join(empty)}")
+    return base.replace(**merged) if merged else base
+
+
+class CatalogSource:
+    """A catalog backed by a JSON file or a directory of JSON files
+
+    load() reads every file. reload() re-reads only files whose mtime or
+    size changed, reparses only those whose content changed, and returns
+    the new catalog (or None when nothing changed). Swap it into a running
+    generator with `generator.catalog = catalog`; the assignment is atomic,
+    so the generator switches catalogs between one draw and the next.
+    """
+
+    def __init__(self, path: str, base: ContentCatalog = None):
+        self.path = path
+        self.base = base if base is not None else default_catalog()
+        self.catalog = None
+        self._parsed = ()
+
+    def _read(self) -> Tuple[Tuple[str, Dict[str, Tuple[Any, ...]]], ...]:
+        return tuple((path, parse_catalog_file(path)) for path in catalog_paths(self.path))
+
+    def load(self) -> ContentCatalog:
+        """Read every file and return the catalog"""
+        self._parsed = self._read()
+        self.catalog = build_catalog((sections for _, sections in self._parsed), self.base)
+        return self.catalog
+
+    def reload(self) -> Any:
+        """Return the new catalog if any file changed since the last load, else None
+
+        Raises ValueError or OSError, leaving the current catalog in place,
+        when a changed file is invalid or unreadable.
+        """
+        if self.catalog is None:
+            return self.load()
+        parsed = self._read()
+        unchanged = len(parsed) == len(self._parsed) and all(
+            path == old_path and sections is old_sections
+            for (path, sections), (old_path, old_sections) in zip(parsed, self._parsed)
+        )
+        if unchanged:
+            return None
+
+        catalog = build_catalog((sections for _, sections in parsed), self.base)
+        self._parsed = parsed
+        if catalog.version == self.catalog.version:
+            return None
+        self.catalog = catalog
+        return catalog
+
+
+def catalog_to_dict(catalog: ContentCatalog) -> Dict[str, Any]:
+    """Return a catalog in the JSON catalog file format"""
+    return {
+        "hooks": list(catalog.hooks),
+        "topics": list(catalog.topics),
+        "trending_angles": list(catalog.trending_angles),
+        "caption_templates": [template.source for template in catalog.caption_templates],
+        "video_concepts": [
+            {**concept.to_dict(), "topics": list(concept.topics)}
+            for concept in catalog.video_concepts
+        ],
+        "hashtag_groups": [hashtag_group_to_dict(group) for group in catalog.hashtag_groups]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check a catalog file or directory, or export the built-in catalog"
+    )
+    parser.add_argument(
+        "path",
+        help="Catalog JSON file or directory"
+    )
+    parser.add_argument(
+        "--export",
+        action="store_true",
+        help="Write the built-in catalog to path as JSON instead of checking it"
+    )
+    args = parser.parse_args()
+
+    if args.export:
+        with open(args.path, "w") as f:
+            json.dump(catalog_to_dict(default_catalog()), f, indent=2, ensure_ascii=False)
+        print(f"✅ Built-in catalog exported to {args.path}")
+        return
+
+    try:
+        catalog = CatalogSource(args.path).load()
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"✅ Catalog {catalog.version}: {len(catalog.hooks)} hooks, {len(catalog.topics)} topics, "
+          f"{len(catalog.video_concepts)} concepts, {len(catalog.all_hashtags)} hashtags, "
+          f"{len(catalog.caption_templates)} caption templates")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Content space for TikTok Content Generator
+A lazy view of every topic × hook × caption template × concept × angle
+combination with O(1) rank/unrank, so the space can be walked exhaustively,
+strided, shuffled or split across workers without building it in memory
+"""
+
+import argparse
+import itertools
+import json
+import random
+import sys
+from collections.abc import Sequence
+from typing import Any, Iterator, Tuple
+
+from tiktok_content import ContentCatalog, Post, TikTokContentGenerator, default_catalog, shard_bounds
+
+
+# Components in Post field order; the last one varies fastest, as in itertools.product
+SPACE_COMPONENTS = ("topic", "hook", "template", "concept", "angle")
+
+
+def _component_sizes(catalog: ContentCatalog) -> Tuple[int, ...]:
+    return (
+        len(catalog.topics),
+        len(catalog.hooks),
+        len(catalog.caption_templates),
+        len(catalog.video_concepts),
+        len(catalog.trending_angles)
+    )
+
+
+class Shuffle(Sequence):
+    """A seeded permutation of range(n), computed position by position with no table
+
+    A four-round Feistel network permutes the smallest even power of two
+    that holds n, and values past n are fed through again (cycle walking),
+    so each lookup takes a few integer operations on average.
+    """
+
+    def __init__(self, n: int, seed: Any = None):
+        self.n = n
+        bits = max(2, (n - 1).bit_length())
+        bits += bits % 2
+        self._half = bits // 2
+        self._mask = (1 << self._half) - 1
+        rng = random.Random(seed)
+        self._keys = tuple(rng.getrandbits(61) for _ in range(4))
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _permute(self, value: int) -> int:
+        half, mask = self._half, self._mask
+        left, right = value >> half, value & mask
+        for key in self._keys:
+            # Tuples of ints hash the same in every process
+            left, right = right, left ^ (hash((key, right)) & mask)
+        return (left << half) | right
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return RankView(self, range(self.n)[index])
+        if index < 0:
+            index += self.n
+        if not 0 <= index < self.n:
+            raise IndexError(f"Shuffle index {index} out of range for {self.n} items")
+        value = self._permute(index)
+        while value >= self.n:
+            value = self._permute(value)
+        return value
+
+
+class RankView(Sequence):
+    """base[positions[i]] for every i, sliced and reordered without copying"""
+
+    def __init__(self, base: Sequence, positions: Sequence):
+        self.base = base
+        self.positions = positions
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return RankView(self.base, self.positions[index])
+        return self.base[self.positions[index]]
+
+
+class ContentSpace(Sequence):
+    """Every combination of catalog positions, as a lazy sequence
+
+    space[n] is combination #n, a (topic, hook, template, concept, angle)
+    tuple of catalog positions, worked out from n with a few divmods.
+    rank() is the inverse. Slices, every(), partition() and shuffled() return
+    spaces over a subset or reordering of the same ranks, so none of them
+    builds anything in memory; iterating the whole space walks
+    itertools.product. The space is the full product: concepts meant for
+    particular topics are paired with every topic.
+    """
+
+    def __init__(self, catalog: ContentCatalog = None, ranks: Sequence = None):
+        self.catalog = catalog if catalog is not None else default_catalog()
+        self.sizes = _component_sizes(self.catalog)
+        self.total = 1
+        for size in self.sizes:
+            self.total *= size
+        self.ranks = ranks if ranks is not None else range(self.total)
+
+    def _with_ranks(self, ranks: Sequence) -> "ContentSpace":
+        return ContentSpace(self.catalog, ranks)
+
+    def __len__(self) -> int:
+        return len(self.ranks)
+
+    def unrank(self, rank: int) -> Tuple[int, ...]:
+        """Return combination #rank of the full space"""
+        if not 0 <= rank < self.total:
+            raise IndexError(f"Rank {rank} out of range for a space of {self.total} combinations")
+        positions = [0] * len(self.sizes)
+        for i in range(len(self.sizes) - 1, -1, -1):
+            rank, positions[i] = divmod(rank, self.sizes[i])
+        return tuple(positions)
+
+    def rank(self, combination: Tuple[int, ...]) -> int:
+        """Return the rank of a (topic, hook, template, concept, angle) combination in the full space"""
+        if len(combination) != len(self.sizes):
+            raise ValueError(f"A combination has {len(self.sizes)} positions ({', '.join(SPACE_COMPONENTS)})")
+        rank = 0
+        for name, size, position in zip(SPACE_COMPONENTS, self.sizes, combination):
+            if not 0 <= position < size:
+                raise ValueError(f"{name} position {position} out of range for {size} items")
+            rank = rank * size + position
+        return rank
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return self._with_ranks(self.ranks[index])
+        return self.unrank(self.ranks[index])
+
+    def __iter__(self) -> Iterator[Tuple[int, ...]]:
+        ranks = self.ranks
+        if isinstance(ranks, range) and ranks.step == 1 and ranks.start == 0:
+            return itertools.islice(itertools.product(*map(range, self.sizes)), ranks.stop)
+        return map(self.unrank, ranks)
+
+    def __contains__(self, combination: Any) -> bool:
+        try:
+            rank = self.rank(combination)
+        except (TypeError, ValueError):
+            return False
+        if isinstance(self.ranks, range):
+            return rank in self.ranks
+        return any(rank == candidate for candidate in self.ranks)
+
+    def index(self, combination: Any, start: int = 0, stop: int = None) -> int:
+        """Return where a combination sits in this space"""
+        if isinstance(self.ranks, range):
+            return self.ranks.index(self.rank(combination))
+        return super().index(combination, start, stop if stop is not None else len(self))
+
+    def every(self, step: int, offset: int = 0) -> "ContentSpace":
+        """Return every step-th combination, starting at offset"""
+        if step < 1:
+            raise ValueError(f"step must be at least 1, got {step}")
+        return self[offset::step]
+
+    def partition(self, index: int, total: int) -> "ContentSpace":
+        """Return part `index` of `total` disjoint, contiguous parts that together cover this space"""
+        start, stop = shard_bounds(len(self), index, total)
+        return self[start:stop]
+
+    def shuffled(self, seed: Any = None) -> "ContentSpace":
+        """Return this space in a seeded pseudo-random order that visits every combination once
+
+        Taking combination #t of the shuffled space on day t covers the
+        whole space before anything repeats.
+        """
+        return self._with_ranks(RankView(self.ranks, Shuffle(len(self.ranks), seed)))
+
+    def post(self, index: int, tags: Tuple[int, ...] = ()) -> Post:
+        """Return combination #index of this space as a compact Post with the given hashtag positions"""
+        return Post(self.catalog.version, *self[index], tuple(tags))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Walk the space of topic, hook, template, concept and angle combinations"
+    )
+    parser.add_argument(
+        "--rank",
+        type=int,
+        help="Print combination #RANK as a post"
+    )
+    parser.add_argument(
+        "--every",
+        type=int,
+        default=1,
+        metavar="K",
+        help="Take every K-th combination"
+    )
+    parser.add_argument(
+        "--offset",
+        type=int,
+        default=0,
+        help="First combination for --every"
+    )
+    parser.add_argument(
+        "--partition",
+        type=str,
+        metavar="INDEX/TOTAL",
+        help="Only walk part INDEX of TOTAL disjoint parts (e.g. 0/4)"
+    )
+    parser.add_argument(
+        "--shuffle",
+        action="store_true",
+        help="Walk in a seeded random order that still visits each combination once"
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=10,
+        help="Most posts to write as JSON Lines (0 prints only the size)"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Seed for --shuffle and the hashtags of each post"
+    )
+    args = parser.parse_args()
+
+    generator = TikTokContentGenerator(args.seed)
+    full = ContentSpace(generator.catalog)
+    sizes = " × ".join(f"{size} {name}s" for name, size in zip(SPACE_COMPONENTS, full.sizes))
+    print(f"{len(full):,} combinations ({sizes})", file=sys.stderr)
+
+    try:
+        if args.rank is not None:
+            full.unrank(args.rank)
+            ranks = [args.rank]
+        else:
+            space = full.shuffled(generator.seed) if args.shuffle else full
+            if args.partition:
+                index, total = (int(part) for part in args.partition.split("/"))
+                space = space.partition(index, total)
+            ranks = space.every(args.every, args.offset).ranks[:args.limit]
+    except (IndexError, ValueError) as e:
+        parser.error(str(e))
+
+    for rank in ranks:
+        # Each post's hashtags depend only on the seed and its rank
+        generator.rng.seed(f"{generator.seed}:space:{rank}")
+        post = full.post(rank, generator._draw_hashtags())
+        sys.stdout.write(json.dumps({"rank": rank, **post.to_dict(full.catalog)}) + "\n")
+
+
+if __name__ == "__main__":
+    main()
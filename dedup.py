@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate caption index for TikTok Content Generator
+MinHash signatures of word shingles, bucketed with locality-sensitive
+hashing so each check only compares a caption against likely matches
+"""
+
+import argparse
+import hashlib
+import json
+import operator
+import os
+import re
+import struct
+import sys
+from array import array
+from typing import Any, Dict, Iterator, List, Set, Tuple
+
+from tiktok_content import _import_numpy
+
+
+MAGIC = b"TTCD"
+FORMAT_VERSION = 1
+
+# magic, format version, shingle words, permutations, bands, threshold,
+# distinct signatures, captions seen
+HEADER = struct.Struct("<4sBBHHdQQ")
+
+# The same caption with another topic scores about 0.7 (0.6 to 0.8), one
+# with another hook about 0.45 and one with another template about 0.2
+DEFAULT_THRESHOLD = 0.6
+DEFAULT_PERMUTATIONS = 64
+SHINGLE_WORDS = 3
+
+# Signatures kept per index for captions seen before; catalogs repeat the
+# same texts often, and a signature costs far more than the lookup
+SIGNATURE_CACHE_SIZE = 100000
+
+_WORD = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int = SHINGLE_WORDS) -> Set[str]:
+    """Return the text's overlapping word n-grams, ignoring case and punctuation"""
+    words = _WORD.findall(text.lower())
+    return {" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+
+
+def lsh_bands(permutations: int, threshold: float) -> int:
+    """Pick how many bands to split signatures into for a similarity threshold
+
+    Pairs at similarity s share a bucket with probability 1 - (1 - s^r)^b;
+    the bands are chosen so the curve's midpoint (1/b)^(1/r) sits at or
+    just below the threshold, trading a few extra comparisons for recall.
+    """
+    options = [bands for bands in range(1, permutations + 1) if permutations % bands == 0]
+    below = [bands for bands in options if (1 / bands) ** (bands / permutations) <= threshold]
+    return min(below) if below else max(options)
+
+
+class CaptionIndex:
+    """Remember captions and spot new ones that are nearly the same
+
+    Captions are compared by the Jaccard similarity of their word shingles,
+    estimated from MinHash signatures. Signatures are split into bands and
+    each band is a hash bucket key, so a check looks at a handful of buckets
+    and compares only the signatures found there: the cost depends on how
+    many similar captions are stored, not on how many captions there are.
+    Identical signatures are stored once.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, permutations: int = DEFAULT_PERMUTATIONS, shingle_words: int = SHINGLE_WORDS):
+        if not 0 < threshold <= 1:
+            raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+        self.threshold = threshold
+        self.permutations = permutations
+        self.shingle_words = shingle_words
+        self.bands = lsh_bands(permutations, threshold)
+        self.rows = permutations // self.bands
+        self.count = 0
+        self._signatures = []
+        self._ids = {}
+        self._buckets = [{} for _ in range(self.bands)]
+        self._cache = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def signature(self, text: str) -> bytes:
+        """Return the MinHash signature of a caption: one packed 32-bit minimum per permutation
+
+        Each shingle is hashed once with SHAKE-128 into one 32-bit value per
+        permutation and the minimum is taken position by position, with
+        NumPy when it is installed (same result, some 25 times faster).
+        """
+        signature = self._cache.get(text)
+        if signature is None:
+            size = 4 * self.permutations
+            digests = b"".join([
+                hashlib.shake_128(shingle.encode()).digest(size)
+                for shingle in shingles(text, self.shingle_words)
+            ])
+            np = _import_numpy()
+            if np is not None:
+                signature = np.frombuffer(digests, dtype="<u4").reshape(-1, self.permutations).min(axis=0).tobytes()
+            else:
+                values = array("I", digests)
+                if sys.byteorder == "big":
+                    values.byteswap()
+                hashes = [values[i:i + self.permutations] for i in range(0, len(values), self.permutations)]
+                minimums = array("I", map(min, *hashes) if len(hashes) > 1 else hashes[0])
+                if sys.byteorder == "big":
+                    minimums.byteswap()
+                signature = minimums.tobytes()
+            if len(self._cache) >= SIGNATURE_CACHE_SIZE:
+                self._cache.clear()
+            self._cache[text] = signature
+        return signature
+
+    def _band_keys(self, signature: bytes) -> List[bytes]:
+        width = 4 * self.rows
+        return [signature[i * width:(i + 1) * width] for i in range(self.bands)]
+
+    def similarity(self, first: bytes, second: bytes) -> float:
+        """Estimate the Jaccard similarity of two signatures"""
+        # Equal packed values are equal whatever the byte order
+        matches = sum(map(operator.eq, memoryview(first).cast("I"), memoryview(second).cast("I")))
+        return matches / self.permutations
+
+    def _matches(self, signature: bytes) -> Iterator[Tuple[int, float]]:
+        """Yield (stored signature index, similarity) for each stored signature sharing a band with signature"""
+        exact = self._ids.get(signature)
+        if exact is not None:
+            yield exact, 1.0
+            return
+        signatures = self._signatures
+        seen = set()
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            found = bucket.get(key)
+            if found is None:
+                continue
+            for index in (found,) if type(found) is int else found:
+                if index not in seen:
+                    seen.add(index)
+                    yield index, self.similarity(signature, signatures[index])
+
+    def nearest(self, text: str) -> Tuple[int, float]:
+        """Return (stored signature index, similarity) of the closest candidate, or (-1, 0.0)"""
+        return max(self._matches(self.signature(text)), key=operator.itemgetter(1), default=(-1, 0.0))
+
+    def is_duplicate(self, text: str) -> bool:
+        """Return whether a stored caption is at least `threshold` similar to text"""
+        threshold = self.threshold
+        return any(similarity >= threshold for _, similarity in self._matches(self.signature(text)))
+
+    def add(self, text: str):
+        """Store a caption"""
+        self._add_signature(self.signature(text))
+        self.count += 1
+
+    def _add_signature(self, signature: bytes):
+        if signature in self._ids:
+            return
+        index = len(self._ids)
+        self._ids[signature] = index
+        self._signatures.append(signature)
+        # Most buckets hold one signature; keeping those as a bare int instead
+        # of a list saves memory and keeps the garbage collector out of loads
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            found = bucket.get(key)
+            if found is None:
+                bucket[key] = index
+            elif type(found) is int:
+                bucket[key] = [found, index]
+            else:
+                found.append(index)
+
+    def check_and_add(self, text: str) -> bool:
+        """Store text and return True unless it nearly duplicates a stored caption"""
+        if self.is_duplicate(text):
+            return False
+        self.add(text)
+        return True
+
+    def save(self, path: str):
+        """Write the index to path (replaced atomically)
+
+        Only the signatures are written; load() rebuilds the buckets.
+        """
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(HEADER.pack(
+                MAGIC,
+                FORMAT_VERSION,
+                self.shingle_words,
+                self.permutations,
+                self.bands,
+                self.threshold,
+                len(self._ids),
+                self.count
+            ))
+            f.writelines(self._signatures)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str) -> "CaptionIndex":
+        """Read an index written by save()"""
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise ValueError(f"{path} is not a caption index")
+            magic, version, shingle_words, permutations, bands, threshold, distinct, count = HEADER.unpack(header)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a caption index")
+            if version != FORMAT_VERSION:
+                raise ValueError(f"{path} has format version {version}, expected {FORMAT_VERSION}")
+            size = 4 * permutations
+            data = f.read(distinct * size)
+        if len(data) < distinct * size:
+            raise ValueError(f"{path} is truncated")
+        index = cls(threshold, permutations, shingle_words)
+        index.bands = bands
+        index.rows = permutations // bands
+        index._buckets = [{} for _ in range(bands)]
+        for start in range(0, len(data), size):
+            index._add_signature(data[start:start + size])
+        index.count = count
+        return index
+
+    @classmethod
+    def open(cls, path: str, threshold: float = DEFAULT_THRESHOLD) -> "CaptionIndex":
+        """Load the index at path if it exists, else start an empty one
+
+        A loaded index takes the given threshold but keeps the bands it was
+        built with.
+        """
+        if os.path.exists(path):
+            index = cls.load(path)
+            index.threshold = threshold
+            return index
+        return cls(threshold)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the index size and parameters as JSON-ready data"""
+        return {
+            "captions": self.count,
+            "distinct": len(self._ids),
+            "threshold": self.threshold,
+            "permutations": self.permutations,
+            "bands": self.bands,
+            "rows": self.rows
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build or inspect a near-duplicate caption index"
+    )
+    parser.add_argument(
+        "index",
+        help="Index file (created if missing)"
+    )
+    parser.add_argument(
+        "--add",
+        type=str,
+        metavar="FILE",
+        help="Add the captions of a saved post, caption list or calendar (JSON or JSON Lines)"
+    )
+    parser.add_argument(
+        "--check",
+        type=str,
+        metavar="TEXT",
+        help="Report the closest stored caption's similarity to TEXT"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Similarity at which captions count as duplicates"
+    )
+    args = parser.parse_args()
+
+    try:
+        index = CaptionIndex.open(args.index, args.threshold)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    if args.add:
+        from history import _load_records
+        try:
+            kind, records = _load_records(args.add)
+        except (OSError, ValueError) as e:
+            print(f"❌ Could not read {args.add}: {e}", file=sys.stderr)
+            sys.exit(1)
+        for record in records:
+            post = record["post"] if kind == "calendar" else record
+            index.add(post["full_caption"] if kind == "caption" else post["caption"])
+        index.save(args.index)
+        print(f"✅ Added {len(records)} captions")
+
+    if args.check:
+        _, similarity = index.nearest(args.check)
+        verdict = "duplicate" if similarity >= index.threshold else "new"
+        print(f"{verdict}: closest stored caption is {similarity:.0%} similar")
+
+    print(json.dumps(index.stats()))
+
+
+if __name__ == "__main__":
+    main()
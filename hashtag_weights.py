@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Hashtag weights for TikTok Content Generator
+Learns per-tag and per-group hashtag weights from engagement data and writes
+them as a hashtag_groups catalog section
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, Iterable, List, Tuple
+
+from catalog_files import CatalogSource, hashtag_group_to_dict
+from tiktok_content import ContentCatalog, HashtagGroup, default_catalog
+
+
+DEFAULT_METRIC = "views"
+
+# Each tag starts with this many posts' worth of average performance, so a
+# tag seen on one lucky post is not weighted as if it always did that well
+PRIOR_POSTS = 5
+
+
+def _tag_key(tag: str) -> str:
+    return tag.strip().lstrip("#").lower()
+
+
+def load_engagement(path: str) -> List[Dict[str, Any]]:
+    """Read engagement records: saved posts or calendar days (JSON or JSON Lines) with a metric added"""
+    with open(path) as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = [json.loads(line) for line in text.splitlines() if line.strip()]
+    return data if isinstance(data, list) else [data]
+
+
+def tag_performance(records: Iterable[Dict[str, Any]], metric: str = DEFAULT_METRIC, prior: float = PRIOR_POSTS) -> Dict[str, float]:
+    """Return each hashtag's smoothed mean metric relative to the mean over all posts
+
+    1.0 is average; tags on few posts are pulled towards it. Keys are
+    lowercase tags without the '#'. A calendar day's metric may sit on the
+    day or on its post.
+    """
+    totals = {}
+    counts = {}
+    values = []
+    for i, record in enumerate(records):
+        post = record.get("post", record) if isinstance(record, dict) else None
+        if not isinstance(post, dict):
+            raise ValueError(f"Record {i} is not a post")
+        value = record.get(metric, post.get(metric))
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+            raise ValueError(f"Record {i} has no non-negative {metric!r} value")
+        values.append(value)
+        for tag in set(map(_tag_key, post.get("hashtags", ()))):
+            totals[tag] = totals.get(tag, 0) + value
+            counts[tag] = counts.get(tag, 0) + 1
+    if not values or not sum(values):
+        raise ValueError(f"No engagement to learn from: every {metric!r} value is zero")
+    mean = sum(values) / len(values)
+    return {tag: (totals[tag] + prior * mean) / (counts[tag] + prior) / mean for tag in totals}
+
+
+def weighted_groups(catalog: ContentCatalog, performance: Dict[str, float]) -> Tuple[HashtagGroup, ...]:
+    """Return the catalog's hashtag groups weighted by tag performance
+
+    Tags without data count as average. A group's weight is the mean of its
+    tags' performance and each tag weight is its performance over that
+    mean, so tag weight times group weight is the tag's own performance.
+    Quotas are kept.
+    """
+    groups = []
+    for group in catalog.hashtag_groups:
+        scores = [performance.get(_tag_key(tag), 1.0) for tag in group.tags]
+        weight = round(sum(scores) / len(scores), 4) if scores else 1.0
+        weights = tuple(round(score / weight, 4) for score in scores) if weight else ()
+        if len(set(weights)) <= 1:
+            weights = ()
+        groups.append(HashtagGroup(group.name, group.tags, group.quota, weights, weight))
+    return tuple(groups)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Learn hashtag weights from engagement data and write them as a catalog section"
+    )
+    parser.add_argument(
+        "engagement",
+        help='Saved posts or calendar days (JSON or JSON Lines), each with a metric, e.g. "views": 1200'
+    )
+    parser.add_argument(
+        "--metric",
+        default=DEFAULT_METRIC,
+        help="Record field to learn from"
+    )
+    parser.add_argument(
+        "--prior",
+        type=float,
+        default=PRIOR_POSTS,
+        help="Posts' worth of average performance each tag starts with"
+    )
+    parser.add_argument(
+        "--catalog",
+        type=str,
+        help="Catalog JSON file or directory whose hashtag groups to weight (default: built-in)"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        help="Write the weighted hashtag_groups section to this catalog file (default: print it)"
+    )
+    args = parser.parse_args()
+
+    if args.prior < 0:
+        parser.error("--prior must not be negative")
+    catalog = default_catalog()
+    if args.catalog:
+        try:
+            catalog = CatalogSource(args.catalog).load()
+        except (OSError, ValueError) as e:
+            parser.error(f"invalid --catalog: {e}")
+
+    try:
+        performance = tag_performance(load_engagement(args.engagement), args.metric, args.prior)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not learn from {args.engagement}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    section = {"hashtag_groups": [hashtag_group_to_dict(group) for group in weighted_groups(catalog, performance)]}
+    if not args.output:
+        print(json.dumps(section, indent=2, ensure_ascii=False))
+        return
+    with open(args.output, "w") as f:
+        json.dump(section, f, indent=2, ensure_ascii=False)
+    known = {_tag_key(tag) for tag in catalog.all_hashtags}
+    best = sorted((tag for tag in performance if tag in known), key=performance.get, reverse=True)[:5]
+    print(f"✅ Weighted {len(known & set(performance))} of {len(known)} hashtags; saved to {args.output}")
+    if best:
+        print("   Best: " + ", ".join(f"#{tag} ({performance[tag]:.2f}×)" for tag in best))
+
+
+if __name__ == "__main__":
+    main()
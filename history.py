@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Posting history for TikTok Content Generator
+Records published hooks, caption templates, topics, concepts and angles in a
+local SQLite database and turns the recent ones into exclusion sets, so new
+content does not reuse them
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import sys
+from datetime import date, timedelta
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Tuple
+
+from tiktok_content import HISTORY_KINDS, REPEAT_COMPONENTS, ContentCatalog
+
+
+DEFAULT_TENANT = "default"
+DEFAULT_HISTORY_DAYS = 30
+
+# Rows per transaction when recording a stream of records
+RECORD_CHUNK_SIZE = 10000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    tenant TEXT NOT NULL,
+    component TEXT NOT NULL,
+    used_on TEXT NOT NULL,
+    item TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_recent ON history (tenant, component, used_on, item);
+"""
+
+
+def catalog_items(catalog: ContentCatalog, component: str) -> Tuple[str, ...]:
+    """Return the text history stores for each catalog position of a component"""
+    if component == "hook":
+        return catalog.hooks
+    if component == "template":
+        return tuple(template.source for template in catalog.caption_templates)
+    if component == "topic":
+        return catalog.topics
+    if component == "concept":
+        return tuple(concept.title for concept in catalog.video_concepts)
+    return catalog.trending_angles
+
+
+def _window_start(days: int, today: date = None) -> date:
+    """Return the first date of a window of `days` days ending today"""
+    if days < 1:
+        raise ValueError(f"days must be at least 1, got {days}")
+    return (today or date.today()) - timedelta(days=days - 1)
+
+
+class CaptionDecoder:
+    """Find the caption template (and topic) a rendered caption body came from"""
+
+    def __init__(self, catalog: ContentCatalog):
+        self.catalog = catalog
+        self._patterns = []
+        for template in catalog.caption_templates:
+            pattern = "(.+?)".join(re.escape(literal) for literal in template._literals)
+            self._patterns.append((re.compile(pattern, re.DOTALL), template))
+
+    def decode(self, body: str) -> Tuple[Any, Any]:
+        """Return (template source, topic) for body; either is None when unknown"""
+        for pattern, template in self._patterns:
+            match = pattern.fullmatch(body)
+            if match is not None:
+                values = dict(zip(template._names, match.groups()))
+                return template.source, values.get("topic")
+        return None, None
+
+
+class PostHistory:
+    """What each tenant published, by component and date, in a SQLite file
+
+    Every row is one catalog item (stored as text, so history survives catalog
+    edits) used on one date. The (tenant, component, used_on, item) index
+    covers the exclusion query, so it reads only the rows inside the window
+    no matter how many millions of rows the history holds.
+    """
+
+    def __init__(self, path: str, tenant: str = DEFAULT_TENANT):
+        self.path = path
+        self.tenant = tenant
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(SCHEMA)
+        self._decoder = None
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self) -> "PostHistory":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _caption_decoder(self, catalog: ContentCatalog) -> CaptionDecoder:
+        if self._decoder is None or self._decoder.catalog is not catalog:
+            self._decoder = CaptionDecoder(catalog)
+        return self._decoder
+
+    def record_items(self, rows: Iterable[Tuple[str, str, str]]) -> int:
+        """Insert (component, used_on, item) rows for this tenant; return how many"""
+        with self._connection:
+            cursor = self._connection.executemany(
+                "INSERT INTO history (tenant, component, used_on, item) VALUES (?, ?, ?, ?)",
+                ((self.tenant, component, used_on, item) for component, used_on, item in rows)
+            )
+        return cursor.rowcount
+
+    def _rows(self, catalog: ContentCatalog, kind: str, record: Dict[str, Any], used_on: str) -> Iterator[Tuple[str, str, str]]:
+        """Yield the (component, used_on, item) rows of one generated record"""
+        if kind == "calendar":
+            yield from self._rows(catalog, "post", record["post"], record["date"])
+            return
+        decoder = self._caption_decoder(catalog)
+        yield "hook", used_on, record["hook"]
+        if kind == "caption":
+            template, _ = decoder.decode(record["body"])
+            topic = record["topic"]
+        else:
+            template, topic = decoder.decode(record["caption"][len(record["hook"]) + 2:])
+            yield "concept", used_on, record["video_concept"]["title"]
+            yield "angle", used_on, record["trending_angle"]
+        if template is not None:
+            yield "template", used_on, template
+        if topic is not None:
+            yield "topic", used_on, topic
+
+    def record(self, catalog: ContentCatalog, kind: str, records: Iterable[Dict[str, Any]], used_on: date = None) -> int:
+        """Record generated posts, captions or calendar days; return the rows written
+
+        Posts and captions are recorded as used on used_on (default: today);
+        calendar days on their own dates.
+        """
+        if kind not in HISTORY_KINDS:
+            raise ValueError(f"History records {', '.join(HISTORY_KINDS)}, not {kind!r}")
+        day = (used_on or date.today()).isoformat()
+        return self.record_items(row for record in records for row in self._rows(catalog, kind, record, day))
+
+    def recording(self, catalog: ContentCatalog, kind: str, records: Iterable[Dict[str, Any]], used_on: date = None) -> Iterator[Dict[str, Any]]:
+        """Yield records unchanged, recording them in chunks as they pass"""
+        chunk = []
+        for record in records:
+            chunk.append(record)
+            if len(chunk) >= RECORD_CHUNK_SIZE:
+                self.record(catalog, kind, chunk, used_on)
+                chunk = []
+            yield record
+        if chunk:
+            self.record(catalog, kind, chunk, used_on)
+
+    def recent_items(self, component: str, since: date) -> List[str]:
+        """Return the distinct items of a component used on or after since"""
+        rows = self._connection.execute(
+            "SELECT DISTINCT item FROM history WHERE tenant = ? AND component = ? AND used_on >= ?",
+            (self.tenant, component, since.isoformat())
+        )
+        return [item for item, in rows]
+
+    def exclusions(self, catalog: ContentCatalog, days: int = DEFAULT_HISTORY_DAYS, today: date = None) -> Dict[str, FrozenSet[int]]:
+        """Return the catalog positions used within `days` days before today, by component
+
+        Dates after today (an already scheduled calendar) count as used too.
+        Pass the result to TikTokContentGenerator.set_exclusions().
+        """
+        since = _window_start(days, today)
+        exclusions = {}
+        for component in REPEAT_COMPONENTS:
+            recent = self.recent_items(component, since)
+            if not recent:
+                continue
+            positions = {}
+            for position, item in enumerate(catalog_items(catalog, component)):
+                positions.setdefault(item, []).append(position)
+            exclusions[component] = frozenset(
+                position for item in recent for position in positions.get(item, ())
+            )
+        return exclusions
+
+    def usage(self, catalog: ContentCatalog, component: str, days: int = DEFAULT_HISTORY_DAYS, today: date = None) -> Dict[int, int]:
+        """Return how many times each catalog position of a component was used within `days` days before today
+
+        Pass the topic usage to scoring.TopicFreshness.
+        """
+        rows = self._connection.execute(
+            "SELECT item, COUNT(*) FROM history WHERE tenant = ? AND component = ? AND used_on >= ? GROUP BY item",
+            (self.tenant, component, _window_start(days, today).isoformat())
+        )
+        counts = dict(rows)
+        return {
+            position: counts[item]
+            for position, item in enumerate(catalog_items(catalog, component))
+            if item in counts
+        }
+
+    def prune(self, before: date) -> int:
+        """Delete this tenant's rows used before a date; return how many"""
+        with self._connection:
+            cursor = self._connection.execute(
+                "DELETE FROM history WHERE tenant = ? AND used_on < ?",
+                (self.tenant, before.isoformat())
+            )
+        return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        """Return this tenant's row count per component"""
+        rows = self._connection.execute(
+            "SELECT component, COUNT(*) FROM history WHERE tenant = ? GROUP BY component",
+            (self.tenant,)
+        )
+        return dict(rows)
+
+
+def _load_records(path: str) -> Tuple[str, List[Dict[str, Any]]]:
+    """Read a saved post, caption list or calendar (JSON or JSON Lines) and tell which it is"""
+    with open(path) as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = [json.loads(line) for line in text.splitlines() if line.strip()]
+    records = data if isinstance(data, list) else [data]
+    if not records:
+        return "post", []
+    first = records[0]
+    if "date" in first and "post" in first:
+        return "calendar", records
+    if "body" in first:
+        return "caption", records
+    if "video_concept" in first:
+        return "post", records
+    raise ValueError(f"{path} holds no posts, captions or calendar days")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Record published content in a history database, or show what it holds"
+    )
+    parser.add_argument(
+        "database",
+        help="SQLite history file (created if missing)"
+    )
+    parser.add_argument(
+        "--tenant",
+        default=DEFAULT_TENANT,
+        help="Business whose history to use"
+    )
+    parser.add_argument(
+        "--record",
+        type=str,
+        metavar="FILE",
+        help="Record a saved post, captions or calendar (JSON or JSON Lines)"
+    )
+    parser.add_argument(
+        "--prune-days",
+        type=int,
+        metavar="N",
+        help="Delete history older than N days"
+    )
+    args = parser.parse_args()
+
+    with PostHistory(args.database, args.tenant) as history:
+        if args.record:
+            from tiktok_content import default_catalog
+            try:
+                kind, records = _load_records(args.record)
+                written = history.record(default_catalog(), kind, records)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"❌ Could not record {args.record}: {e}", file=sys.stderr)
+                sys.exit(1)
+            print(f"✅ Recorded {len(records)} {kind} records ({written} items) for {args.tenant}")
+        if args.prune_days is not None:
+            deleted = history.prune(date.today() - timedelta(days=args.prune_days))
+            print(f"🗑️  Deleted {deleted} rows older than {args.prune_days} days")
+        counts = history.counts()
+        print(f"{args.tenant}: {sum(counts.values()):,} rows in {args.database}")
+        for component in REPEAT_COMPONENTS:
+            print(f"  {component:<9} {counts.get(component, 0):>10,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Load test for the TikTok Content Generator HTTP service
+Sends requests over keep-alive connections and reports requests/sec and latency
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+
+async def request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, method: str, path: str, body: bytes = b"") -> Tuple[int, bytes]:
+    """Send one request on an open connection and return (status, body)"""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\n"
+        f"Host: localhost\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def _client(host: str, port: int, path: str, body: bytes, requests: int, latencies: List[float], errors: List[int]):
+    reader, writer = await asyncio.open_connection(host, port)
+    method = "POST" if body else "GET"
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, method, path, body)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def load_test(host: str, port: int, path: str, total: int, connections: int, body: bytes = b"") -> Dict[str, Any]:
+    """Send `total` requests for path over `connections` concurrent connections"""
+    latencies = []
+    errors = []
+    per_connection = [total // connections + (i < total % connections) for i in range(connections)]
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, path, body, n, latencies, errors) for n in per_connection if n
+    ))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "seconds": elapsed,
+        "requests_per_sec": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1e3,
+        "p99_ms": latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))] * 1e3
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load test the TikTok Content Generator HTTP service"
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Server address"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8080,
+        help="Server port"
+    )
+    parser.add_argument(
+        "--path",
+        default="/post",
+        help="Endpoint to request, with any query string (e.g. /calendar?days=30)"
+    )
+    parser.add_argument(
+        "--batch",
+        type=str,
+        metavar="JSON",
+        help='POST this JSON list to /batch instead (e.g. \'[{"type": "post"}, {"type": "caption"}]\')'
+    )
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=2000,
+        help="Total number of requests"
+    )
+    parser.add_argument(
+        "--connections",
+        type=int,
+        default=10,
+        help="Concurrent keep-alive connections"
+    )
+    args = parser.parse_args()
+
+    path, body = args.path, b""
+    if args.batch:
+        json.loads(args.batch)
+        path, body = "/batch", args.batch.encode()
+
+    try:
+        result = asyncio.run(load_test(args.host, args.port, path, args.requests, args.connections, body))
+    except ConnectionError as e:
+        print(f"❌ Could not reach http://{args.host}:{args.port}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"{result['requests']:,} requests to {path} over {args.connections} connections in {result['seconds']:.2f}s")
+    print(f"  {result['requests_per_sec']:,.0f} requests/sec")
+    print(f"  p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms")
+    if result["errors"]:
+        print(f"  ⚠️  {result['errors']} non-200 responses")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Schedule optimizer for TikTok Content Generator
+Assigns content types and video concepts to calendar days under constraints
+such as difficulty caps per week, concept spacing and weekday preferences
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from tiktok_content import (
+    CONTENT_MIX,
+    DURATION_BUCKETS,
+    ContentCatalog,
+    TikTokContentGenerator,
+    calendar_date,
+    duration_bucket
+)
+
+
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# One (content type, concept position) pair per day
+Plan = List[Tuple[str, int]]
+
+
+@dataclass(frozen=True)
+class ScheduleConstraints:
+    """Rules every planned calendar follows
+
+    max_per_week caps the concepts of a difficulty per calendar week (Monday
+    to Sunday), e.g. {"Hard": 1}. concept_spacing is the least number of days
+    between two uses of one concept. weekday_types fixes a weekday's content
+    type, e.g. {"Saturday": "before_after"}; weekday_durations prefers a
+    duration bucket on a weekday, e.g. {"Monday": "short"}. With
+    distinct_accounts, no two accounts post the same concept on one day.
+    """
+
+    max_per_week: Dict[str, int] = field(default_factory=dict)
+    concept_spacing: int = 0
+    weekday_types: Dict[str, str] = field(default_factory=dict)
+    weekday_durations: Dict[str, str] = field(default_factory=dict)
+    distinct_accounts: bool = False
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ScheduleConstraints":
+        """Build constraints from their JSON form, e.g. a --optimize file
+
+        Raises ValueError for unknown constraints and values of the wrong type.
+        """
+        if not isinstance(data, dict):
+            raise ValueError("Constraints must be a JSON object")
+        names = {f.name for f in fields(cls)}
+        unknown = set(data) - names
+        if unknown:
+            raise ValueError(f"Unknown constraints {', '.join(sorted(unknown))}, expected {', '.join(sorted(names))}")
+        for name, value in data.items():
+            if name == "max_per_week":
+                if not isinstance(value, dict) or not all(
+                    isinstance(limit, int) and not isinstance(limit, bool) and limit >= 0 for limit in value.values()
+                ):
+                    raise ValueError("max_per_week must map difficulties to non-negative integers")
+            elif name == "concept_spacing":
+                if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+                    raise ValueError("concept_spacing must be a non-negative integer")
+            elif name == "distinct_accounts":
+                if not isinstance(value, bool):
+                    raise ValueError("distinct_accounts must be true or false")
+            elif not isinstance(value, dict) or not all(isinstance(item, str) for item in value.values()):
+                example = '{"Saturday": "before_after"}' if name == "weekday_types" else '{"Monday": "short"}'
+                raise ValueError(f"{name} must map weekdays to names, e.g. {example}")
+        return cls(**data)
+
+    def check(self, catalog: ContentCatalog):
+        """Raise ValueError for constraints that do not fit the catalog"""
+        difficulties = {concept.difficulty for concept in catalog.video_concepts}
+        for difficulty, limit in self.max_per_week.items():
+            if difficulty not in difficulties:
+                raise ValueError(f"No concept has difficulty {difficulty!r}, expected one of {', '.join(sorted(difficulties))}")
+            if not isinstance(limit, int) or limit < 0:
+                raise ValueError(f"max_per_week[{difficulty!r}] must be a non-negative integer")
+        if not isinstance(self.concept_spacing, int) or self.concept_spacing < 0:
+            raise ValueError("concept_spacing must be a non-negative integer")
+        buckets = [name for name, _ in DURATION_BUCKETS]
+        for weekday, value, allowed in (
+            *((day, value, CONTENT_MIX) for day, value in self.weekday_types.items()),
+            *((day, value, buckets) for day, value in self.weekday_durations.items())
+        ):
+            if weekday not in WEEKDAYS:
+                raise ValueError(f"Unknown weekday {weekday!r}, expected one of {', '.join(WEEKDAYS)}")
+            if value not in allowed:
+                raise ValueError(f"{weekday}: {value!r} is not one of {', '.join(allowed)}")
+
+
+def _match(choices: List[List[int]]) -> Any:
+    """Give every account a different concept from its ranked choices, or return None
+
+    Accounts take their best choice unless an augmenting path lets an
+    earlier account move to its next one, so a day only fails when no
+    assignment exists at all.
+    """
+    owner = {}
+
+    def assign(account: int, seen: set) -> bool:
+        for position in choices[account]:
+            if position in seen:
+                continue
+            seen.add(position)
+            if position not in owner or assign(owner[position], seen):
+                owner[position] = account
+                return True
+        return False
+
+    for account in range(len(choices)):
+        if not assign(account, set()):
+            return None
+    assigned = [None] * len(choices)
+    for position, account in owner.items():
+        assigned[account] = position
+    return assigned
+
+
+def plan_schedule(
+    catalog: ContentCatalog,
+    days: int,
+    start_date: datetime,
+    constraints: ScheduleConstraints = None,
+    accounts: int = 1,
+    seed: Any = None
+) -> List[Plan]:
+    """Return one plan per account: a (content type, concept position) pair per day
+
+    Days are filled in order. Each day takes its weekday's content type, or
+    else the least recently used one (without preferences that is the plain
+    CONTENT_MIX rotation). Its concept is, among those the spacing and
+    weekly caps allow, one matching the weekday's preferred duration, then
+    the least recently used, ties broken at random. With distinct_accounts
+    the accounts' ranked choices are matched so none share a concept; on
+    each day the matching fails only when no assignment exists for that
+    day. Days are planned greedily and never revisited, though, so an
+    early choice can leave a later day without an allowed concept even
+    when some other plan satisfies every constraint. Every check is a
+    lookup in per-account counters, so a year for many accounts takes well
+    under a second. Raises ValueError when some day has no allowed concept
+    or assignment.
+    """
+    constraints = constraints if constraints is not None else ScheduleConstraints()
+    constraints.check(catalog)
+    concepts = catalog.video_concepts
+    if constraints.distinct_accounts and accounts > len(concepts):
+        raise ValueError(f"distinct_accounts needs at least one concept per account, but there are {len(concepts)}")
+    difficulties = [concept.difficulty for concept in concepts]
+    buckets = [duration_bucket(concept.duration) for concept in concepts]
+    limits = [constraints.max_per_week.get(difficulty) for difficulty in difficulties]
+    spacing = constraints.concept_spacing
+    never = -len(concepts) - max(spacing, 1)
+
+    rngs = [random.Random(f"{seed}:schedule:{account}") for account in range(accounts)]
+    concept_used = [[never] * len(concepts) for _ in range(accounts)]
+    type_used = [{content_type: i - len(CONTENT_MIX) for i, content_type in enumerate(CONTENT_MIX)} for _ in range(accounts)]
+    week_counts = [{} for _ in range(accounts)]
+    plans = [[] for _ in range(accounts)]
+    first_weekday = start_date.weekday()
+
+    for index in range(days):
+        weekday = (first_weekday + index) % 7
+        if weekday == 0:
+            week_counts = [{} for _ in range(accounts)]
+        preferred_type = constraints.weekday_types.get(WEEKDAYS[weekday])
+        preferred_bucket = constraints.weekday_durations.get(WEEKDAYS[weekday])
+
+        content_types = []
+        choices = []
+        for account in range(accounts):
+            used = type_used[account]
+            content_type = preferred_type or min(CONTENT_MIX, key=used.__getitem__)
+            used[content_type] = index
+            content_types.append(content_type)
+
+            counts = week_counts[account]
+            rng = rngs[account]
+            ranked = []
+            for position, last in enumerate(concept_used[account]):
+                if index - last < spacing:
+                    continue
+                if limits[position] is not None and counts.get(difficulties[position], 0) >= limits[position]:
+                    continue
+                ranked.append(((buckets[position] == preferred_bucket, index - last, rng.random()), position))
+            if not ranked:
+                date, _ = calendar_date(start_date, index)
+                raise ValueError(f"No concept fits account {account} on {date}; relax concept_spacing or max_per_week")
+            if constraints.distinct_accounts:
+                ranked.sort(reverse=True)
+                choices.append([position for _, position in ranked])
+            else:
+                choices.append([max(ranked)[1]])
+
+        assigned = _match(choices) if constraints.distinct_accounts else [ranked[0] for ranked in choices]
+        if assigned is None:
+            date, _ = calendar_date(start_date, index)
+            raise ValueError(f"Accounts cannot all post different concepts on {date}; relax concept_spacing or max_per_week")
+        for account, position in enumerate(assigned):
+            concept_used[account][position] = index
+            if limits[position] is not None:
+                counts = week_counts[account]
+                counts[difficulties[position]] = counts.get(difficulties[position], 0) + 1
+            plans[account].append((content_types[account], position))
+    return plans
+
+
+def check_plan(catalog: ContentCatalog, plan: Plan, start_date: datetime, constraints: ScheduleConstraints) -> List[str]:
+    """Return a description of every hard constraint the plan breaks (empty when it is valid)"""
+    problems = []
+    last_used = {}
+    week_counts = {}
+    first_weekday = start_date.weekday()
+    for index, (content_type, position) in enumerate(plan):
+        weekday = WEEKDAYS[(first_weekday + index) % 7]
+        date, _ = calendar_date(start_date, index)
+        if weekday == "Monday":
+            week_counts = {}
+        expected = constraints.weekday_types.get(weekday)
+        if expected and content_type != expected:
+            problems.append(f"{date}: content type {content_type}, expected {expected}")
+        if position in last_used and index - last_used[position] < constraints.concept_spacing:
+            problems.append(f"{date}: concept {position} again after {index - last_used[position]} days")
+        last_used[position] = index
+        difficulty = catalog.video_concepts[position].difficulty
+        week_counts[difficulty] = week_counts.get(difficulty, 0) + 1
+        limit = constraints.max_per_week.get(difficulty)
+        if limit is not None and week_counts[difficulty] > limit:
+            problems.append(f"{date}: more than {limit} {difficulty} concepts this week")
+    return problems
+
+
+def optimized_calendars(
+    generator: TikTokContentGenerator,
+    days: int,
+    start_date: datetime = None,
+    constraints: ScheduleConstraints = None,
+    accounts: int = 1,
+    workers: int = 1
+) -> List[List[Dict[str, Any]]]:
+    """Plan and generate one calendar per account
+
+    The plans come from plan_schedule() seeded with the generator's seed;
+    everything else in each day's post is generated as usual.
+    """
+    start_date = start_date or datetime.now()
+    plans = plan_schedule(generator.catalog, days, start_date, constraints, accounts, generator.seed)
+    return [
+        list(generator.generate_batch("calendar", days, workers=workers, start_date=start_date, plan=plan))
+        for plan in plans
+    ]
+
+
+def load_constraints(path: str) -> ScheduleConstraints:
+    """Read constraints from a JSON file"""
+    with open(path) as f:
+        try:
+            data = json.load(f)
+        except ValueError as e:
+            raise ValueError(f"{path}: invalid JSON: {e}") from None
+    try:
+        return ScheduleConstraints.from_dict(data)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"{path}: {e}") from None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Plan content calendars for several accounts under constraints"
+    )
+    parser.add_argument(
+        "constraints",
+        help='JSON constraints file, e.g. {"max_per_week": {"Hard": 1}, "concept_spacing": 5}'
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=365,
+        help="Days to plan"
+    )
+    parser.add_argument(
+        "--accounts",
+        type=int,
+        default=1,
+        help="Accounts to plan at once"
+    )
+    parser.add_argument(
+        "--start-date",
+        type=str,
+        metavar="YYYY-MM-DD",
+        help="First day (default: today)"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Seed for reproducible plans and calendars"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        help="Save the generated calendars, one list per account, as JSON"
+    )
+    args = parser.parse_args()
+
+    try:
+        constraints = load_constraints(args.constraints)
+        start_date = datetime.strptime(args.start_date, "%Y-%m-%d") if args.start_date else datetime.now()
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    generator = TikTokContentGenerator(args.seed)
+
+    start = time.perf_counter()
+    try:
+        plans = plan_schedule(generator.catalog, args.days, start_date, constraints, args.accounts, generator.seed)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+    problems = sum(len(check_plan(generator.catalog, plan, start_date, constraints)) for plan in plans)
+    print(f"✅ Planned {args.days} days for {args.accounts} accounts in {elapsed * 1e3:.1f} ms "
+          f"({problems} constraint violations)")
+
+    if args.output:
+        calendars = [
+            list(generator.generate_batch("calendar", args.days, start_date=start_date, plan=plan))
+            for plan in plans
+        ]
+        with open(args.output, "w") as f:
+            json.dump(calendars, f, indent=2)
+        print(f"✅ Calendars saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Binary archive of compact posts
+Stores millions of generated posts as fixed-size records of catalog positions
+"""
+
+import argparse
+import json
+import mmap
+import struct
+import sys
+from typing import Any, Dict, Iterable, Iterator
+
+from tiktok_content import ContentCatalog, Post, default_catalog
+
+
+MAGIC = b"TTPA"
+FORMAT_VERSION = 1
+
+# magic, format version, tag slots per record, reserved,
+# catalog version (8 raw bytes), record count
+HEADER = struct.Struct("<4sBBH8sQ")
+
+# Catalog positions are stored in 2 bytes
+MAX_POSITION = 0xFFFF
+
+
+def record_struct(tag_slots: int) -> struct.Struct:
+    """Return the record layout for a given number of tag slots
+
+    topic, hook, template, concept, angle, number of tags, then the tag
+    positions; every field is unsigned and 2 bytes except the tag count.
+    """
+    return struct.Struct(f"<5HB{tag_slots}H")
+
+
+def tag_slots_for(catalog: ContentCatalog) -> int:
+    """Return how many hashtag positions a record needs for this catalog"""
+    return sum(min(group.quota, len(group.tags)) for group in catalog.hashtag_groups)
+
+
+def check_positions(catalog: ContentCatalog):
+    """Raise ValueError if a catalog list is too long for 2-byte record positions"""
+    for name, items in (
+        ("topics", catalog.topics),
+        ("hooks", catalog.hooks),
+        ("caption templates", catalog.caption_templates),
+        ("video concepts", catalog.video_concepts),
+        ("trending angles", catalog.trending_angles),
+        ("hashtags", catalog.all_hashtags),
+    ):
+        if len(items) > MAX_POSITION + 1:
+            raise ValueError(
+                f"Catalog has {len(items)} {name} but archive records hold positions up to {MAX_POSITION}"
+            )
+
+
+class PostArchiveWriter:
+    """Append compact posts to an archive file
+
+    Use as a context manager; the record count in the header is written
+    when the archive is closed.
+    """
+
+    def __init__(self, path: str, catalog: ContentCatalog = None, tag_slots: int = None):
+        self.catalog = catalog if catalog is not None else default_catalog()
+        self.tag_slots = tag_slots if tag_slots is not None else tag_slots_for(self.catalog)
+        if not 0 <= self.tag_slots <= 255:
+            raise ValueError(f"tag_slots must be between 0 and 255, got {self.tag_slots}")
+        check_positions(self.catalog)
+        self._record = record_struct(self.tag_slots)
+        self._padding = (0,) * self.tag_slots
+        self.count = 0
+        self._file = open(path, "wb")
+        self._file.write(self._header())
+
+    def _header(self) -> bytes:
+        return HEADER.pack(
+            MAGIC,
+            FORMAT_VERSION,
+            self.tag_slots,
+            0,
+            bytes.fromhex(self.catalog.version),
+            self.count
+        )
+
+    def write(self, post: Post):
+        """Append one post"""
+        if post.catalog_version != self.catalog.version:
+            raise ValueError(f"Post was drawn from catalog {post.catalog_version}, not {self.catalog.version}")
+        if len(post.tags) > self.tag_slots:
+            raise ValueError(f"Post has {len(post.tags)} hashtags but records hold {self.tag_slots}")
+        self._file.write(self._record.pack(
+            post.topic,
+            post.hook,
+            post.template,
+            post.concept,
+            post.angle,
+            len(post.tags),
+            *post.tags,
+            *self._padding[len(post.tags):]
+        ))
+        self.count += 1
+
+    def write_all(self, posts: Iterable[Post]) -> int:
+        """Append every post and return how many were written"""
+        before = self.count
+        for post in posts:
+            self.write(post)
+        return self.count - before
+
+    def close(self):
+        """Write the final record count and close the file"""
+        if self._file.closed:
+            return
+        self._file.seek(0)
+        self._file.write(self._header())
+        self._file.close()
+
+    def __enter__(self) -> "PostArchiveWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PostArchive:
+    """Read-only, memory-mapped view of an archive with random access
+
+    archive[i] decodes one record into a Post without reading the rest of
+    the file; expand(i) turns it into the full post dict.
+    """
+
+    def __init__(self, path: str, catalog: ContentCatalog = None):
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is not a post archive") from None
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise ValueError(f"{path} is not a post archive")
+
+        magic, version, tag_slots, _, catalog_version, count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a post archive")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path} uses archive format {version}, expected {FORMAT_VERSION}")
+
+        self.catalog_version = catalog_version.hex()
+        self.tag_slots = tag_slots
+        self._record = record_struct(tag_slots)
+        self._count = count
+        self.catalog = catalog if catalog is not None else default_catalog()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> Post:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("post archive index out of range")
+        fields = self._record.unpack_from(self._map, HEADER.size + index * self._record.size)
+        topic, hook, template, concept, angle, tag_count = fields[:6]
+        return Post(self.catalog_version, topic, hook, template, concept, angle, fields[6:6 + tag_count])
+
+    def __iter__(self) -> Iterator[Post]:
+        for index in range(self._count):
+            yield self[index]
+
+    def expand(self, index: int) -> Dict[str, Any]:
+        """Return post `index` as a full post dict"""
+        return self[index].to_dict(self.catalog)
+
+    def close(self):
+        """Release the memory map and file"""
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self) -> "PostArchive":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Read posts back from a binary post archive"
+    )
+    parser.add_argument(
+        "archive",
+        help="Archive written with --format archive"
+    )
+    parser.add_argument(
+        "--index",
+        type=int,
+        help="Only expand the post at this position"
+    )
+    parser.add_argument(
+        "--catalog",
+        type=str,
+        help="Catalog JSON file or directory the archive was written with (default: built-in)"
+    )
+    parser.add_argument(
+        "--tenants",
+        type=str,
+        help="Directory of <tenant>.json files (see tenants.py) the archive was written with"
+    )
+    parser.add_argument(
+        "--tenant",
+        type=str,
+        help="Tenant from --tenants the archive was written for"
+    )
+    args = parser.parse_args()
+
+    if args.tenant and not args.tenants:
+        parser.error("--tenant needs --tenants")
+    catalog = default_catalog()
+    if args.catalog:
+        from catalog_files import CatalogSource
+        try:
+            catalog = CatalogSource(args.catalog).load()
+        except (OSError, ValueError) as e:
+            parser.error(f"invalid --catalog: {e}")
+    if args.tenant:
+        from tenants import TenantDirectory
+        try:
+            catalog = TenantDirectory(args.tenants, catalog)(args.tenant)
+        except KeyError as e:
+            parser.error(e.args[0])
+        except (OSError, ValueError) as e:
+            parser.error(f"invalid --tenant: {e}")
+
+    try:
+        archive = PostArchive(args.archive, catalog)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if archive.catalog_version != catalog.version:
+        archive.close()
+        parser.error(
+            f"{args.archive} was written with catalog {archive.catalog_version}, not {catalog.version}; "
+            "pass the --catalog (and --tenants/--tenant) it was written with"
+        )
+
+    with archive:
+        if args.index is not None:
+            print(json.dumps(archive.expand(args.index), indent=2))
+            return
+        for index in range(len(archive)):
+            sys.stdout.write(json.dumps(archive.expand(index)))
+            sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Profiling for TikTok Content Generator
+Records call counts, time and allocations of every generator method and
+rendering step while enabled, and leaves the code untouched otherwise
+"""
+
+import cProfile
+import functools
+import inspect
+import json
+import sys
+import time
+import tracemalloc
+from types import ModuleType
+from typing import Any, Callable, Dict
+
+
+# Generator methods and rendering steps that get instrumented
+PROFILED_METHODS = (
+    "generate_hook",
+    "generate_caption",
+    "generate_hashtags",
+    "generate_video_concept",
+    "generate_content_idea",
+    "generate_content_ideas",
+    "generate_compact_post",
+    "generate_post",
+    "generate_calendar_day",
+    "generate_content_calendar",
+    "generate_batch",
+    "_pick",
+    "_pick_concept",
+    "_draw_hook",
+    "_draw_caption",
+    "_draw_hashtags",
+    "_draw_post",
+    "_iter_batch",
+    "_iter_bulk",
+    "_iter_parallel"
+)
+PROFILED_FUNCTIONS = (
+    "render_caption",
+    "render_hashtags",
+    "render_post",
+    "calendar_date",
+    "write_jsonl",
+    "save_json",
+    "format_post",
+    "format_records",
+    "write_buffered",
+    "print_formatted_post",
+    "print_results"
+)
+
+
+class CallStats:
+    """Totals for one instrumented callable
+
+    total is the cumulative time including nested instrumented calls, own
+    excludes them; allocated is the net traced memory each call left behind.
+    """
+
+    __slots__ = ("calls", "total", "own", "allocated")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.own = 0.0
+        self.allocated = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "total_s": self.total,
+            "own_s": self.own,
+            "allocated_bytes": self.allocated
+        }
+
+
+class Profiler:
+    """Instrument tiktok_content while enabled
+
+    Use as a context manager, or call enable()/disable(). Wrappers are only
+    installed while the profiler is enabled, so disabled profiling costs
+    nothing. With cprofile=True the standard cProfile profiler runs instead
+    of the wrappers and dump() writes a pstats file.
+
+    Hooks added with add_hook(callback) are called as
+    callback(name, elapsed_seconds, allocated_bytes) after every call.
+    Work done in --workers processes is not captured.
+    """
+
+    def __init__(self, module: ModuleType = None, trace_memory: bool = True, cprofile: bool = False):
+        if module is None:
+            import tiktok_content as module
+        self.module = module
+        self.trace_memory = trace_memory
+        self.stats = {}
+        self.hooks = []
+        self._cprofile = cProfile.Profile() if cprofile else None
+        self._originals = []
+        self._stack = []
+        self._enabled = False
+        self._started_tracing = False
+
+    def add_hook(self, callback: Callable[[str, float, int], Any]):
+        """Call callback(name, elapsed_seconds, allocated_bytes) after every instrumented call"""
+        self.hooks.append(callback)
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def enable(self):
+        """Start profiling"""
+        if self._enabled:
+            return
+        self._enabled = True
+        if self._cprofile is not None:
+            self._cprofile.enable()
+            return
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+        generator_class = self.module.TikTokContentGenerator
+        for name in PROFILED_METHODS:
+            self._patch(generator_class, name, f"TikTokContentGenerator.{name}")
+        for name in PROFILED_FUNCTIONS:
+            self._patch(self.module, name, name)
+
+    def disable(self):
+        """Stop profiling and restore the original callables"""
+        if not self._enabled:
+            return
+        self._enabled = False
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            return
+        for owner, name, original in reversed(self._originals):
+            setattr(owner, name, original)
+        self._originals = []
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self) -> "Profiler":
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.disable()
+
+    def _patch(self, owner: Any, name: str, label: str):
+        original = owner.__dict__[name] if isinstance(owner, type) else getattr(owner, name)
+        if inspect.isgeneratorfunction(original):
+            wrapper = self._wrap_generator(label, original)
+        else:
+            wrapper = self._wrap(label, original)
+        self._originals.append((owner, name, original))
+        setattr(owner, name, wrapper)
+
+    def _record(self, label: str, elapsed: float, children: float, allocated: int):
+        stats = self.stats.get(label)
+        if stats is None:
+            stats = self.stats[label] = CallStats()
+        stats.calls += 1
+        stats.total += elapsed
+        stats.own += elapsed - children
+        stats.allocated += allocated
+        for hook in self.hooks:
+            hook(label, elapsed, allocated)
+
+    def _traced(self) -> int:
+        return tracemalloc.get_traced_memory()[0] if self.trace_memory else 0
+
+    def _wrap(self, label: str, func: Callable) -> Callable:
+        stack = self._stack
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stack.append(0.0)
+            memory = self._traced()
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                children = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                self._record(label, elapsed, children, self._traced() - memory)
+
+        return wrapper
+
+    def _wrap_generator(self, label: str, func: Callable) -> Callable:
+        """Like _wrap, but times every resumption of the returned iterator as one call"""
+        stack = self._stack
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            iterator = func(*args, **kwargs)
+            while True:
+                stack.append(0.0)
+                memory = self._traced()
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    elapsed = time.perf_counter() - start
+                    children = stack.pop()
+                    if stack:
+                        stack[-1] += elapsed
+                    self._record(label, elapsed, children, self._traced() - memory)
+                yield item
+
+        return wrapper
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Return the collected stats keyed by callable, most expensive own time first"""
+        ordered = sorted(self.stats.items(), key=lambda item: item[1].own, reverse=True)
+        return {label: stats.to_dict() for label, stats in ordered}
+
+    def report(self) -> str:
+        """Return the collected stats as a text table"""
+        if self._cprofile is not None:
+            return "cProfile mode: write the stats with dump(path) and read them with pstats"
+        header = f"{'callable':<50} {'calls':>9} {'total ms':>10} {'own ms':>10} {'us/call':>9} {'net KiB':>9}"
+        lines = [header, "-" * len(header)]
+        for label, stats in self.to_dict().items():
+            lines.append(
+                f"{label:<50} {stats['calls']:>9,} {stats['total_s'] * 1e3:>10,.1f} "
+                f"{stats['own_s'] * 1e3:>10,.1f} {stats['total_s'] / stats['calls'] * 1e6:>9,.1f} "
+                f"{stats['allocated_bytes'] / 1024:>9,.1f}"
+            )
+        return "\n".join(lines)
+
+    def dump(self, path: str):
+        """Write the stats to path: pstats data in cProfile mode, JSON otherwise"""
+        if self._cprofile is not None:
+            self._cprofile.dump_stats(path)
+            return
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+def enable_profiling(module: ModuleType = None, trace_memory: bool = True) -> Profiler:
+    """Start and return a Profiler; call disable() on it when done"""
+    profiler = Profiler(module, trace_memory=trace_memory)
+    profiler.enable()
+    return profiler
+
+
+def finish_profile(profiler: Profiler, target: str):
+    """Disable the profiler and write its stats to the --profile target"""
+    profiler.disable()
+    if target == "-":
+        print(profiler.report(), file=sys.stderr)
+    else:
+        profiler.dump(target)
+        print(f"✅ Profile saved to {target}", file=sys.stderr)
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Candidate scoring for TikTok Content Generator
+Draws a large pool of posts or captions as catalog positions, scores them
+with pluggable heuristics and keeps the best k in a bounded heap
+"""
+
+import argparse
+import heapq
+import json
+import re
+import sys
+import time
+import warnings
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from tiktok_content import (
+    PARALLEL_CHUNK_SIZE,
+    CaptionLengths,
+    ContentCatalog,
+    NumpySampler,
+    Post,
+    TikTokContentGenerator,
+    _import_numpy,
+    chunk_bounds,
+    render_caption
+)
+
+
+SCORE_KINDS = ("post", "caption", "compact")
+
+# Caption length (hook and body) that scores best; longer or shorter loses
+# score linearly until twice or none of it
+IDEAL_CAPTION_LENGTH = 150
+
+# A heuristic scores a block of candidates: it gets the catalog and the
+# block's columns ("topic", "hook", "template" and, for posts, "concept",
+# "angle" and "tags"; one entry per candidate) and returns one score each,
+# usually between 0 and 1
+Heuristic = Callable[[ContentCatalog, Dict[str, List[Any]]], Sequence[float]]
+
+_DIGIT = re.compile(r"\d")
+_YOU = re.compile(r"\byou(r)?\b", re.IGNORECASE)
+
+# Per-catalog lookup tables, keyed by catalog version
+_tables = {}
+
+
+def _catalog_tables(catalog: ContentCatalog) -> Dict[str, Any]:
+    """Work out the per-position tables the built-in heuristics look scores up in"""
+    tables = _tables.get(catalog.version)
+    if tables is None:
+        hook_scores = []
+        for hook in catalog.hooks:
+            signals = (
+                "?" in hook or hook.rstrip().endswith(":"),
+                bool(_DIGIT.search(hook)),
+                bool(_YOU.search(hook)),
+                any(ord(char) > 0x2000 for char in hook),
+                len(hook) <= 50
+            )
+            hook_scores.append(sum(signals) / len(signals))
+        # Length score per (hook, template, topic), flattened in that order
+        lengths = CaptionLengths(catalog)
+        length_scores = [
+            max(0.0, 1 - abs(lengths.caption(topic, hook, template) - IDEAL_CAPTION_LENGTH) / IDEAL_CAPTION_LENGTH)
+            for hook in range(len(catalog.hooks))
+            for template in range(len(catalog.caption_templates))
+            for topic in catalog.topics
+        ]
+        tag_groups = [
+            group_index
+            for group_index, group in enumerate(catalog.hashtag_groups)
+            for _ in group.tags
+        ]
+        tables = _tables[catalog.version] = {
+            "hook_scores": hook_scores,
+            "length_scores": length_scores,
+            "tag_groups": tag_groups
+        }
+    return tables
+
+
+def hook_strength(catalog: ContentCatalog, columns: Dict[str, List[Any]]) -> List[float]:
+    """Score each hook by the share of attention signals it has
+
+    The signals are a question or a colon lead-in, a number, addressing
+    the viewer, an emoji and fitting in 50 characters.
+    """
+    scores = _catalog_tables(catalog)["hook_scores"]
+    return [scores[hook] for hook in columns["hook"]]
+
+
+def caption_length(catalog: ContentCatalog, columns: Dict[str, List[Any]]) -> List[float]:
+    """Score each caption by how close its length is to IDEAL_CAPTION_LENGTH"""
+    scores = _catalog_tables(catalog)["length_scores"]
+    templates = len(catalog.caption_templates)
+    topics = len(catalog.topics)
+    return [
+        scores[(hook * templates + template) * topics + topic]
+        for topic, hook, template in zip(columns["topic"], columns["hook"], columns["template"])
+    ]
+
+
+def hashtag_coverage(catalog: ContentCatalog, columns: Dict[str, List[Any]]) -> List[float]:
+    """Score each post by the share of hashtag groups its tags come from (1 for captions)"""
+    tags = columns.get("tags")
+    if tags is None:
+        return [1.0] * len(columns["hook"])
+    groups = _catalog_tables(catalog)["tag_groups"]
+    total = len(catalog.hashtag_groups)
+    np = _import_numpy()
+    if np is not None and tags and len(set(map(len, tags))) == 1:
+        # Rows of equal length (the usual case): count each row's distinct groups at once
+        row_groups = np.sort(np.asarray(groups)[np.asarray(tags)], axis=1)
+        distinct = 1 + (np.diff(row_groups, axis=1) != 0).sum(axis=1) if tags[0] else np.zeros(len(tags))
+        return (distinct / total).tolist()
+    return [len(set(map(groups.__getitem__, row))) / total for row in tags]
+
+
+class TopicFreshness:
+    """Score each candidate lower the more often its topic was used recently
+
+    usage maps topic positions to their recent uses, e.g. from
+    history.PostHistory.usage(); a topic used n times scores 1 / (n + 1).
+    """
+
+    def __init__(self, usage: Dict[int, int] = None):
+        self.usage = dict(usage or {})
+
+    def __call__(self, catalog: ContentCatalog, columns: Dict[str, List[Any]]) -> List[float]:
+        scores = [1 / (1 + self.usage.get(topic, 0)) for topic in range(len(catalog.topics))]
+        return [scores[topic] for topic in columns["topic"]]
+
+
+HEURISTICS = {
+    "hook": hook_strength,
+    "length": caption_length,
+    "hashtags": hashtag_coverage,
+    "freshness": TopicFreshness()
+}
+
+
+class Scorer:
+    """Sum of weighted heuristic scores
+
+    heuristics maps names to Heuristic callables (default: HEURISTICS) and
+    weights maps some of those names to weights (default 1 each; 0 turns a
+    heuristic off).
+    """
+
+    def __init__(self, weights: Dict[str, float] = None, heuristics: Dict[str, Heuristic] = None):
+        self.heuristics = dict(heuristics if heuristics is not None else HEURISTICS)
+        weights = weights or {}
+        unknown = set(weights) - set(self.heuristics)
+        if unknown:
+            raise ValueError(f"Unknown heuristics {', '.join(sorted(unknown))}, expected {', '.join(self.heuristics)}")
+        self.weights = {name: weights.get(name, 1.0) for name in self.heuristics}
+
+    def score(self, catalog: ContentCatalog, columns: Dict[str, List[Any]]) -> List[float]:
+        """Return the total score of every candidate in a block"""
+        totals = None
+        for name, heuristic in self.heuristics.items():
+            weight = self.weights[name]
+            if not weight:
+                continue
+            scores = heuristic(catalog, columns)
+            if totals is None:
+                totals = [weight * score for score in scores]
+            else:
+                totals = [total + weight * score for total, score in zip(totals, scores)]
+        return totals if totals is not None else [0.0] * len(columns["hook"])
+
+
+def parse_weights(text: str) -> Dict[str, float]:
+    """Parse "hook=2,length=0.5" into a weights dict"""
+    weights = {}
+    for part in text.split(","):
+        name, separator, value = part.partition("=")
+        if not separator:
+            raise ValueError(f"Expected NAME=WEIGHT, got {part!r}")
+        try:
+            weights[name.strip()] = float(value)
+        except ValueError:
+            raise ValueError(f"Weight of {name.strip()!r} must be a number, got {value!r}") from None
+    return weights
+
+
+def _python_only(generator: TikTokContentGenerator, topic: str = None) -> str:
+    """Return why candidates must come from the python backend, or "" if they need not"""
+    if generator.repeat_window or generator.exclusions or generator.caption_index is not None:
+        return "Repeat avoidance, exclusions and caption deduplication are applied by the python backend"
+    if generator._caption_lengths().longest_post(topic) > generator.caption_budget:
+        return (
+            f"Some candidates may not fit in {generator.caption_budget} characters and are fitted by "
+            "the python backend"
+        )
+    return ""
+
+
+def candidate_blocks(
+    generator: TikTokContentGenerator,
+    kind: str,
+    n: int,
+    backend: str = None,
+    topic: str = None
+) -> Iterator[Dict[str, List[Any]]]:
+    """Draw n candidate posts or captions and yield them as blocks of position columns
+
+    Candidates are drawn like the items of one generate_batch() call, so
+    with either backend candidate i has the positions of item i of a
+    "compact" batch (posts) or the topic, hook and template of a "caption"
+    batch. Nothing is rendered. The default backend is numpy when NumPy is
+    installed and the generator needs nothing only the python backend
+    does, which is about 100 times faster for large pools; otherwise python.
+    """
+    if kind not in SCORE_KINDS:
+        raise ValueError(f"Unknown candidate kind {kind!r}, expected one of {', '.join(SCORE_KINDS)}")
+    catalog = generator.catalog
+    if topic is not None and topic not in catalog.topics:
+        raise ValueError(f"Candidates need a catalog topic, got {topic!r}")
+    if backend is None:
+        numpy_ok = _import_numpy() is not None and not _python_only(generator, topic)
+        backend = "numpy" if numpy_ok else "python"
+    if backend == "numpy" and _import_numpy() is None:
+        warnings.warn("NumPy is not installed; falling back to the python backend", RuntimeWarning)
+        backend = "python"
+    reason = _python_only(generator, topic) if backend == "numpy" else None
+    if reason:
+        warnings.warn(f"{reason}; drawing candidates with it", RuntimeWarning)
+        backend = "python"
+    post = kind != "caption"
+    batch = generator._batches
+    generator._batches += 1
+
+    if backend == "numpy":
+        if generator._numpy_sampler is None or generator._numpy_sampler.catalog is not catalog:
+            generator._numpy_sampler = NumpySampler(catalog)
+        sampler = generator._numpy_sampler
+        seed = divmod(generator.seed % (1 << 128), 1 << 64)
+        for chunk_start, chunk_stop in chunk_bounds(0, n, PARALLEL_CHUNK_SIZE):
+            block = chunk_start // PARALLEL_CHUNK_SIZE
+            columns = sampler.draw([*seed, batch, block], PARALLEL_CHUNK_SIZE, "compact" if post else "caption", topic)
+            size = chunk_stop - chunk_start
+            if "topic_index" not in columns:
+                index = {name: position for position, name in enumerate(catalog.topics)}
+                columns["topic_index"] = [index[name] for name in columns["topic"]]
+            names = ("topic", "hook", "template", "concept", "angle", "tags") if post else ("topic", "hook", "template")
+            yield {
+                name: columns["topic_index" if name == "topic" else name][:size]
+                for name in names
+            }
+        return
+
+    index = {name: position for position, name in enumerate(catalog.topics)}
+    for chunk_start, chunk_stop in chunk_bounds(0, n, PARALLEL_CHUNK_SIZE):
+        rows = []
+        for i in range(chunk_start, chunk_stop):
+            generator._seed_item(batch, i)
+            rows.append(generator._draw_post(topic) if post else generator._draw_caption(topic))
+        columns = dict(zip(("topic", "hook", "template", "concept", "angle", "tags"), map(list, zip(*rows))))
+        columns["topic"] = [index[name] for name in columns["topic"]]
+        yield columns
+
+
+def top_k(blocks: Iterable[Tuple[Sequence[float], Dict[str, List[Any]]]], k: int) -> List[Tuple[float, Dict[str, Any]]]:
+    """Return the k best distinct (score, candidate) pairs of scored blocks, best first
+
+    Only a k-item min-heap is kept: a candidate that does not beat the
+    worst of the current k costs a single comparison, and nothing is
+    sorted but the k winners. A candidate equal to one already kept is
+    skipped, and ties go to the earlier candidate.
+    """
+    if k < 1:
+        return []
+    heap = []
+    kept = set()
+    position = 0
+    for scores, columns in blocks:
+        names = tuple(columns)
+        for row, score in enumerate(scores):
+            if len(heap) >= k and score <= heap[0][0]:
+                continue
+            values = tuple(columns[name][row] for name in names)
+            key = tuple(tuple(value) if isinstance(value, list) else value for value in values)
+            if key in kept:
+                continue
+            kept.add(key)
+            entry = (score, -(position + row), key, dict(zip(names, values)))
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            else:
+                kept.discard(heapq.heapreplace(heap, entry)[2])
+        position += len(scores)
+    return [(score, candidate) for score, _, _, candidate in sorted(heap, reverse=True)]
+
+
+def top_candidates(
+    generator: TikTokContentGenerator,
+    kind: str,
+    k: int,
+    pool: int,
+    scorer: Scorer = None,
+    backend: str = None,
+    topic: str = None
+) -> List[Tuple[float, Any]]:
+    """Draw `pool` candidates, score them in blocks and return the best k as (score, record), best first
+
+    Records are rendered only for the winners: dicts like generate_post()
+    and generate_caption() return, or Post objects for "compact". backend
+    defaults as in candidate_blocks().
+    """
+    scorer = scorer if scorer is not None else Scorer()
+    catalog = generator.catalog
+    winners = top_k(
+        ((scorer.score(catalog, columns), columns) for columns in candidate_blocks(generator, kind, pool, backend, topic)),
+        k
+    )
+    results = []
+    for score, row in winners:
+        if kind == "caption":
+            record = render_caption(catalog, catalog.topics[row["topic"]], row["hook"], row["template"])
+        else:
+            record = Post(catalog.version, row["topic"], row["hook"], row["template"], row["concept"], row["angle"], tuple(row["tags"]))
+            if kind == "post":
+                record = record.to_dict(catalog, generator.caption_budget)
+        results.append((score, record))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Score a pool of candidate posts or captions and print the best"
+    )
+    parser.add_argument(
+        "--kind",
+        choices=["post", "caption"],
+        default="post",
+        help="What to generate"
+    )
+    parser.add_argument(
+        "--pool",
+        type=int,
+        default=100000,
+        help="Candidates to draw and score"
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=30,
+        help="How many of the best to print"
+    )
+    parser.add_argument(
+        "--weights",
+        type=str,
+        metavar="NAME=W,...",
+        help=f"Heuristic weights, e.g. hook=2,length=1 (heuristics: {', '.join(HEURISTICS)})"
+    )
+    parser.add_argument(
+        "--topic",
+        type=str,
+        help="Only draw candidates for this topic"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["python", "numpy"],
+        help="Sampling backend for the candidates (default: numpy when NumPy is installed)"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Seed for reproducible candidates"
+    )
+    args = parser.parse_args()
+
+    try:
+        scorer = Scorer(parse_weights(args.weights) if args.weights else None)
+    except ValueError as e:
+        parser.error(str(e))
+    generator = TikTokContentGenerator(args.seed)
+
+    start = time.perf_counter()
+    try:
+        best = top_candidates(generator, args.kind, args.top, args.pool, scorer, args.backend, args.topic)
+    except ValueError as e:
+        parser.error(str(e))
+    elapsed = time.perf_counter() - start
+    print(f"Best {len(best)} of {args.pool:,} {args.kind} candidates in {elapsed * 1e3:.0f} ms", file=sys.stderr)
+    for score, record in best:
+        sys.stdout.write(json.dumps({"score": round(score, 4), **record}) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+HTTP service for TikTok Content Generator
+Serves posts, captions, hashtags, concepts and calendars from one warm
+generator over keep-alive HTTP/1.1, using only the standard library
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from http import HTTPStatus
+from typing import Any, Dict, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import tiktok_content
+from tiktok_content import TikTokContentGenerator
+
+
+ENDPOINTS = ("post", "caption", "hashtags", "concept", "calendar")
+
+# Requests for at least this many posts, captions, concepts or calendar
+# days are generated in a worker process so the event loop keeps serving
+OFFLOAD_ITEMS = 100
+
+MAX_COUNT = 10000
+MAX_DAYS = 3650
+MAX_BATCH = 100
+MAX_BODY = 1 << 20
+
+
+def _generate_with(generator: TikTokContentGenerator, kind: str, batch: int, n: int, options: Dict[str, Any]) -> list:
+    """Process pool task for generators other than the server's own, e.g. tenants'"""
+    return list(generator._iter_batch(kind, batch, 0, n, options))
+
+
+class RequestError(ValueError):
+    """A request the server answers with an error status"""
+
+    def __init__(self, message: str, status: HTTPStatus = HTTPStatus.BAD_REQUEST):
+        super().__init__(message)
+        self.status = status
+
+
+def _int_param(params: Dict[str, Any], name: str, default: Any, low: int, high: int) -> Any:
+    value = params.get(name)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise RequestError(f"{name} must be an integer, got {value!r}") from None
+    if not low <= value <= high:
+        raise RequestError(f"{name} must be between {low} and {high}, got {value}")
+    return value
+
+
+def _str_param(params: Dict[str, Any], name: str) -> Any:
+    value = params.get(name)
+    if value is not None and not isinstance(value, str):
+        raise RequestError(f"{name} must be a string, got {value!r}")
+    return value
+
+
+def parse_request(endpoint: str, params: Dict[str, Any]) -> Tuple[str, Any, Dict[str, Any]]:
+    """Turn an endpoint and its parameters into (kind, n, options)
+
+    n is None for a single record, otherwise the number of batch records.
+    """
+    if endpoint not in ENDPOINTS:
+        raise RequestError(f"Unknown endpoint {endpoint!r}, expected one of {', '.join(ENDPOINTS)}", HTTPStatus.NOT_FOUND)
+
+    if endpoint == "hashtags":
+        include_custom = params.get("include_custom")
+        if isinstance(include_custom, str):
+            include_custom = [tag for tag in include_custom.split(",") if tag]
+        elif include_custom is not None and (
+            not isinstance(include_custom, list) or not all(isinstance(tag, str) for tag in include_custom)
+        ):
+            raise RequestError(f"include_custom must be a list of hashtags, got {include_custom!r}")
+        return "hashtags", None, {
+            "count": _int_param(params, "count", 15, 0, MAX_COUNT),
+            "include_custom": include_custom
+        }
+
+    if endpoint == "calendar":
+        start_date = _str_param(params, "start_date")
+        try:
+            start_date = datetime.strptime(start_date, "%Y-%m-%d") if start_date else datetime.now()
+        except ValueError:
+            raise RequestError(f"start_date must look like 2024-01-31, got {start_date!r}") from None
+        return "calendar", _int_param(params, "days", 7, 1, MAX_DAYS), {"start_date": start_date}
+
+    options = {"topic": _str_param(params, "topic")}
+    if endpoint == "concept":
+        options["difficulty"] = _str_param(params, "difficulty")
+        options["duration"] = _str_param(params, "duration")
+    return endpoint, _int_param(params, "count", None, 1, MAX_COUNT), options
+
+
+class ContentServer:
+    """Answer content requests over HTTP from one shared generator
+
+    GET /post, /caption and /concept return one record, or a list with
+    ?count=N; GET /hashtags returns one hashtag set; GET /calendar returns
+    ?days=N days (default 7) from ?start_date=YYYY-MM-DD. POST /batch takes a
+    JSON list of {"type": endpoint, ...parameters} and returns the list of
+    results. Connections stay open between requests unless the client asks
+    to close them.
+
+    With a catalog_source (a catalog_files.CatalogSource), changed catalog
+    files are reparsed in a thread every reload_interval seconds and the new
+    catalog is swapped in between requests, so serving never pauses.
+
+    With tenants (a tenants.TenantRegistry), requests carrying ?tenant=ID
+    (or "tenant" in a /batch item) are served by that tenant's generator.
+    """
+
+    def __init__(
+        self,
+        generator: TikTokContentGenerator = None,
+        workers: int = 1,
+        catalog_source: Any = None,
+        reload_interval: float = 2.0,
+        tenants: Any = None
+    ):
+        self.generator = generator if generator is not None else TikTokContentGenerator()
+        self.workers = workers
+        self.catalog_source = catalog_source
+        self.reload_interval = reload_interval
+        self.tenants = tenants
+        self.requests = 0
+        self._executor = None
+        self._watcher = None
+        self._reload_error = None
+
+    def _generator_for(self, tenant: Any) -> TikTokContentGenerator:
+        if tenant is None:
+            return self.generator
+        if self.tenants is None:
+            raise RequestError("This server has no tenants")
+        try:
+            return self.tenants.generator(tenant)
+        except LookupError as e:
+            raise RequestError(str(e.args[0]), HTTPStatus.NOT_FOUND) from None
+
+    def _generate(self, generator: TikTokContentGenerator, kind: str, n: Any, options: Dict[str, Any]) -> Any:
+        """Build a request's result in this process"""
+        if n is not None:
+            return list(generator.generate_batch(kind, n, **options))
+        if kind == "post":
+            return generator.generate_post(options["topic"])
+        if kind == "caption":
+            return generator.generate_caption(options["topic"])
+        if kind == "hashtags":
+            return generator.generate_hashtags(options["count"], options["include_custom"])
+        return generator.generate_video_concept(options["difficulty"], options["duration"], options["topic"])
+
+    async def generate(self, kind: str, n: Any, options: Dict[str, Any], tenant: str = None) -> Any:
+        """Build a request's result, in a worker process when it is large"""
+        generator = self._generator_for(tenant)
+        if n is None or n < OFFLOAD_ITEMS or generator.repeat_window or generator.shard_total > 1:
+            return self._generate(generator, kind, n, options)
+
+        if kind == "concept":
+            generator.catalog.concept_index.select(options["difficulty"], options["duration"], options["topic"])
+        if self._executor is None:
+            # Spawned rather than forked, so workers never hold copies of
+            # open client connections
+            self._executor = ProcessPoolExecutor(
+                self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=tiktok_content._init_worker,
+                initargs=(self.generator,)
+            )
+        # Reserve the batch number here so the records match an in-process run
+        batch = generator._batches
+        generator._batches += 1
+        loop = asyncio.get_running_loop()
+        executor = self._executor
+        try:
+            if generator is self.generator:
+                return await loop.run_in_executor(
+                    executor, tiktok_content._generate_chunk, kind, batch, 0, n, options
+                )
+            return await loop.run_in_executor(executor, _generate_with, generator, kind, batch, n, options)
+        except BrokenProcessPool:
+            # A worker died; the next large request starts a new pool
+            executor.shutdown(wait=False)
+            if self._executor is executor:
+                self._executor = None
+            raise RequestError("A worker process stopped unexpectedly; try again", HTTPStatus.SERVICE_UNAVAILABLE) from None
+
+    async def reload_catalog(self) -> bool:
+        """Check the catalog files once and swap in the new catalog if they changed"""
+        try:
+            catalog = await asyncio.get_running_loop().run_in_executor(None, self.catalog_source.reload)
+        except (OSError, ValueError) as e:
+            if str(e) != self._reload_error:
+                self._reload_error = str(e)
+                print(f"⚠️  Keeping the current catalog: {e}", file=sys.stderr)
+            return False
+        self._reload_error = None
+        if catalog is None:
+            return False
+
+        self.generator.catalog = catalog
+        # Worker processes hold a copy of the old generator; new ones start
+        # from the updated generator when next needed
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        print(f"🔄 Reloaded catalog {catalog.version}", file=sys.stderr)
+        return True
+
+    async def _watch_catalog(self):
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            await self.reload_catalog()
+
+    async def respond(self, method: str, target: str, body: bytes) -> Tuple[HTTPStatus, Any]:
+        """Return the status and JSON payload for one request"""
+        url = urlsplit(target)
+        endpoint = url.path.strip("/")
+        try:
+            if endpoint == "health":
+                health = {"status": "ok", "requests": self.requests, "catalog": self.generator.catalog.version}
+                if self.tenants is not None:
+                    health["tenants"] = self.tenants.stats()
+                return HTTPStatus.OK, health
+
+            if endpoint == "batch":
+                if method != "POST":
+                    raise RequestError("/batch expects POST with a JSON list", HTTPStatus.METHOD_NOT_ALLOWED)
+                try:
+                    items = json.loads(body or b"null")
+                except ValueError as e:
+                    raise RequestError(f"Invalid JSON body: {e}") from None
+                if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+                    raise RequestError('/batch expects a JSON list of {"type": ..., ...} objects')
+                if len(items) > MAX_BATCH:
+                    raise RequestError(f"/batch takes at most {MAX_BATCH} requests, got {len(items)}")
+                parsed = [parse_request(str(item.get("type")), item) + (item.get("tenant"),) for item in items]
+                return HTTPStatus.OK, [await self.generate(*request) for request in parsed]
+
+            if method != "GET":
+                raise RequestError(f"/{endpoint} expects GET", HTTPStatus.METHOD_NOT_ALLOWED)
+            params = dict(parse_qsl(url.query))
+            return HTTPStatus.OK, await self.generate(*parse_request(endpoint, params), params.get("tenant"))
+        except RequestError as e:
+            return e.status, {"error": str(e)}
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        except Exception:
+            traceback.print_exc()
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error"}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one connection until either side closes it"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    # Without a valid length the body cannot be skipped, so the connection ends here
+                    status, payload = HTTPStatus.BAD_REQUEST, {"error": f"Invalid Content-Length {headers['content-length']!r}"}
+                    keep_alive = False
+                elif length > MAX_BODY:
+                    status, payload = HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": f"Body larger than {MAX_BODY} bytes"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    connection = headers.get("connection", "").lower()
+                    keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+                    status, payload = await self.respond(method, target, body)
+                self.requests += 1
+
+                content = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(content)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + content
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception:
+            traceback.print_exc()
+            content = json.dumps({"error": "Internal server error"}).encode()
+            writer.write(
+                f"HTTP/1.1 500 Internal Server Error\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(content)}\r\n"
+                f"Connection: close\r\n\r\n".encode("latin-1") + content
+            )
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.AbstractServer:
+        """Start listening (and watching the catalog files) and return the asyncio server"""
+        if self.catalog_source is not None and self.reload_interval > 0:
+            self._watcher = asyncio.create_task(self._watch_catalog())
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    def close(self):
+        """Stop watching the catalog and shut down the worker processes"""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+def serve(
+    generator: TikTokContentGenerator = None,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    workers: int = 1,
+    catalog_source: Any = None,
+    reload_interval: float = 2.0,
+    tenants: Any = None
+):
+    """Run the HTTP service until interrupted"""
+    content_server = ContentServer(generator, workers, catalog_source, reload_interval, tenants)
+
+    async def run():
+        server = await content_server.start(host, port)
+        print(f"✅ Serving on http://{host}:{server.sockets[0].getsockname()[1]} (Ctrl+C to stop)")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        content_server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve TikTok content over HTTP"
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Address to listen on"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8080,
+        help="Port to listen on"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Seed for reproducible output"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes for large requests"
+    )
+    parser.add_argument(
+        "--catalog",
+        type=str,
+        metavar="PATH",
+        help="JSON catalog file or directory to serve and watch for changes"
+    )
+    parser.add_argument(
+        "--reload-interval",
+        type=float,
+        default=2.0,
+        metavar="SECONDS",
+        help="How often to check --catalog for changes (0 disables)"
+    )
+    parser.add_argument(
+        "--tenants",
+        type=str,
+        metavar="DIR",
+        help="Directory of <tenant>.json files to serve with ?tenant=ID (see tenants.py)"
+    )
+    parser.add_argument(
+        "--max-tenants",
+        type=int,
+        default=1000,
+        help="Most tenant generators to keep loaded"
+    )
+    parser.add_argument(
+        "--tenant-memory-mb",
+        type=float,
+        default=256,
+        metavar="MB",
+        help="Estimated memory limit for loaded tenant generators"
+    )
+    args = parser.parse_args()
+
+    catalog_source = None
+    catalog = None
+    if args.catalog:
+        from catalog_files import CatalogSource
+        catalog_source = CatalogSource(args.catalog)
+        try:
+            catalog = catalog_source.load()
+        except (OSError, ValueError) as e:
+            parser.error(f"invalid --catalog: {e}")
+    generator = TikTokContentGenerator(args.seed, catalog=catalog)
+    tenants = None
+    if args.tenants:
+        from tenants import tenant_registry
+        try:
+            tenants = tenant_registry(args.tenants, args.max_tenants, args.tenant_memory_mb, args.seed, generator.catalog)
+        except ValueError as e:
+            parser.error(str(e))
+    serve(generator, args.host, args.port, args.workers, catalog_source, args.reload_interval, tenants)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Tenants for TikTok Content Generator
+Keeps one generator per business, built on first use, in an LRU cache
+bounded by tenant count and estimated memory
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Set
+
+from catalog_files import build_catalog, parse_catalog_data
+from tiktok_content import ContentCatalog, HashtagGroup, TikTokContentGenerator, default_catalog
+
+
+TENANT_ID_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.-]{0,63}")
+
+DEFAULT_MAX_TENANTS = 1000
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def check_tenant_id(tenant_id: str) -> str:
+    """Return tenant_id if it is a valid tenant name, else raise ValueError"""
+    if not isinstance(tenant_id, str) or not TENANT_ID_PATTERN.fullmatch(tenant_id):
+        raise ValueError(f"Invalid tenant {tenant_id!r}: use up to 64 letters, digits, '.', '_' or '-'")
+    return tenant_id
+
+
+def tenant_catalog(data: Dict[str, Any], base: ContentCatalog = None, source: str = "tenant") -> ContentCatalog:
+    """Build a tenant's catalog from catalog file sections plus optional custom_hashtags
+
+    Custom hashtags become a "custom" hashtag group placed first, so every
+    post and hashtag set carries all of them.
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"{source}: a tenant file must hold a JSON object")
+    data = dict(data)
+    custom = data.pop("custom_hashtags", [])
+    if not isinstance(custom, list) or not all(isinstance(tag, str) and tag.strip("#") for tag in custom):
+        raise ValueError(f"{source}: custom_hashtags must be a list of hashtags")
+
+    base = base if base is not None else default_catalog()
+    catalog = build_catalog([parse_catalog_data(data, source)], base)
+    if custom:
+        tags = tuple(dict.fromkeys(f"#{tag.strip('#')}" for tag in custom))
+        groups = (HashtagGroup("custom", tags, len(tags)),) + catalog.hashtag_groups
+        catalog = catalog.replace(hashtag_groups=groups)
+    return catalog
+
+
+class TenantDirectory:
+    """Load tenants from <directory>/<tenant>.json files
+
+    Each file uses the catalog file format (see catalog_files.py) plus an
+    optional "custom_hashtags" list; sections it leaves out come from base.
+    """
+
+    def __init__(self, directory: str, base: ContentCatalog = None):
+        self.directory = directory
+        self.base = base if base is not None else default_catalog()
+
+    def __call__(self, tenant_id: str) -> ContentCatalog:
+        path = os.path.join(self.directory, f"{check_tenant_id(tenant_id)}.json")
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+        except FileNotFoundError:
+            raise KeyError(f"Unknown tenant {tenant_id!r}") from None
+        try:
+            data = json.loads(content)
+        except ValueError as e:
+            raise ValueError(f"{path}: invalid JSON: {e}") from None
+        return tenant_catalog(data, self.base, path)
+
+
+def estimate_size(value: Any, shared: Set[int] = frozenset(), _seen: Set[int] = None) -> int:
+    """Estimate the bytes held by value and everything it references
+
+    Objects whose id is in `shared` (e.g. those of the base catalog that
+    every tenant reuses) are not counted, since evicting a tenant does not
+    free them.
+    """
+    seen = _seen if _seen is not None else set()
+    stack = [value]
+    total = 0
+    while stack:
+        item = stack.pop()
+        key = id(item)
+        if key in seen or key in shared:
+            continue
+        seen.add(key)
+        total += sys.getsizeof(item)
+        if isinstance(item, (str, bytes, int, float, bool)) or item is None:
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (tuple, list, set, frozenset)):
+            stack.extend(item)
+        else:
+            for name in getattr(type(item), "__slots__", ()):
+                if hasattr(item, name):
+                    stack.append(getattr(item, name))
+            stack.extend(getattr(item, "__dict__", {}).values())
+    return total
+
+
+def _object_ids(value: Any) -> Set[int]:
+    ids = set()
+    estimate_size(value, _seen=ids)
+    return ids
+
+
+class Tenant:
+    """One tenant's generator and its estimated memory footprint"""
+
+    __slots__ = ("tenant_id", "generator", "size")
+
+    def __init__(self, tenant_id: str, generator: TikTokContentGenerator, size: int):
+        self.tenant_id = tenant_id
+        self.generator = generator
+        self.size = size
+
+
+class TenantRegistry:
+    """Build tenant generators on first use and keep the hot ones
+
+    loader(tenant_id) returns the tenant's ContentCatalog, raising KeyError
+    for unknown tenants. The least recently used tenants are evicted once
+    more than max_tenants are cached or their estimated memory exceeds
+    max_bytes. With a seed, every tenant's generator gets its own seed
+    derived from it, so output does not depend on eviction order.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], ContentCatalog],
+        max_tenants: int = DEFAULT_MAX_TENANTS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        seed: int = None,
+        base: ContentCatalog = None
+    ):
+        if max_tenants < 1:
+            raise ValueError(f"max_tenants must be at least 1, got {max_tenants}")
+        self.loader = loader
+        self.max_tenants = max_tenants
+        self.max_bytes = max_bytes
+        self.seed = seed
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._tenants = OrderedDict()
+        self._lock = threading.Lock()
+        self._shared = _object_ids(base if base is not None else default_catalog())
+
+    def tenant_seed(self, tenant_id: str) -> Any:
+        """Return the seed the tenant's generator gets, None without a registry seed"""
+        if self.seed is None:
+            return None
+        digest = hashlib.blake2b(f"{self.seed}:{tenant_id}".encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    def get(self, tenant_id: str) -> Tenant:
+        """Return the tenant, building its generator if it is not cached"""
+        with self._lock:
+            tenant = self._tenants.get(tenant_id)
+            if tenant is not None:
+                self._tenants.move_to_end(tenant_id)
+                self.hits += 1
+                return tenant
+            self.misses += 1
+
+        catalog = self.loader(tenant_id)
+        generator = TikTokContentGenerator(self.tenant_seed(tenant_id), catalog=catalog)
+        tenant = Tenant(tenant_id, generator, estimate_size(catalog, self._shared))
+
+        with self._lock:
+            existing = self._tenants.get(tenant_id)
+            if existing is not None:
+                self._tenants.move_to_end(tenant_id)
+                return existing
+            self._tenants[tenant_id] = tenant
+            self.bytes += tenant.size
+            while len(self._tenants) > 1 and (
+                len(self._tenants) > self.max_tenants or self.bytes > self.max_bytes
+            ):
+                _, evicted = self._tenants.popitem(last=False)
+                self.bytes -= evicted.size
+                self.evictions += 1
+        return tenant
+
+    def generator(self, tenant_id: str) -> TikTokContentGenerator:
+        """Return the tenant's generator"""
+        return self.get(tenant_id).generator
+
+    def evict(self, tenant_id: str) -> bool:
+        """Drop a tenant, e.g. after its file changed; return whether it was cached"""
+        with self._lock:
+            tenant = self._tenants.pop(tenant_id, None)
+            if tenant is None:
+                return False
+            self.bytes -= tenant.size
+            self.evictions += 1
+            return True
+
+    def __contains__(self, tenant_id: str) -> bool:
+        return tenant_id in self._tenants
+
+    def __len__(self) -> int:
+        return len(self._tenants)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache metrics as JSON-ready data"""
+        lookups = self.hits + self.misses
+        return {
+            "tenants": len(self._tenants),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+def tenant_registry(
+    directory: str,
+    max_tenants: int = DEFAULT_MAX_TENANTS,
+    memory_mb: float = DEFAULT_MAX_BYTES / (1024 * 1024),
+    seed: int = None,
+    base: ContentCatalog = None
+) -> TenantRegistry:
+    """Return a registry of the tenants in directory, as the --tenants options configure it"""
+    if not os.path.isdir(directory):
+        raise ValueError(f"--tenants {directory!r} is not a directory")
+    if memory_mb <= 0:
+        raise ValueError("--tenant-memory-mb must be positive")
+    base = base if base is not None else default_catalog()
+    return TenantRegistry(TenantDirectory(directory, base), max_tenants, int(memory_mb * 1024 * 1024), seed, base)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check tenant files and show their estimated memory"
+    )
+    parser.add_argument(
+        "directory",
+        help="Directory of <tenant>.json files"
+    )
+    args = parser.parse_args()
+
+    registry = TenantRegistry(TenantDirectory(args.directory))
+    failed = False
+    for name in sorted(os.listdir(args.directory)):
+        if not name.endswith(".json"):
+            continue
+        try:
+            tenant = registry.get(name[:-len(".json")])
+        except (LookupError, ValueError) as e:
+            print(f"❌ {name}: {e}")
+            failed = True
+            continue
+        catalog = tenant.generator.catalog
+        print(f"✅ {tenant.tenant_id}: catalog {catalog.version}, {len(catalog.topics)} topics, "
+              f"{len(catalog.all_hashtags)} hashtags, ~{tenant.size / 1024:.1f} KiB")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
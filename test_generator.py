@@ -4,8 +4,54 @@ Test suite for TikTok Content Generator
 Run this to verify everything works correctly
 """
 
+import asyncio
+import copy
+import io
+import json
+import marshal
+import os
+import pickle
+import random
 import sys
-from content_generator import TikTokContentGenerator
+import tempfile
+import warnings
+from collections import Counter
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from tiktok_content import (
+    CONTENT_MIX,
+    AliasTable,
+    CaptionTemplate,
+    HashtagGroup,
+    HashtagSampler,
+    Post,
+    RepeatAvoidingSampler,
+    TikTokContentGenerator,
+    _build_default_catalog,
+    _import_numpy,
+    _restore_catalog,
+    _snapshot_catalog,
+    complete_lines,
+    default_catalog,
+    format_post,
+    format_records,
+    render_caption,
+    shard_bounds,
+    write_buffered,
+    write_jsonl,
+)
+from post_archive import PostArchive, PostArchiveWriter
+from catalog_files import CatalogSource, catalog_to_dict
+from content_space import ContentSpace
+from dedup import CaptionIndex
+from hashtag_weights import tag_performance, weighted_groups
+from history import PostHistory
+from load_test import request
+from optimizer import ScheduleConstraints, check_plan, optimized_calendars, plan_schedule
+from profiling import Profiler
+from scoring import HEURISTICS, Scorer, TopicFreshness, candidate_blocks, top_candidates, top_k
+from server import ContentServer
+from tenants import TenantDirectory, TenantRegistry
 
 
 def test_hooks():
@@ -51,6 +97,7 @@ def test_video_concept():
     assert 'shots' in concept
     assert 'duration' in concept
     assert 'hook' in concept
+    assert concept['hook'] == concept['caption']['hook']
     print(f"✓ Video concept: {concept['title']}")
 
 
@@ -110,6 +157,783 @@ def test_difficulty_filter():
     print("✓ Difficulty filter working")
 
 
+def test_batch_generation():
+    """Test lazy batch generation"""
+    print("\nTesting batch generation...")
+    generator = TikTokContentGenerator()
+    batch = generator.generate_batch("post", 3)
+    assert not isinstance(batch, list)
+    posts = list(batch)
+    assert len(posts) == 3
+    assert all('caption' in post for post in posts)
+    days = list(generator.generate_batch("calendar", 8))
+    assert days[7]['content_type'] == days[0]['content_type']
+    try:
+        next(generator.generate_batch("unknown", 1))
+        assert False, "unknown kind should raise"
+    except ValueError:
+        pass
+    print("✓ Batch generation working")
+
+
+def test_jsonl_writer():
+    """Test streaming JSON Lines output"""
+    print("\nTesting JSONL writer...")
+    generator = TikTokContentGenerator()
+    stream = io.StringIO()
+    written = write_jsonl(generator.generate_batch("caption", 4), stream)
+    lines = stream.getvalue().splitlines()
+    assert written == 4
+    assert len(lines) == 4
+    assert all('full_caption' in json.loads(line) for line in lines)
+    print(f"✓ Streamed {written} records")
+
+
+def test_seeded_reproducibility():
+    """Test that a seed reproduces the same content"""
+    print("\nTesting seeded reproducibility...")
+    first = TikTokContentGenerator(seed=42)
+    second = TikTokContentGenerator(seed=42)
+    assert first.generate_post() == second.generate_post()
+    assert list(first.generate_batch("caption", 5)) == list(second.generate_batch("caption", 5))
+    print("✓ Seeded output is reproducible")
+
+
+def test_sharding():
+    """Test that shards split a batch into disjoint, reproducible slices"""
+    print("\nTesting sharded generation...")
+    start_date = datetime(2024, 1, 1)
+    whole = TikTokContentGenerator(seed=7).generate_content_calendar(30, start_date)
+    generator = TikTokContentGenerator(seed=7)
+    pieces = []
+    for index in range(4):
+        pieces.extend(generator.shard(index, 4).generate_content_calendar(30, start_date))
+    assert json.dumps(pieces) == json.dumps(whole)
+    assert shard_bounds(10, 3, 4) == (7, 10)
+    ideas = list(TikTokContentGenerator(seed=7).generate_batch("ideas", 4))
+    assert [idea for index in range(2) for idea in generator.shard(index, 2).generate_batch("ideas", 4)] == ideas
+    print("✓ 4 shards reproduce the unsharded calendar")
+
+
+def test_parallel_batch():
+    """Test that a process pool produces the same ordered output"""
+    print("\nTesting parallel batch generation...")
+    serial = TikTokContentGenerator(seed=3).generate_batch("caption", 1200)
+    parallel = TikTokContentGenerator(seed=3).generate_batch("caption", 1200, workers=2)
+    assert list(parallel) == list(serial)
+    print("✓ 2 workers match the single-process batch")
+
+
+def test_caption_templates():
+    """Test precompiled and user-supplied caption templates"""
+    print("\nTesting caption templates...")
+    template = CaptionTemplate("{{Promo}} {topic} today, {topic} forever")
+    assert template.render(topic="Paint correction") == "{Promo} Paint correction today, Paint correction forever"
+    generator = TikTokContentGenerator(caption_templates=["Book your {topic} now!"])
+    caption = generator.generate_caption("Glass cleaning")
+    assert caption['body'] == "Book your Glass cleaning now!"
+    for bad in ["Hello {name}", "Hi {topic!r}", "Oops {topic", "{}"]:
+        try:
+            CaptionTemplate(bad)
+            assert False, f"template {bad!r} should be rejected"
+        except ValueError:
+            pass
+    print("✓ Caption templates compile and validate")
+
+
+def test_shared_catalog():
+    """Test that generators share one immutable catalog"""
+    print("\nTesting shared catalog...")
+    first = TikTokContentGenerator()
+    second = TikTokContentGenerator()
+    assert first.catalog is second.catalog is default_catalog()
+    try:
+        first.catalog.hooks = ()
+        assert False, "catalog should be read-only"
+    except AttributeError:
+        pass
+    assert pickle.loads(pickle.dumps(first.catalog)) == first.catalog
+    custom = TikTokContentGenerator(catalog=first.catalog.replace(topics=("RV detailing",)))
+    assert custom.generate_caption()['topic'] == "RV detailing"
+    assert custom.catalog != first.catalog and custom.catalog.version != first.catalog.version
+    post = first.generate_compact_post()
+    assert pickle.loads(pickle.dumps(post)) == post and hash(copy.copy(post)) == hash(post)
+    import content_generator
+    assert content_generator.TikTokContentGenerator is TikTokContentGenerator
+    print("✓ Catalog is shared and immutable")
+
+
+def test_concept_filters():
+    """Test indexed video concept selection"""
+    print("\nTesting concept filters...")
+    generator = TikTokContentGenerator(seed=11)
+    for _ in range(50):
+        concept = generator.generate_video_concept("easy", "short")
+        assert concept['difficulty'] == "Easy"
+        assert int(concept['duration'].split()[0].split("-")[1]) <= 30
+        titles = generator.generate_video_concept(topic="Paint correction")['title']
+        assert titles not in ("Satisfying Dirt Extraction", "Gross to Gorgeous")
+    try:
+        generator.generate_video_concept("hard", "long")
+        assert False, "empty filter result should raise"
+    except ValueError as e:
+        assert "No video concepts match" in str(e)
+    print("✓ Concept filters working")
+
+
+def _chi_square_ok(observed, expected):
+    """Chi-square goodness of fit at p < 0.001 (Wilson-Hilferty critical value)"""
+    statistic = sum((observed.get(key, 0) - e) ** 2 / e for key, e in expected.items())
+    df = len(expected) - 1
+    critical = df * (1 - 2 / (9 * df) + 3.09 * (2 / (9 * df)) ** 0.5) ** 3
+    return statistic < critical
+
+
+def test_backend_distributions():
+    """Test that every sampling backend draws post components with the expected distributions"""
+    print("\nTesting sampling backend distributions...")
+    n = 12000
+    catalog = default_catalog()
+    backends = ["python"] + (["numpy"] if _import_numpy() else [])
+    
+    concept_expected = {}
+    for topic in catalog.topics:
+        candidates = catalog.concept_index.select(topic=topic)
+        for position in candidates:
+            title = catalog.video_concepts[position].title
+            concept_expected[title] = concept_expected.get(title, 0) + n / len(catalog.topics) / len(candidates)
+    tag_expected = {}
+    for group in catalog.hashtag_groups:
+        for tag in group.tags:
+            tag_expected[tag] = n * min(group.quota, len(group.tags)) / len(group.tags)
+    
+    for backend in backends:
+        posts = list(TikTokContentGenerator(seed=5).generate_batch("post", n, backend=backend))
+        hooks, angles, concepts, tags = {}, {}, {}, {}
+        for post in posts:
+            hooks[post['hook']] = hooks.get(post['hook'], 0) + 1
+            angles[post['trending_angle']] = angles.get(post['trending_angle'], 0) + 1
+            title = post['video_concept']['title']
+            concepts[title] = concepts.get(title, 0) + 1
+            for tag in post['hashtags']:
+                tags[tag] = tags.get(tag, 0) + 1
+        assert _chi_square_ok(hooks, {hook: n / len(catalog.hooks) for hook in catalog.hooks}), backend
+        assert _chi_square_ok(angles, {a: n / len(catalog.trending_angles) for a in catalog.trending_angles}), backend
+        assert _chi_square_ok(concepts, concept_expected), backend
+        # Tags within a group are not independent, so only check each group's spread
+        for group in catalog.hashtag_groups:
+            if len(group.tags) > 1:
+                assert _chi_square_ok(tags, {tag: tag_expected[tag] for tag in group.tags}), backend
+        
+        captions = list(TikTokContentGenerator(seed=6).generate_batch("caption", n, backend=backend))
+        topics, bodies = {}, {}
+        for caption in captions:
+            topics[caption['topic']] = topics.get(caption['topic'], 0) + 1
+            template = caption['body'].replace(caption['topic'], "{topic}")
+            bodies[template] = bodies.get(template, 0) + 1
+        assert _chi_square_ok(topics, {t: n / len(catalog.topics) for t in catalog.topics}), backend
+        assert _chi_square_ok(bodies, {t.source: n / len(catalog.caption_templates) for t in catalog.caption_templates}), backend
+    print(f"✓ Distributions match for backends: {', '.join(backends)}")
+
+
+def test_post_archive():
+    """Test compact posts and the binary archive round trip"""
+    print("\nTesting compact post archive...")
+    posts = list(TikTokContentGenerator(seed=2).generate_batch("post", 50))
+    compact = list(TikTokContentGenerator(seed=2).generate_batch("compact", 50))
+    assert all(isinstance(post, Post) for post in compact)
+    assert [post.to_dict(default_catalog()) for post in compact] == posts
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "posts.ttpa")
+        with PostArchiveWriter(path) as writer:
+            writer.write_all(compact)
+        with PostArchive(path) as archive:
+            assert len(archive) == 50
+            assert archive[17] == compact[17]
+            assert archive.expand(-1) == posts[-1]
+            assert os.path.getsize(path) < len(json.dumps(posts)) / 20
+        
+        large = default_catalog().replace(hooks=tuple(f"Hook {i}" for i in range(70000)))
+        try:
+            PostArchiveWriter(os.path.join(directory, "large.ttpa"), large)
+            assert False, "hook positions above 65535 should be rejected"
+        except ValueError as e:
+            assert "70000 hooks" in str(e)
+        assert not os.path.exists(os.path.join(directory, "large.ttpa"))
+    
+    other = default_catalog().replace(hooks=("Only hook",))
+    try:
+        compact[0].to_dict(other)
+        assert False, "expanding against another catalog should fail"
+    except ValueError:
+        pass
+    print("✓ Archive round trip working")
+
+
+def test_repeat_avoidance():
+    """Test window-based repeat avoidance and carrying its state across calls"""
+    print("\nTesting repeat avoidance...")
+    rng = random.Random(1)
+    sampler = RepeatAvoidingSampler(15, 10)
+    draws = [sampler.draw(rng) for _ in range(500)]
+    assert all(len(set(draws[i:i + 11])) == len(draws[i:i + 11]) for i in range(len(draws)))
+    assert set(draws) == set(range(15))
+    assert sampler.draw(rng, candidates=(3,)) == 3
+    
+    generator = TikTokContentGenerator(seed=9, repeat_window=7)
+    calendar = generator.generate_content_calendar(30)
+    hooks = [day['post']['hook'] for day in calendar]
+    assert all(len(set(hooks[i:i + 8])) == len(hooks[i:i + 8]) for i in range(len(hooks)))
+    
+    state = json.loads(json.dumps(generator.repeat_state()))
+    resumed = TikTokContentGenerator(seed=10, repeat_window=7)
+    resumed.load_repeat_state(state)
+    hooks += [resumed.generate_hook() for _ in range(20)]
+    assert all(len(set(hooks[i:i + 8])) == len(hooks[i:i + 8]) for i in range(len(hooks)))
+    print("✓ No repeats within the window")
+
+
+def test_profiling():
+    """Test that profiling records calls without changing output and unhooks cleanly"""
+    print("\nTesting profiling...")
+    original = TikTokContentGenerator.generate_post
+    expected = TikTokContentGenerator(seed=4).generate_content_calendar(5, datetime(2024, 1, 1))
+    
+    calls = []
+    with Profiler(trace_memory=False) as profiler:
+        profiler.add_hook(lambda name, elapsed, allocated: calls.append(name))
+        calendar = TikTokContentGenerator(seed=4).generate_content_calendar(5, datetime(2024, 1, 1))
+    assert calendar == expected
+    assert TikTokContentGenerator.generate_post is original
+    
+    stats = profiler.to_dict()
+    assert stats["TikTokContentGenerator.generate_post"]["calls"] == 5
+    assert stats["calendar_date"]["calls"] == 5
+    assert stats["render_post"]["own_s"] <= stats["TikTokContentGenerator.generate_post"]["total_s"]
+    assert calls.count("TikTokContentGenerator.generate_calendar_day") == 5
+    print("✓ Calls recorded and originals restored")
+
+
+def test_rendering():
+    """Test console rendering styles and the buffered writer"""
+    print("\nTesting rendering...")
+    generator = TikTokContentGenerator(seed=2)
+    post = generator.generate_post()
+    plain = format_post(post)
+    assert "🎬 VIDEO CONCEPT" in plain and post['caption'] in plain
+    assert "## 🎬 VIDEO CONCEPT" in format_post(post, "markdown")
+    no_emoji = format_post(post, "no-emoji")
+    assert "VIDEO CONCEPT" in no_emoji and "🎬" not in no_emoji and "✨" not in no_emoji
+    
+    captions = list(generator.generate_batch("caption", 50))
+    texts = list(format_records("caption", captions))
+    assert len(texts) == 51
+    tags = generator.generate_hashtags(3)
+    assert list(format_records("hashtags", tags))[1] == " ".join(tags) + "\n\n"
+    assert len(list(format_records("hashtags", [tags, tags]))) == 3
+    
+    class CountingStream(io.StringIO):
+        writes = 0
+        
+        def write(self, text):
+            CountingStream.writes += 1
+            return super().write(text)
+    
+    stream = CountingStream()
+    assert write_buffered(texts, stream, buffer_size=1 << 20) == 51
+    assert CountingStream.writes == 1
+    assert stream.getvalue() == "".join(texts)
+    print("✓ Styles rendered and written in one block")
+
+
+def test_http_service():
+    """Test the HTTP service over one keep-alive connection"""
+    print("\nTesting HTTP service...")
+    start = datetime(2024, 1, 1)
+    expected = TikTokContentGenerator(seed=6).generate_content_calendar(150, start)
+    content_server = ContentServer(TikTokContentGenerator(seed=6), workers=1)
+    
+    async def exchange():
+        server = await content_server.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        responses = [
+            await request(reader, writer, "GET", "/calendar?days=150&start_date=2024-01-01"),
+            await request(reader, writer, "GET", "/caption?count=3"),
+            await request(reader, writer, "POST", "/batch", b'[{"type": "post"}, {"type": "hashtags", "count": 4}]'),
+            await request(reader, writer, "GET", "/concept?difficulty=expert"),
+            await request(reader, writer, "POST", "/batch", b'[{"type": "hashtags", "include_custom": [1, 2]}]')
+        ]
+        writer.close()
+        await writer.wait_closed()
+        
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"POST /batch HTTP/1.1\r\nContent-Length: abc\r\n\r\n")
+        responses.append((int((await reader.readline()).split()[1]), b"{}"))
+        writer.close()
+        await writer.wait_closed()
+        
+        class BrokenPool:
+            def submit(self, *args):
+                raise BrokenProcessPool("worker died")
+            
+            def shutdown(self, wait=True):
+                pass
+        
+        content_server._executor = BrokenPool()
+        status, payload = await content_server.respond("GET", "/caption?count=200", b"")
+        responses.append((status, json.dumps(payload).encode()))
+        await asyncio.sleep(0.05)
+        server.close()
+        await server.wait_closed()
+        return responses
+    
+    try:
+        responses = asyncio.run(exchange())
+    finally:
+        content_server.close()
+    statuses = [status for status, _ in responses]
+    calendar, captions, batch, error = (json.loads(body) for _, body in responses[:4])
+    assert statuses == [200, 200, 200, 400, 400, 400, 503]
+    assert content_server._executor is None
+    assert calendar == json.loads(json.dumps(expected))
+    assert len(captions) == 3 and "full_caption" in captions[0]
+    assert "video_concept" in batch[0] and len(batch[1]) == 4
+    assert "difficulty" in error["error"]
+    assert content_server.requests == 6
+    print("✓ Keep-alive requests, batches and offloaded calendars served")
+
+
+def test_catalog_snapshot():
+    """Test that a catalog restored from its marshal snapshot matches a fresh build"""
+    print("\nTesting catalog snapshot...")
+    built = _build_default_catalog()
+    restored = _restore_catalog(marshal.loads(marshal.dumps(_snapshot_catalog(built))))
+    assert restored == built
+    assert restored.version == built.version
+    assert restored.concept_index.select("easy", "short") == built.concept_index.select("easy", "short")
+    assert restored.concept_index.select(topic="Unknown topic") == built.concept_index.select(topic="Unknown topic")
+    
+    start = datetime(2024, 1, 1)
+    expected = TikTokContentGenerator(seed=8, catalog=built).generate_content_calendar(10, start)
+    assert TikTokContentGenerator(seed=8, catalog=restored).generate_content_calendar(10, start) == expected
+    print("✓ Snapshot restores an identical catalog")
+
+
+def test_catalog_files():
+    """Test loading catalogs from JSON files and reloading changed files"""
+    print("\nTesting catalog files...")
+    with tempfile.TemporaryDirectory() as directory:
+        exported = os.path.join(directory, "full.json")
+        with open(exported, "w") as f:
+            json.dump(catalog_to_dict(default_catalog()), f)
+        assert CatalogSource(exported).load().version == default_catalog().version
+        os.remove(exported)
+        
+        with open(os.path.join(directory, "a.json"), "w") as f:
+            json.dump({"topics": ["RV detailing"], "hooks": ["First hook"]}, f)
+        with open(os.path.join(directory, "b.json"), "w") as f:
+            json.dump({"hooks": ["Second hook"]}, f)
+        source = CatalogSource(directory)
+        catalog = source.load()
+        assert catalog.topics == ("RV detailing",)
+        assert catalog.hooks == ("First hook", "Second hook")
+        assert catalog.video_concepts == default_catalog().video_concepts
+        assert source.reload() is None
+        
+        generator = TikTokContentGenerator(seed=1, catalog=catalog)
+        with open(os.path.join(directory, "a.json"), "w") as f:
+            json.dump({"topics": ["Boat detailing"], "hooks": ["First hook"]}, f)
+        generator.catalog = source.reload()
+        assert generator.generate_caption()["topic"] == "Boat detailing"
+        
+        with open(os.path.join(directory, "b.json"), "w") as f:
+            f.write('{"hooks": [')
+        try:
+            source.reload()
+            assert False, "Invalid catalog file should raise"
+        except ValueError as e:
+            assert "b.json" in str(e)
+        assert source.catalog is generator.catalog
+        
+        concept = {"title": "Dock Day", "description": "Boat", "shots": ["Hull"], "duration": 30, "difficulty": "Easy"}
+        group = {"name": "location", "tags": ["#Lake"], "quota": True}
+        for bad in ({"video_concepts": [concept]}, {"hashtag_groups": [group]}):
+            with open(os.path.join(directory, "b.json"), "w") as f:
+                json.dump(bad, f)
+            try:
+                source.reload()
+                assert False, "Badly typed catalog values should raise"
+            except ValueError as e:
+                assert "duration" in str(e) or "quota" in str(e)
+    print("✓ Files loaded, changes reloaded and bad files rejected")
+
+
+def test_tenants():
+    """Test per-tenant generators, LRU eviction and tenant requests to the server"""
+    print("\nTesting tenants...")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, topic in (("acme", "RV detailing"), ("boats", "Boat detailing"), ("cars", "Car detailing")):
+            with open(os.path.join(directory, f"{name}.json"), "w") as f:
+                json.dump({"topics": [topic], "custom_hashtags": [f"#{name}", "local"]}, f)
+        registry = TenantRegistry(TenantDirectory(directory), max_tenants=2, seed=9)
+        
+        acme = registry.generator("acme")
+        assert acme.generate_caption()["topic"] == "RV detailing"
+        assert sorted(acme.generate_hashtags(5)[:2]) == ["#acme", "#local"]
+        assert registry.generator("acme") is acme
+        registry.generator("boats")
+        registry.generator("acme")
+        registry.generator("cars")
+        assert "acme" in registry and "boats" not in registry and len(registry) == 2
+        stats = registry.stats()
+        assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 3, 1)
+        assert stats["bytes"] > 0
+        try:
+            registry.generator("missing")
+            assert False, "Unknown tenant should raise"
+        except KeyError:
+            pass
+        
+        fresh = TenantRegistry(TenantDirectory(directory), seed=9).generator("boats")
+        assert fresh.generate_post() == TenantRegistry(TenantDirectory(directory), seed=9).generator("boats").generate_post()
+        assert registry.tenant_seed("boats") not in (9, registry.tenant_seed("cars"))
+        single = TikTokContentGenerator(registry.tenant_seed("cars"), catalog=TenantDirectory(directory)("cars"))
+        assert single.generate_post() == TenantRegistry(TenantDirectory(directory), seed=9).generator("cars").generate_post()
+        
+        content_server = ContentServer(TikTokContentGenerator(seed=9), workers=1, tenants=registry)
+        expected = TenantRegistry(TenantDirectory(directory), seed=9).generator("cars").generate_content_calendar(120, datetime(2024, 1, 1))
+        
+        async def exchange():
+            return [
+                await content_server.respond("GET", "/caption?tenant=boats", b""),
+                await content_server.respond("GET", "/calendar?days=120&start_date=2024-01-01&tenant=cars", b""),
+                await content_server.respond("POST", "/batch", b'[{"type": "hashtags", "count": 3, "tenant": "acme"}]'),
+                await content_server.respond("GET", "/post?tenant=nobody", b""),
+                await content_server.respond("GET", "/health", b"")
+            ]
+        
+        try:
+            caption, calendar, batch, missing, health = asyncio.run(exchange())
+        finally:
+            content_server.close()
+        assert caption[1]["topic"] == "Boat detailing"
+        assert json.loads(json.dumps(calendar[1])) == json.loads(json.dumps(expected))
+        assert sorted(batch[1][0][:2]) == ["#acme", "#local"]
+        assert missing[0] == 404
+        assert health[1]["tenants"]["tenants"] == 2
+    print("✓ Tenants isolated, evicted least recently used and served by ?tenant=")
+
+
+def test_history():
+    """Test that recorded history keeps recently used items out of new content"""
+    print("\nTesting posting history...")
+    catalog = default_catalog()
+    with PostHistory(":memory:", "acme") as history:
+        first = TikTokContentGenerator(seed=3).generate_content_calendar(5, datetime(2024, 3, 1))
+        assert history.record(catalog, "calendar", first) == 25
+        caption = TikTokContentGenerator(seed=3).generate_caption("RV detailing")
+        history.record(catalog, "caption", [caption], used_on=datetime(2024, 3, 2).date())
+        
+        exclusions = history.exclusions(catalog, days=30, today=datetime(2024, 3, 10).date())
+        assert {catalog.hooks[position] for position in exclusions["hook"]} == (
+            {day["post"]["hook"] for day in first} | {caption["hook"]}
+        )
+        assert len(exclusions["template"]) >= 1
+        assert history.exclusions(catalog, days=3, today=datetime(2024, 3, 10).date()) == {}
+        usage = history.usage(catalog, "topic", days=30, today=datetime(2024, 3, 10).date())
+        assert sum(usage.values()) == 5 and set(usage) == exclusions["topic"]
+        
+        generator = TikTokContentGenerator(seed=3)
+        generator.set_exclusions(exclusions)
+        second = generator.generate_content_calendar(20, datetime(2024, 3, 10))
+        assert not {day["post"]["hook"] for day in second} & {catalog.hooks[position] for position in exclusions["hook"]}
+        assert not {day["post"]["trending_angle"] for day in second} & {day["post"]["trending_angle"] for day in first}
+        
+        history.tenant = "other"
+        assert history.exclusions(catalog, days=30, today=datetime(2024, 3, 10).date()) == {}
+    
+    generator = TikTokContentGenerator(seed=3)
+    generator.set_exclusions({"hook": range(len(catalog.hooks))})
+    assert generator.generate_hook() in catalog.hooks
+    print("✓ Recent hooks, templates, topics, concepts and angles excluded per tenant")
+
+
+def test_calendar_extension():
+    """Test extending a calendar and resuming a batch after the records already written"""
+    print("\nTesting calendar extension and resuming...")
+    start = datetime(2024, 5, 1)
+    full = TikTokContentGenerator(seed=12).generate_content_calendar(10, start)
+    first = TikTokContentGenerator(seed=12).generate_content_calendar(4, start)
+    extension = TikTokContentGenerator(seed=12).extend_calendar(first, 6)
+    assert first + extension == full
+    assert [day["content_type"] for day in extension] == [day["content_type"] for day in full[4:]]
+    try:
+        TikTokContentGenerator(seed=12).extend_calendar(first[:2] + first[3:], 1)
+        assert False, "A calendar with a gap should not be extended"
+    except ValueError:
+        pass
+    
+    posts = list(TikTokContentGenerator(seed=12).generate_batch("post", 30))
+    assert list(TikTokContentGenerator(seed=12).generate_batch("post", 30, skip=18)) == posts[18:]
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "posts.jsonl")
+        with open(path, "w") as f:
+            write_jsonl(posts[:5], f)
+            f.write(json.dumps(posts[5])[:40])
+        assert complete_lines(path) == 5
+        with open(path, "a") as f:
+            write_jsonl(TikTokContentGenerator(seed=12).generate_batch("post", 30, skip=5), f, flush_every=10)
+        with open(path) as f:
+            assert [json.loads(line) for line in f] == json.loads(json.dumps(posts))
+    print("✓ Extended calendars and resumed batches match uninterrupted runs")
+
+
+def test_schedule_optimizer():
+    """Test calendar plans under difficulty caps, spacing and weekday preferences"""
+    print("\nTesting schedule optimizer...")
+    catalog = default_catalog()
+    start = datetime(2024, 1, 1)
+    plain = plan_schedule(catalog, 14, start, seed=1)[0]
+    assert [content_type for content_type, _ in plain] == [CONTENT_MIX[i % len(CONTENT_MIX)] for i in range(14)]
+    
+    constraints = ScheduleConstraints(
+        max_per_week={"Hard": 1, "Medium": 3},
+        concept_spacing=6,
+        weekday_types={"Saturday": "before_after"},
+        weekday_durations={"Monday": "short"},
+        distinct_accounts=True
+    )
+    plans = plan_schedule(catalog, 365, start, constraints, accounts=5, seed=1)
+    for plan in plans:
+        assert len(plan) == 365
+        assert check_plan(catalog, plan, start, constraints) == []
+    for day in range(365):
+        assert len({plan[day][1] for plan in plans}) == 5
+    assert plans == plan_schedule(catalog, 365, start, constraints, accounts=5, seed=1)
+    
+    calendar = optimized_calendars(TikTokContentGenerator(seed=1), 21, start, constraints)[0]
+    plan = plan_schedule(catalog, 21, start, constraints, seed=1)[0]
+    assert [day["post"]["video_concept"]["title"] for day in calendar] == [catalog.video_concepts[c].title for _, c in plan]
+    assert all(day["content_type"] == "before_after" for day in calendar if day["day"] == "Saturday")
+    
+    try:
+        plan_schedule(catalog, 30, start, ScheduleConstraints(concept_spacing=len(catalog.video_concepts) + 1))
+        assert False, "An impossible spacing should raise"
+    except ValueError:
+        pass
+    try:
+        ScheduleConstraints.from_dict({"max_per_week": ["Hard"]})
+        assert False, "A badly typed constraint should raise"
+    except ValueError as e:
+        assert "max_per_week" in str(e)
+    print("✓ Plans meet every constraint, with distinct concepts across accounts")
+
+
+def test_content_space():
+    """Test ranking, unranking, partitions and shuffled walks of the content space"""
+    print("\nTesting content space...")
+    catalog = default_catalog()
+    space = ContentSpace(catalog)
+    assert len(space) == (
+        len(catalog.topics) * len(catalog.hooks) * len(catalog.caption_templates)
+        * len(catalog.video_concepts) * len(catalog.trending_angles)
+    )
+    assert list(space[:500]) == [space.unrank(rank) for rank in range(500)]
+    for rank in (0, 1, 12345, len(space) - 1):
+        assert space.rank(space[rank]) == rank
+    assert space[-1] == tuple(size - 1 for size in space.sizes)
+    
+    strided = space.every(1000, 3)
+    assert len(strided) == len(range(3, len(space), 1000))
+    assert strided[2] == space[2003] and space[2003] in strided and space[2004] not in strided
+    
+    parts = [space.partition(i, 4) for i in range(4)]
+    assert sum(len(part) for part in parts) == len(space)
+    assert parts[1][0] == space[len(parts[0])]
+    
+    shuffled = space.shuffled(7)
+    ranks = [shuffled.ranks[i] for i in range(len(shuffled))]
+    assert sorted(ranks) == list(range(len(space)))
+    assert ranks != list(range(len(space)))
+    assert [shuffled.ranks[i] for i in range(10)] == [space.shuffled(7).ranks[i] for i in range(10)]
+    
+    post = space.post(4321, (0, 1))
+    assert post.to_dict(catalog)["hook"] == catalog.hooks[space[4321][1]]
+    print("✓ Combinations ranked, unranked, strided, partitioned and shuffled lazily")
+
+
+def test_dedup():
+    """Test near-duplicate caption detection and its use in batches"""
+    print("\nTesting caption deduplication...")
+    catalog = default_catalog()
+    index = CaptionIndex()
+    first = render_caption(catalog, catalog.topics[0], 0, 0)["full_caption"]
+    index.add(first)
+    assert index.is_duplicate(first)
+    assert index.is_duplicate(render_caption(catalog, catalog.topics[1], 0, 0)["full_caption"])
+    assert not index.is_duplicate(render_caption(catalog, catalog.topics[0], 0, 1)["full_caption"])
+    assert not index.check_and_add(first) and len(index) == 1
+    
+    def captions(index):
+        generator = TikTokContentGenerator(seed=5)
+        generator.caption_index = index
+        return [caption["full_caption"] for caption in generator.generate_batch("caption", 40)]
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "captions.idx")
+        index = CaptionIndex()
+        batch = captions(index)
+        assert batch == captions(CaptionIndex())
+        checker = CaptionIndex()
+        assert all(checker.check_and_add(caption) for caption in batch)
+        index.save(path)
+        loaded = CaptionIndex.load(path)
+        assert loaded.stats() == index.stats()
+        assert all(loaded.is_duplicate(caption) for caption in batch)
+        assert not set(captions(loaded)) & set(batch)
+    print("✓ Near-duplicate captions redrawn, index saved and reloaded")
+
+
+def test_scoring():
+    """Test candidate scoring and bounded top-k selection"""
+    print("\nTesting candidate scoring...")
+    generator = TikTokContentGenerator(seed=8)
+    for backend in ("python", "numpy"):
+        blocks = list(candidate_blocks(TikTokContentGenerator(seed=8), "post", 1200, backend))
+        posts = list(TikTokContentGenerator(seed=8).generate_batch("compact", 1200, backend=backend))
+        assert [len(block["hook"]) for block in blocks] == [500, 500, 200]
+        assert blocks[2]["hook"][-1] == posts[-1].hook and tuple(blocks[2]["tags"][-1]) == posts[-1].tags
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        # the default backend falls back to python without warning when it has to
+        assert [len(block["hook"]) for block in candidate_blocks(TikTokContentGenerator(seed=8, repeat_window=3), "post", 10)] == [10]
+    
+    scores = [[0.5, 2.0, 1.0], [2.0, 3.0]]
+    columns = [{"hook": [0, 1, 2]}, {"hook": [1, 4]}]
+    best = top_k(zip(scores, columns), 3)
+    assert best == [(3.0, {"hook": 4}), (2.0, {"hook": 1}), (1.0, {"hook": 2})]
+    
+    used = {topic: 1 for topic in range(1, len(generator.catalog.topics))}
+    fresh = Scorer({"hook": 0, "length": 0, "hashtags": 0}, {**HEURISTICS, "freshness": TopicFreshness(used)})
+    captions = top_candidates(TikTokContentGenerator(seed=8), "caption", 5, 2000, fresh)
+    assert all(caption["topic"] == generator.catalog.topics[0] for _, caption in captions)
+    assert len({caption["full_caption"] for _, caption in captions}) == 5
+    
+    best = top_candidates(TikTokContentGenerator(seed=8), "post", 10, 3000)
+    assert [score for score, _ in best] == sorted((score for score, _ in best), reverse=True)
+    assert best == top_candidates(TikTokContentGenerator(seed=8), "post", 10, 3000, Scorer())
+    pool = [score for block in candidate_blocks(TikTokContentGenerator(seed=8), "post", 3000) for score in Scorer().score(generator.catalog, block)]
+    assert best[0][0] == max(pool) and best[-1][0] == sorted(pool, reverse=True)[9]
+    assert "video_concept" in best[0][1]
+    print("✓ Best candidates picked from scored blocks without sorting the pool")
+
+
+def test_caption_budget():
+    """Test fitting captions and hashtags into a character budget"""
+    print("\nTesting caption budget...")
+    generator = TikTokContentGenerator(seed=9)
+    post = generator.generate_post()
+    used = len(post['caption']) + 2 + len(" ".join(post['hashtags']))
+    assert post['caption_budget'] == {"used": used, "limit": 2200}
+    assert f"Length: {used}/2200 characters" in format_post(post)
+    
+    generator.caption_budget = 180
+    for _ in range(200):
+        post = generator.generate_post()
+        tags = 2 + len(" ".join(post['hashtags'])) if post['hashtags'] else 0
+        assert post['caption_budget']['used'] == len(post['caption']) + tags <= 180
+    
+    hashtags = generator.generate_hashtags(20, ["mybrand"])
+    assert len(hashtags) == len(set(hashtags)) == 20 and hashtags[-1] == "#mybrand"
+    short = generator.generate_hashtags(15, ["mybrand"], budget=40)
+    assert "#mybrand" in short and len(" ".join(short)) <= 40
+    
+    # Fewer tags than the quotas add up to are split over every group
+    catalog = generator.catalog
+    group_of = {tag: group.name for group in catalog.hashtag_groups for tag in group.tags}
+    seen = Counter()
+    for _ in range(500):
+        few = generator.generate_hashtags(5)
+        assert len(few) == len(set(few)) == 5
+        seen.update(group_of[tag] for tag in few)
+    assert set(seen) == {group.name for group in catalog.hashtag_groups}
+    assert abs(seen["location"] / 500 - 5 * 2 / 14) < 0.1
+    np = _import_numpy()
+    if np is not None:
+        rows = HashtagSampler(catalog).draw_block(np.random.default_rng(3), 500, 3)
+        assert rows.shape == (500, 3) and len({group_of[catalog.all_hashtags[tag]] for tag in rows.ravel().tolist()}) == 5
+    
+    lengths = generator._caption_lengths()
+    topic = generator.catalog.topics[0]
+    generator.caption_budget = lengths.shortest_caption(topic)
+    assert len(generator.generate_caption(topic)["full_caption"]) == generator.caption_budget
+    generator.caption_budget = 20
+    try:
+        generator.generate_caption()
+        assert False, "a caption longer than the budget was accepted"
+    except ValueError:
+        pass
+    print("✓ Posts fit the budget and report how much of it they use")
+
+
+def test_hashtag_weights():
+    """Test weighted hashtag draws from alias tables"""
+    print("\nTesting weighted hashtags...")
+    table = AliasTable([6, 3, 1, 0])
+    rng = random.Random(4)
+    counts = [0] * 4
+    for _ in range(20000):
+        picks = table.sample(rng, 2)
+        assert len(set(picks)) == 2
+        for pick in picks:
+            counts[pick] += 1
+    # Exact inclusion odds of weighted draws without replacement: 0.924, 0.783, 0.293, 0
+    assert abs(counts[0] / 20000 - 0.924) < 0.01 and abs(counts[2] / 20000 - 0.293) < 0.01 and counts[3] == 0
+    assert sorted(table.sample(rng, 5)) == [0, 1, 2]
+    
+    catalog = default_catalog()
+    assert HashtagGroup("core", catalog.hashtag_groups[0].tags, 3) == catalog.hashtag_groups[0]
+    weighted = catalog.replace(hashtag_groups=tuple(
+        HashtagGroup(group.name, group.tags, group.quota, (50,) + (1,) * (len(group.tags) - 1), 1 + i)
+        for i, group in enumerate(catalog.hashtag_groups)
+    ))
+    firsts = {group.tags[0] for group in weighted.hashtag_groups}
+    generator = TikTokContentGenerator(seed=4, catalog=weighted)
+    posts = [generator.generate_post()['hashtags'] for _ in range(200)]
+    assert sum(len(firsts & set(tags)) for tags in posts) > 0.9 * 200 * len(firsts)
+    tags = generator.generate_hashtags(20)
+    assert len(set(tags)) == 20
+    
+    if _import_numpy() is not None:
+        rows = list(generator.generate_batch("hashtags", 600, backend="numpy", count=20))
+        assert all(len(set(row)) == 20 for row in rows)
+        assert sum(len(firsts & set(row)) for row in rows) > 0.9 * 600 * len(firsts)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "weighted.json")
+        with open(path, "w") as f:
+            json.dump(catalog_to_dict(weighted), f)
+        assert CatalogSource(path).load().version == weighted.version
+    
+    large = catalog.replace(hashtag_groups=(HashtagGroup("all", tuple(f"#tag{i}" for i in range(3000)), 3),))
+    generator = TikTokContentGenerator(seed=4, catalog=large)
+    assert len(set(generator.generate_hashtags(40))) == 40
+    if _import_numpy() is not None:
+        rows = list(generator.generate_batch("hashtags", 600, backend="numpy", count=40))
+        assert all(len(set(row)) == 40 for row in rows)
+    
+    records = [{"hashtags": ["#CarTok", "#CarCare"], "views": 900}, {"hashtags": ["#CarCare"], "views": 100}]
+    performance = tag_performance(records, prior=0)
+    assert performance == {"cartok": 1.8, "carcare": 1.0}
+    learned = weighted_groups(catalog, performance)
+    engagement = next(group for group in learned if "#CarTok" in group.tags)
+    cartok = engagement.tags.index("#CarTok")
+    assert abs(engagement.weight * engagement.weights[cartok] - 1.8) < 1e-3
+    print("✓ Hashtags drawn by tag and group weight in both backends")
+
+
 def run_all_tests():
     """Run all tests"""
     print("="*60)
@@ -125,7 +949,32 @@ def run_all_tests():
         test_complete_post,
         test_content_calendar,
         test_topic_specific,
-        test_difficulty_filter
+        test_difficulty_filter,
+        test_batch_generation,
+        test_jsonl_writer,
+        test_seeded_reproducibility,
+        test_sharding,
+        test_parallel_batch,
+        test_caption_templates,
+        test_shared_catalog,
+        test_concept_filters,
+        test_backend_distributions,
+        test_post_archive,
+        test_repeat_avoidance,
+        test_profiling,
+        test_rendering,
+        test_http_service,
+        test_catalog_snapshot,
+        test_catalog_files,
+        test_tenants,
+        test_history,
+        test_calendar_extension,
+        test_schedule_optimizer,
+        test_content_space,
+        test_dedup,
+        test_scoring,
+        test_caption_budget,
+        test_hashtag_weights
     ]
     
     passed = 0
@@ -0,0 +1,2887 @@
+#!/usr/bin/env python3
+"""
+TikTok Content Generator for Mobile Detailing Business
+Generates engaging content ideas, captions, hooks, and hashtags
+
+The catalog, generator and command line live here; content_generator.py is
+the thin script that runs main(), so a CLI call loads this module from
+cached bytecode instead of compiling it every time.
+"""
+
+# Modules only some commands need (argparse, json, datetime, hashlib,
+# string, re, copy, concurrent.futures) are imported where they are used, so
+# a single short CLI call or a plain import starts quickly
+
+import heapq
+import marshal
+import math
+import os
+import random
+import sys
+import warnings
+from collections import deque
+from typing import List, Dict, Any, Iterator, IO, Iterable, Sequence, Tuple
+
+
+BATCH_KINDS = ("ideas", "post", "caption", "hashtags", "concept", "calendar", "compact")
+
+BEST_POSTING_TIMES = (
+    "7-9 AM (morning commute)",
+    "12-2 PM (lunch break)",
+    "7-10 PM (evening scrolling)"
+)
+
+ENGAGEMENT_TIPS = (
+    "Respond to comments within first hour",
+    "Pin a comment asking viewers to book",
+    "Use a call-to-action in your caption",
+    "Add location tags to reach local audience"
+)
+
+CAPTION_TEMPLATES = (
+    "POV: Your car hasn't been detailed in 2 years and you finally book us 😍 The {topic} transformation is insane! Drop a 🔥 if you need this!",
+    "This {topic} took 3 hours but look at this result ✨ Tag someone whose car needs this ASAP!",
+    "When they say they 'just cleaned' their car 😅 Here's what professional {topic} actually looks like 👀",
+    "Real talk: {topic} is so underrated 💯 Your car will thank you! Who's booking their appointment? 👇",
+    "The {topic} before and after that has everyone talking 🗣️ DM to book your transformation!",
+    "Everyone asks how we get results like this with {topic}... Here's the secret 🤫",
+    "This is why {topic} should be done every 6 months minimum! The difference is crazy 🤯",
+    "POV: You trusted us with your car and now it looks better than when you bought it 🚗✨ Thanks for trusting our {topic} service!",
+    "I've been doing {topic} for years and this is still so satisfying to watch 😌 Drop a ❤️ if you agree!",
+    "Your car after our {topic} service >>> Any car wash 💪 Book now, spots filling up fast!"
+)
+
+# Placeholders a caption template may use
+CAPTION_FIELDS = ("topic",)
+
+# TikTok's caption limit in characters; the hashtags count towards it
+CAPTION_LIMIT = 2200
+
+# Items per task handed to a worker process; large enough to amortise
+# pickling, small enough to keep every worker busy and memory bounded.
+# Chunks are aligned to multiples of this size, which also fixes the
+# blocks the numpy backend draws at once.
+PARALLEL_CHUNK_SIZE = 500
+
+# Sampling backends for batches; "numpy" draws whole chunks of posts,
+# captions or hashtag sets at once and needs NumPy installed
+BACKENDS = ("python", "numpy")
+BULK_KINDS = ("post", "caption", "hashtags", "compact")
+
+# Duration buckets by the upper end of a concept's duration range, in seconds
+DURATION_BUCKETS = (
+    ("short", 30),
+    ("medium", 45),
+    ("long", None)
+)
+
+# Console rendering styles; "no-emoji" is plain with every emoji removed
+RENDER_STYLES = ("plain", "markdown", "no-emoji")
+
+# Characters of rendered text collected before each write to the console
+RENDER_BUFFER_SIZE = 1 << 20
+
+# Records between flushes of a --resume output, bounding the work a killed
+# run loses; the run's settings live next to it in <output>.ckpt until it ends
+CHECKPOINT_INTERVAL = 1000
+CHECKPOINT_SUFFIX = ".ckpt"
+
+EMOJI_PATTERN = "[\U0001F000-\U0001FAFF\u2300-\u23FF\u2600-\u27BF\u2B00-\u2BFF\uFE0F\u200D]+ *"
+_emoji_regex = None
+
+CONTENT_MIX = [
+    "before_after",
+    "tutorial",
+    "satisfying",
+    "educational",
+    "behind_scenes",
+    "customer_reaction",
+    "trending"
+]
+
+
+class CaptionTemplate:
+    """A caption body with {placeholder} fields, parsed once and filled by concatenation
+    
+    The source uses str.format syntax ("Book your {topic} today!"); only the
+    names in `fields` are accepted and format specs or conversions are
+    rejected, so a bad user template fails when it is compiled rather than
+    halfway through a batch.
+    """
+    
+    __slots__ = ("source", "fields", "_literals", "_names")
+    
+    def __init__(self, source: str, fields: Iterable[str] = CAPTION_FIELDS):
+        allowed = set(fields)
+        literals = []
+        names = []
+        pending = ""
+        import string
+        try:
+            parsed = list(string.Formatter().parse(source))
+        except ValueError as e:
+            raise ValueError(f"Invalid caption template {source!r}: {e}") from None
+        
+        for literal, name, format_spec, conversion in parsed:
+            pending += literal
+            if name is None:
+                continue
+            if name not in allowed:
+                raise ValueError(
+                    f"Invalid caption template {source!r}: unknown placeholder {{{name}}}, "
+                    f"expected one of {', '.join('{' + f + '}' for f in sorted(allowed))}"
+                )
+            if format_spec or conversion:
+                raise ValueError(f"Invalid caption template {source!r}: format specs are not supported in {{{name}}}")
+            literals.append(pending)
+            names.append(name)
+            pending = ""
+        literals.append(pending)
+        
+        self.source = source
+        self.fields = tuple(dict.fromkeys(names))
+        self._literals = tuple(literals)
+        self._names = tuple(names)
+    
+    def render(self, **values: str) -> str:
+        """Fill in the placeholders"""
+        literals = self._literals
+        parts = [literals[0]]
+        for i, name in enumerate(self._names, 1):
+            parts.append(values[name])
+            parts.append(literals[i])
+        return "".join(parts)
+    
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, CaptionTemplate):
+            return NotImplemented
+        return self.source == other.source
+    
+    def __hash__(self) -> int:
+        return hash(self.source)
+    
+    def __reduce__(self):
+        return CaptionTemplate, (self.source, self.fields)
+    
+    def __repr__(self) -> str:
+        return f"CaptionTemplate({self.source!r})"
+
+
+def compile_caption_templates(sources: Iterable[Any]) -> Tuple[CaptionTemplate, ...]:
+    """Compile and validate caption templates given as strings or CaptionTemplate objects"""
+    templates = tuple(
+        source if isinstance(source, CaptionTemplate) else CaptionTemplate(source)
+        for source in sources
+    )
+    if not templates:
+        raise ValueError("At least one caption template is required")
+    return templates
+
+
+class _Record:
+    """Base of the immutable catalog and post records
+    
+    Subclasses name their fields in _fields, set them once in __init__ and
+    are compared, hashed and printed by them. These are plain __slots__
+    classes rather than dataclasses, which would put `dataclasses` (and
+    the `inspect` module it imports) on every CLI call's start-up.
+    """
+    
+    __slots__ = ()
+    
+    _fields = ()
+    
+    def _values(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in self._fields)
+    
+    def __eq__(self, other: Any) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._values() == other._values()
+    
+    def __hash__(self) -> int:
+        return hash(self._values())
+    
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"{type(self).__name__} is immutable; cannot assign to {name!r}")
+    
+    def __delattr__(self, name: str):
+        raise AttributeError(f"{type(self).__name__} is immutable; cannot delete {name!r}")
+    
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({fields})"
+
+
+class VideoConcept(_Record):
+    """A video format with its shot list and the topics it suits
+    
+    topics lists the topics this concept suits; empty means any topic.
+    """
+    
+    __slots__ = _fields = ("title", "description", "shots", "duration", "difficulty", "topics")
+    
+    def __init__(self, title: str, description: str, shots: Tuple[str, ...], duration: str, difficulty: str, topics: Tuple[str, ...]):
+        object.__setattr__(self, "title", title)
+        object.__setattr__(self, "description", description)
+        object.__setattr__(self, "shots", shots)
+        object.__setattr__(self, "duration", duration)
+        object.__setattr__(self, "difficulty", difficulty)
+        object.__setattr__(self, "topics", topics)
+    
+    def __reduce__(self):
+        return VideoConcept, (self.title, self.description, self.shots, self.duration, self.difficulty, self.topics)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the concept as a plain, JSON-ready dict"""
+        return {
+            "title": self.title,
+            "description": self.description,
+            "shots": list(self.shots),
+            "duration": self.duration,
+            "difficulty": self.difficulty
+        }
+
+
+class HashtagGroup(_Record):
+    """A named group of hashtags, how many of them go into each post and how often each is picked
+    
+    weights holds one non-negative weight per tag (empty means all equal);
+    weight scales the whole group when tags are drawn beyond the quotas.
+    """
+    
+    __slots__ = _fields = ("name", "tags", "quota", "weights", "weight")
+    
+    def __init__(self, name: str, tags: Tuple[str, ...], quota: int, weights: Tuple[float, ...] = (), weight: float = 1.0):
+        weights = tuple(float(w) for w in weights)
+        if weights and len(weights) != len(tags):
+            raise ValueError(f"Hashtag group {name!r} has {len(tags)} tags but {len(weights)} weights")
+        if any(not w >= 0 for w in weights) or not weight >= 0:
+            raise ValueError(f"Hashtag group {name!r} weights must be non-negative numbers")
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "tags", tags)
+        object.__setattr__(self, "quota", quota)
+        object.__setattr__(self, "weights", weights)
+        object.__setattr__(self, "weight", float(weight))
+    
+    def __reduce__(self):
+        return HashtagGroup, (self.name, self.tags, self.quota, self.weights, self.weight)
+    
+    def __repr__(self) -> str:
+        # Unweighted groups keep their old repr, and so catalogs their version
+        weighting = f", weights={self.weights!r}, weight={self.weight!r}" if self.weights or self.weight != 1.0 else ""
+        return f"HashtagGroup(name={self.name!r}, tags={self.tags!r}, quota={self.quota!r}{weighting})"
+
+
+def duration_bucket(duration: str) -> str:
+    """Return the DURATION_BUCKETS name for a duration such as '15-30 seconds'"""
+    try:
+        upper = int(duration.split()[0].split("-")[-1])
+    except (IndexError, ValueError):
+        raise ValueError(f"Cannot parse video duration {duration!r}") from None
+    for name, limit in DURATION_BUCKETS:
+        if limit is None or upper <= limit:
+            return name
+
+
+class ConceptIndex:
+    """Precomputed video concept lookups by difficulty, duration bucket and topic
+    
+    Every combination of filters (each one optional) maps to the tuple of
+    matching concept positions, so a filtered pick is one dict lookup plus
+    one random choice. Topics the catalog does not know match only the
+    concepts that suit any topic.
+    """
+    
+    __slots__ = ("difficulties", "durations", "_table")
+    
+    _OTHER_TOPIC = object()
+    
+    def __init__(self, concepts: Tuple[VideoConcept, ...], topics: Tuple[str, ...]):
+        known_topics = list(dict.fromkeys(
+            [topic.lower() for topic in topics]
+            + [topic.lower() for concept in concepts for topic in concept.topics]
+        ))
+        self.difficulties = tuple(dict.fromkeys(c.difficulty.lower() for c in concepts))
+        self.durations = tuple(name for name, _ in DURATION_BUCKETS)
+        
+        table = {}
+        for d in (None,) + self.difficulties:
+            for b in (None,) + self.durations:
+                for t in [None, self._OTHER_TOPIC] + known_topics:
+                    table[d, b, t] = []
+        
+        for position, concept in enumerate(concepts):
+            difficulty = concept.difficulty.lower()
+            bucket = duration_bucket(concept.duration)
+            if concept.topics:
+                suited = [topic.lower() for topic in concept.topics]
+            else:
+                suited = [self._OTHER_TOPIC] + known_topics
+            for d in (None, difficulty):
+                for b in (None, bucket):
+                    table[d, b, None].append(position)
+                    for t in suited:
+                        table[d, b, t].append(position)
+        
+        self._table = {key: tuple(positions) for key, positions in table.items()}
+    
+    def select(self, difficulty: str = None, duration: str = None, topic: str = None) -> Tuple[int, ...]:
+        """Return the positions of the concepts matching every given filter
+        
+        Raises ValueError for an unknown difficulty or duration bucket, or
+        when no concept matches the combination.
+        """
+        d = difficulty.lower() if difficulty else None
+        b = duration.lower() if duration else None
+        if d is not None and d not in self.difficulties:
+            raise ValueError(f"Unknown difficulty {difficulty!r}, expected one of {', '.join(self.difficulties)}")
+        if b is not None and b not in self.durations:
+            raise ValueError(f"Unknown duration {duration!r}, expected one of {', '.join(self.durations)}")
+        
+        t = topic.lower() if topic else None
+        positions = self._table.get((d, b, t))
+        if positions is None:
+            positions = self._table[d, b, self._OTHER_TOPIC]
+        if not positions:
+            filters = ", ".join(
+                f"{name}={value!r}"
+                for name, value in (("difficulty", difficulty), ("duration", duration), ("topic", topic))
+                if value
+            )
+            raise ValueError(f"No video concepts match {filters}")
+        return positions
+
+
+class ContentCatalog(_Record):
+    """Immutable content shared by every generator using it
+    
+    Everything is a tuple or an immutable record, so one catalog can be
+    shared across instances (and threads) without copying. Lookup indexes
+    are built once, when the catalog is created.
+    """
+    
+    _fields = ("hooks", "video_concepts", "topics", "trending_angles", "hashtag_groups", "caption_templates")
+    
+    __slots__ = (
+        "hooks",
+        "video_concepts",
+        "topics",
+        "trending_angles",
+        "hashtag_groups",
+        "caption_templates",
+        "concept_index",
+        "all_hashtags",
+        "hashtag_offsets",
+        "version"
+    )
+    
+    def __init__(
+        self,
+        hooks: Tuple[str, ...],
+        video_concepts: Tuple[VideoConcept, ...],
+        topics: Tuple[str, ...],
+        trending_angles: Tuple[str, ...],
+        hashtag_groups: Tuple[HashtagGroup, ...],
+        caption_templates: Tuple[CaptionTemplate, ...]
+    ):
+        object.__setattr__(self, "hooks", hooks)
+        object.__setattr__(self, "video_concepts", video_concepts)
+        object.__setattr__(self, "topics", topics)
+        object.__setattr__(self, "trending_angles", trending_angles)
+        object.__setattr__(self, "hashtag_groups", hashtag_groups)
+        object.__setattr__(self, "caption_templates", caption_templates)
+        offsets = []
+        all_hashtags = []
+        for group in hashtag_groups:
+            offsets.append(len(all_hashtags))
+            all_hashtags.extend(group.tags)
+        object.__setattr__(self, "concept_index", ConceptIndex(self.video_concepts, self.topics))
+        # Hashtags are addressed by their position in all_hashtags; group i
+        # starts at hashtag_offsets[i]
+        object.__setattr__(self, "all_hashtags", tuple(all_hashtags))
+        object.__setattr__(self, "hashtag_offsets", tuple(offsets))
+        # Content hash identifying this exact catalog; compact posts and
+        # archives record it so positions are never read against another one
+        import hashlib
+        content = repr(self._values())
+        object.__setattr__(self, "version", hashlib.blake2b(content.encode(), digest_size=8).hexdigest())
+    
+    def __reduce__(self):
+        return ContentCatalog, (
+            self.hooks,
+            self.video_concepts,
+            self.topics,
+            self.trending_angles,
+            self.hashtag_groups,
+            self.caption_templates
+        )
+    
+    def replace(self, **changes: Any) -> "ContentCatalog":
+        """Return a copy with some fields replaced"""
+        return ContentCatalog(**{**dict(zip(self._fields, self._values())), **changes})
+
+
+def _build_default_catalog() -> ContentCatalog:
+    """Build the built-in mobile detailing catalog"""
+    return ContentCatalog(
+        hooks=(
+            "Wait until you see what I pulled out of this car! 😱",
+            "This is why you need professional detailing 👀",
+            "POV: You finally get your car detailed after 2 years",
+            "I've been detailing for 10 years and this shocked me",
+            "This customer said their car was 'clean' 🤢",
+            "The before is going to blow your mind",
+            "This is the most satisfying detail I've ever done ✨",
+            "No one believes this is the same car",
+            "This detail took 8 hours but watch this transformation",
+            "Here's what happens when you skip regular detailing",
+            "I bet you've never seen this detailing hack before",
+            "This $300 detail vs a $30 car wash - which would you choose?",
+            "Stop wasting money on cheap car washes! Here's why:",
+            "Your car dealer doesn't want you to know this trick",
+            "This one product changed how I detail cars forever"
+        ),
+        video_concepts=(
+            VideoConcept(
+                title="Before & After Transformation",
+                description="Showcase a dramatic vehicle transformation",
+                shots=(
+                    "Start with the dirty 'before' state",
+                    "Quick time-lapse of the cleaning process",
+                    "Reveal the pristine 'after' result",
+                    "Close-up details of the finish"
+                ),
+                duration="15-30 seconds",
+                difficulty="Easy",
+                topics=()
+            ),
+            VideoConcept(
+                title="Satisfying Dirt Extraction",
+                description="Show dirt being removed from carpets or upholstery",
+                shots=(
+                    "Close-up of dirty surface",
+                    "Extraction tool in action",
+                    "Dirty water being collected",
+                    "Final clean result"
+                ),
+                duration="10-20 seconds",
+                difficulty="Easy",
+                topics=(
+                    "Interior deep clean",
+                    "Pet hair removal",
+                    "Odor elimination",
+                    "Stain removal"
+                )
+            ),
+            VideoConcept(
+                title="Product Comparison",
+                description="Compare professional vs consumer products",
+                shots=(
+                    "Show both products side by side",
+                    "Apply each to similar surfaces",
+                    "Compare the results",
+                    "Reveal the winner"
+                ),
+                duration="30-45 seconds",
+                difficulty="Medium",
+                topics=()
+            ),
+            VideoConcept(
+                title="Day in the Life",
+                description="Follow your mobile detailing journey",
+                shots=(
+                    "Morning prep and loading van",
+                    "Arrival at customer location",
+                    "Quick clips of multiple details",
+                    "Happy customer reactions"
+                ),
+                duration="45-60 seconds",
+                difficulty="Medium",
+                topics=()
+            ),
+            VideoConcept(
+                title="Detailing Hack Tutorial",
+                description="Teach a quick detailing tip or trick",
+                shots=(
+                    "Present the problem",
+                    "Introduce the solution/hack",
+                    "Demonstrate step-by-step",
+                    "Show the impressive result"
+                ),
+                duration="20-35 seconds",
+                difficulty="Easy",
+                topics=()
+            ),
+            VideoConcept(
+                title="Gross to Gorgeous",
+                description="Focus on the nastiest part of the job",
+                shots=(
+                    "Reveal the disgusting starting point",
+                    "Your reaction (humor optional)",
+                    "Cleaning process",
+                    "Amazing clean result"
+                ),
+                duration="15-25 seconds",
+                difficulty="Easy",
+                topics=(
+                    "Interior deep clean",
+                    "Engine bay detailing",
+                    "Pet hair removal",
+                    "Odor elimination",
+                    "Stain removal",
+                    "Wheel and tire detailing"
+                )
+            ),
+            VideoConcept(
+                title="Price Breakdown Story",
+                description="Explain why detailing costs what it does",
+                shots=(
+                    "Text: 'Why does detailing cost $200+'",
+                    "Show all the steps involved",
+                    "Display products and equipment used",
+                    "Final result justifying the price"
+                ),
+                duration="30-45 seconds",
+                difficulty="Medium",
+                topics=()
+            ),
+            VideoConcept(
+                title="Customer Reaction",
+                description="Capture genuine customer amazement",
+                shots=(
+                    "Customer drops off dirty car",
+                    "Time-lapse of detail",
+                    "Reveal to customer (their reaction)",
+                    "Testimonial or thank you"
+                ),
+                duration="20-40 seconds",
+                difficulty="Hard",
+                topics=()
+            ),
+            VideoConcept(
+                title="Trending Sound Adaptation",
+                description="Use trending audio with detailing context",
+                shots=(
+                    "Sync your content to trending sound",
+                    "Make it relevant to detailing",
+                    "Add text overlays for context",
+                    "Include your branding"
+                ),
+                duration="15-30 seconds",
+                difficulty="Medium",
+                topics=()
+            ),
+            VideoConcept(
+                title="Mistake Prevention",
+                description="Show common car care mistakes",
+                shots=(
+                    "Text: 'Stop doing this to your car!'",
+                    "Show the mistake",
+                    "Explain why it's bad",
+                    "Show the correct way"
+                ),
+                duration="25-40 seconds",
+                difficulty="Easy",
+                topics=()
+            )
+        ),
+        topics=(
+            "Interior deep clean",
+            "Exterior wash and wax",
+            "Ceramic coating application",
+            "Leather conditioning",
+            "Engine bay detailing",
+            "Headlight restoration",
+            "Scratch removal",
+            "Pet hair removal",
+            "Odor elimination",
+            "Paint correction",
+            "Wheel and tire detailing",
+            "Glass cleaning",
+            "Dashboard restoration",
+            "Stain removal",
+            "Clay bar treatment"
+        ),
+        trending_angles=(
+            "ASMR detailing sounds",
+            "Satisfying cleaning videos",
+            "Before/after transitions",
+            "POV style content",
+            "Story time while detailing",
+            "Myth busting car care",
+            "Product testing",
+            "Extreme transformations",
+            "Time-lapse magic",
+            "Customer surprise reactions"
+        ),
+        hashtag_groups=(
+            HashtagGroup(
+                name="core",
+                tags=(
+                    "#MobileDetailing",
+                    "#CarDetailing",
+                    "#AutoDetailing",
+                    "#DetailingWorld",
+                    "#CarCare"
+                ),
+                quota=3
+            ),
+            HashtagGroup(
+                name="engagement",
+                tags=(
+                    "#SatisfyingVideos",
+                    "#Satisfying",
+                    "#OddlySatisfying",
+                    "#BeforeAndAfter",
+                    "#Transformation"
+                ),
+                quota=3
+            ),
+            HashtagGroup(
+                name="niche",
+                tags=(
+                    "#DetailingLife",
+                    "#DetailersOfTikTok",
+                    "#DetailingBusiness",
+                    "#ProfessionalDetailer",
+                    "#DetailingTips"
+                ),
+                quota=3
+            ),
+            HashtagGroup(
+                name="viral",
+                tags=(
+                    "#CarTok",
+                    "#CleanTok",
+                    "#SmallBusiness",
+                    "#CarLovers",
+                    "#AutoCare"
+                ),
+                quota=3
+            ),
+            HashtagGroup(
+                name="location",
+                tags=(
+                    "#MobileDetailer",
+                    "#LocalBusiness",
+                    "#SupportLocal",
+                    "#SmallBusinessOwner"
+                ),
+                quota=2
+            )
+        ),
+        caption_templates=compile_caption_templates(CAPTION_TEMPLATES)
+    )
+
+
+_default_catalog = None
+
+
+def default_catalog() -> ContentCatalog:
+    """Return the built-in catalog, loading it on first use"""
+    global _default_catalog
+    if _default_catalog is None:
+        _default_catalog = _load_default_catalog()
+    return _default_catalog
+
+
+# Bump whenever the snapshot layout below changes
+CATALOG_SNAPSHOT_FORMAT = 2
+
+
+def _snapshot_catalog(catalog: ContentCatalog) -> Tuple[Any, ...]:
+    """Return the catalog, with its derived lookups, as plain marshal-able tuples"""
+    index = catalog.concept_index
+    table = tuple(
+        (d, b, False if t is ConceptIndex._OTHER_TOPIC else t, positions)
+        for (d, b, t), positions in index._table.items()
+    )
+    return (
+        catalog.hooks,
+        tuple((c.title, c.description, c.shots, c.duration, c.difficulty, c.topics) for c in catalog.video_concepts),
+        catalog.topics,
+        catalog.trending_angles,
+        tuple((g.name, g.tags, g.quota, g.weights, g.weight) for g in catalog.hashtag_groups),
+        tuple((t.source, t.fields, t._literals, t._names) for t in catalog.caption_templates),
+        (index.difficulties, index.durations, table),
+        catalog.all_hashtags,
+        catalog.hashtag_offsets,
+        catalog.version
+    )
+
+
+def _restore_catalog(snapshot: Tuple[Any, ...]) -> ContentCatalog:
+    """Rebuild a catalog from _snapshot_catalog output without re-deriving anything"""
+    hooks, concepts, topics, angles, groups, templates, index_state, all_hashtags, offsets, version = snapshot
+    
+    index = object.__new__(ConceptIndex)
+    index.difficulties, index.durations, table = index_state
+    index._table = {
+        (d, b, ConceptIndex._OTHER_TOPIC if t is False else t): positions
+        for d, b, t, positions in table
+    }
+    
+    caption_templates = []
+    for source, fields, literals, names in templates:
+        template = object.__new__(CaptionTemplate)
+        template.source, template.fields, template._literals, template._names = source, fields, literals, names
+        caption_templates.append(template)
+    
+    catalog = object.__new__(ContentCatalog)
+    for name, value in (
+        ("hooks", hooks),
+        ("video_concepts", tuple(VideoConcept(*concept) for concept in concepts)),
+        ("topics", topics),
+        ("trending_angles", angles),
+        ("hashtag_groups", tuple(HashtagGroup(*group) for group in groups)),
+        ("caption_templates", tuple(caption_templates)),
+        ("concept_index", index),
+        ("all_hashtags", all_hashtags),
+        ("hashtag_offsets", offsets),
+        ("version", version)
+    ):
+        object.__setattr__(catalog, name, value)
+    return catalog
+
+
+def _load_default_catalog() -> ContentCatalog:
+    """Load the built-in catalog from its snapshot in __pycache__
+    
+    The snapshot is keyed by this file's mtime and size, so editing the
+    catalog invalidates it; a missing or stale snapshot is rebuilt and
+    rewritten (unless bytecode writing is disabled, as for .pyc files).
+    """
+    source = os.path.abspath(__file__)
+    cache_tag = sys.implementation.cache_tag
+    try:
+        stat = os.stat(source)
+    except OSError:
+        return _build_default_catalog()
+    if cache_tag is None:
+        return _build_default_catalog()
+    key = (CATALOG_SNAPSHOT_FORMAT, stat.st_mtime_ns, stat.st_size)
+    path = os.path.join(os.path.dirname(source), "__pycache__", f"default_catalog.{cache_tag}.marshal")
+    
+    try:
+        # marshal.loads on the whole file: marshal.load reads a file object
+        # in small pieces and takes ten times as long
+        with open(path, "rb") as f:
+            cached_key, snapshot = marshal.loads(f.read())
+        if cached_key == key:
+            return _restore_catalog(snapshot)
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    
+    catalog = _build_default_catalog()
+    if not sys.dont_write_bytecode:
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temporary, "wb") as f:
+                marshal.dump((key, _snapshot_catalog(catalog)), f)
+            os.replace(temporary, path)
+        except OSError:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+    return catalog
+
+
+def _import_numpy():
+    """Return the numpy module, or None when it is not installed"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def chunk_bounds(start: int, stop: int, size: int) -> Iterator[Tuple[int, int]]:
+    """Split [start, stop) into ranges that never cross a multiple of size"""
+    while start < stop:
+        chunk_stop = min((start // size + 1) * size, stop)
+        yield start, chunk_stop
+        start = chunk_stop
+
+
+def _distinct_rows(np: Any, candidates: Any, k: int) -> Tuple[Any, Any]:
+    """Return the first k distinct values of each row that has them, and a mask of those rows"""
+    order = candidates.argsort(axis=1, kind="stable")
+    ordered = np.take_along_axis(candidates, order, axis=1)
+    first = np.ones(candidates.shape, dtype=bool)
+    first[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    # The stable sort puts each value's earliest occurrence first
+    keep = np.empty_like(first)
+    np.put_along_axis(keep, order, first, axis=1)
+    seen = keep.cumsum(axis=1)
+    complete = seen[:, -1] >= k
+    rows = candidates[complete][(keep & (seen <= k))[complete]].reshape(-1, k)
+    return rows, complete
+
+
+class AliasTable:
+    """Walker's alias table: draws a position in proportion to its weight in O(1)
+    
+    Built once with Vose's method in O(n). A draw picks a column uniformly
+    and keeps it with the column's probability, or else takes its alias.
+    """
+    
+    __slots__ = ("weights", "total", "positive", "probability", "alias", "_arrays")
+    
+    def __init__(self, weights: Sequence[float]):
+        self.weights = tuple(float(w) for w in weights)
+        self.total = sum(self.weights)
+        self.positive = sum(1 for w in self.weights if w > 0)
+        if not self.positive:
+            raise ValueError("An alias table needs at least one positive weight")
+        n = len(self.weights)
+        scaled = [w * n / self.total for w in self.weights]
+        probability = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            probability[less] = scaled[less]
+            alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Columns left over are full up to rounding and keep probability 1
+        self.probability = tuple(probability)
+        self.alias = tuple(alias)
+        self._arrays = None
+    
+    def __len__(self) -> int:
+        return len(self.weights)
+    
+    def draw(self, rng: random.Random) -> int:
+        """Draw one position"""
+        x = rng.random() * len(self.weights)
+        column = int(x)
+        return column if x - column < self.probability[column] else self.alias[column]
+    
+    def sample(self, rng: random.Random, k: int, taken: Sequence[int] = ()) -> List[int]:
+        """Draw up to k distinct positions not in taken, each in proportion to the weight left
+        
+        Repeats are drawn again, so k positions take O(k) draws unless
+        those already drawn hold most of the weight; from then on the rest
+        are picked in one pass over the weights left, by the smallest
+        Exp(1) / weight keys (Efraimidis-Spirakis), as sample_block() does.
+        """
+        weights = self.weights
+        picked = dict.fromkeys(taken)
+        k = min(k, self.positive - sum(1 for i in picked if weights[i] > 0))
+        wanted = len(picked) + k
+        n, probability, alias = len(weights), self.probability, self.alias
+        attempts = 4 * k + 16
+        while len(picked) < wanted and attempts:
+            attempts -= 1
+            x = rng.random() * n
+            column = int(x)
+            picked[column if x - column < probability[column] else alias[column]] = None
+        if len(picked) < wanted:
+            left = [i for i, weight in enumerate(weights) if weight > 0 and i not in picked]
+            picked.update(dict.fromkeys(heapq.nsmallest(
+                wanted - len(picked), left, key=lambda i: rng.expovariate(weights[i])
+            )))
+        return list(picked)[len(picked) - k:]
+    
+    def sample_block(self, rng: Any, size: int, k: int, taken: Any = None) -> Any:
+        """Draw k distinct positions for each of size rows at once, as a NumPy array
+        
+        rng is a NumPy Generator; taken optionally holds positions each row
+        already has. Rows are drawn like sample(): alias draws with repeats
+        dropped, with exponential sort keys for rows whose draws run out.
+        """
+        np = _import_numpy()
+        if self._arrays is None:
+            self._arrays = (np.array(self.probability), np.array(self.alias, dtype=np.intp), np.array(self.weights))
+        probability, alias, weights = self._arrays
+        n = len(weights)
+        if taken is None:
+            taken = np.empty((size, 0), dtype=np.intp)
+        width = taken.shape[1]
+        k = max(0, min(k, self.positive - width))
+        rows = np.empty((size, k), dtype=np.intp)
+        if not k:
+            return rows
+        
+        # Rows short of k distinct positions draw more, after what they have
+        pending = np.arange(size)
+        drawn = taken
+        draws = 2 * k + 16
+        for _ in range(3):
+            x = rng.random((len(pending), draws)) * n
+            columns = x.astype(np.intp)
+            picks = np.where(x - columns < probability[columns], columns, alias[columns])
+            drawn = np.concatenate([drawn, picks], axis=1)
+            found, complete = _distinct_rows(np, drawn, width + k)
+            rows[pending[complete]] = found[:, width:]
+            pending, drawn = pending[~complete], drawn[~complete]
+            if not len(pending):
+                return rows
+            draws *= 4
+        # The few rows left continue with Efraimidis-Spirakis: among the
+        # positions left, the smallest Exp(1) / weight keys are a weighted sample
+        with np.errstate(divide="ignore"):
+            keys = rng.exponential(size=(len(pending), n)) / weights
+        for key, index, row in zip(keys, pending, drawn.tolist()):
+            partial = list(dict.fromkeys(row))
+            key[partial] = -1.0
+            rows[index] = (partial + key.argsort()[len(partial):width + k].tolist())[width:]
+        return rows
+
+
+# Unweighted groups up to this size are drawn in blocks by scoring every tag,
+# which is cheap for small groups and keeps seeded blocks as they were;
+# larger ones go through a uniform alias table, at O(quota) per row
+SCORED_GROUP_TAGS = 64
+
+
+class HashtagSampler:
+    """Draw a catalog's hashtags from alias tables built once per catalog
+    
+    Each group's quota is drawn without replacement in proportion to its
+    tag weights; unweighted groups keep their plain uniform draws, so
+    their seeded quotas are unchanged. Tags asked for beyond the quotas
+    come from every group, in proportion to tag weight times group weight
+    (all equal when nothing is weighted), through one alias table, so each
+    takes O(1) expected draws. Fewer tags than the quotas add up to are
+    split over the groups first (see split()), so every group still turns
+    up. draw() takes a random.Random; draw_block() draws a whole block of
+    rows with a NumPy Generator.
+    """
+    
+    def __init__(self, catalog: ContentCatalog):
+        self.catalog = catalog
+        self.quotas = []
+        self.tables = []
+        self.block_tables = []
+        for group in catalog.hashtag_groups:
+            if group.weights:
+                positive = sum(1 for w in group.weights if w > 0)
+                self.quotas.append(min(group.quota, positive))
+                self.tables.append(AliasTable(group.weights) if positive else None)
+                self.block_tables.append(self.tables[-1])
+            else:
+                self.quotas.append(min(group.quota, len(group.tags)))
+                self.tables.append(None)
+                large = len(group.tags) > SCORED_GROUP_TAGS
+                self.block_tables.append(AliasTable((1.0,) * len(group.tags)) if large else None)
+        
+        weighted = [
+            group.weight * weight
+            for group in catalog.hashtag_groups
+            for weight in (group.weights or (1.0,) * len(group.tags))
+        ]
+        self.overall = AliasTable(weighted) if any(weighted) else None
+        self.quota_total = sum(self.quotas)
+        self._splits = {}
+    
+    def _split_table(self, total: int) -> Tuple[Tuple[int, ...], Tuple[float, ...]]:
+        """Return each group's whole share of total tags and the running sums of the fractional parts
+        
+        Groups that give every tag they have (such as a tenant's custom
+        hashtags) are fixed sets and keep them all, in catalog order, as
+        far as total goes. The rest is split in proportion to quota times
+        group weight, capped at the quotas, with what a capped group cannot
+        take going to the others. Groups of weight zero only get tags the
+        rest have no room for, in proportion to their quotas.
+        """
+        split = self._splits.get(total)
+        if split is not None:
+            return split
+        quotas = self.quotas
+        shares = [0.0] * len(quotas)
+        left = total
+        for i, group in enumerate(self.catalog.hashtag_groups):
+            if quotas[i] == len(group.tags):
+                shares[i] = float(min(quotas[i], left))
+                left -= int(shares[i])
+        weighted = [quota * group.weight for quota, group in zip(quotas, self.catalog.hashtag_groups)]
+        for mass in (weighted, quotas):
+            open_groups = [i for i, m in enumerate(mass) if m > 0 and shares[i] < quotas[i]]
+            while open_groups and left > 0:
+                scale = left / sum(mass[i] for i in open_groups)
+                capped = [i for i in open_groups if shares[i] + scale * mass[i] >= quotas[i]]
+                if not capped:
+                    for i in open_groups:
+                        shares[i] += scale * mass[i]
+                    left = 0
+                    break
+                for i in capped:
+                    left -= quotas[i] - shares[i]
+                    shares[i] = float(quotas[i])
+                open_groups = [i for i in open_groups if i not in capped]
+        
+        whole = tuple(int(share) for share in shares)
+        bounds = [0.0]
+        for share, count in zip(shares, whole):
+            bounds.append(bounds[-1] + share - count)
+        # The fractional parts add up to a whole number of extra tags; pin
+        # the bounds to it so rounding can never add or lose one
+        extra = float(total - sum(whole))
+        split = self._splits[total] = (whole, tuple(min(bound, extra) for bound in bounds[:-1]) + (extra,))
+        return split
+    
+    def split(self, total: int, offset: float) -> List[int]:
+        """Return how many tags each group gives when total is below the quotas' sum
+        
+        Each group gets the whole part of its share (see _split_table) and,
+        by systematic sampling at offset in [0, 1), one more with
+        probability equal to the fractional part. The counts add up to
+        total and match the shares on average, so even a total below the
+        number of groups draws from every group in turn.
+        """
+        whole, bounds = self._split_table(total)
+        return [
+            count + math.ceil(bounds[i + 1] - offset) - math.ceil(bounds[i] - offset)
+            for i, count in enumerate(whole)
+        ]
+    
+    def draw(self, rng: random.Random, total: int = 0) -> List[int]:
+        """Draw total tags (the quotas when 0) as positions in catalog.all_hashtags"""
+        catalog = self.catalog
+        quotas = self.split(total, rng.random()) if 0 < total < self.quota_total else self.quotas
+        tags = []
+        for group, offset, quota, table in zip(catalog.hashtag_groups, catalog.hashtag_offsets, quotas, self.tables):
+            if table is not None:
+                tags.extend(offset + pick for pick in table.sample(rng, quota))
+            elif not group.weights:
+                tags.extend(offset + pick for pick in rng.sample(range(len(group.tags)), quota))
+        if total > len(tags) and self.overall is not None:
+            tags.extend(self.overall.sample(rng, total - len(tags), tags))
+        return tags
+    
+    def draw_block(self, rng: Any, size: int, total: int = 0) -> Any:
+        """Draw `size` rows of hashtag positions at once, as a NumPy array"""
+        np = _import_numpy()
+        catalog = self.catalog
+        quotas = self.quotas
+        counts = None
+        if 0 < total < self.quota_total:
+            # Every group draws the most any row takes from it, and each row
+            # keeps the first of those up to its split() count
+            whole, bounds = self._split_table(total)
+            offsets = rng.random((size, 1))
+            edges = np.ceil(np.array(bounds) - offsets)
+            counts = np.array(whole) + (edges[:, 1:] - edges[:, :-1]).astype(np.intp)
+            quotas = counts.max(axis=0, initial=0).tolist()
+        blocks = []
+        keep = []
+        for i, (group, offset, quota, table) in enumerate(zip(catalog.hashtag_groups, catalog.hashtag_offsets, quotas, self.block_tables)):
+            if not quota:
+                continue
+            if table is not None:
+                blocks.append(table.sample_block(rng, size, quota) + offset)
+            else:
+                # The quota smallest of uniform scores are a uniform k-subset;
+                # only those are sorted, in the order a full argsort gives
+                scores = rng.random((size, len(group.tags)))
+                smallest = scores.argpartition(quota - 1, axis=1)[:, :quota]
+                order = np.take_along_axis(scores, smallest, axis=1).argsort(axis=1)
+                blocks.append(np.take_along_axis(smallest, order, axis=1) + offset)
+            if counts is not None:
+                keep.append(np.arange(quota) < counts[:, i:i + 1])
+        tags = np.concatenate(blocks, axis=1) if blocks else np.empty((size, 0), dtype=np.intp)
+        if counts is not None:
+            return tags[np.concatenate(keep, axis=1)].reshape(size, total)
+        if total > tags.shape[1] and self.overall is not None:
+            tags = np.concatenate([tags, self.overall.sample_block(rng, size, total - tags.shape[1], tags)], axis=1)
+        return tags
+
+
+class NumpySampler:
+    """Draw the catalog positions for a whole block of items with a few NumPy calls
+    
+    draw() returns one column per component (topic, hook, template,
+    concept, angle, tags) as Python lists, ready for the render_*
+    functions. Concepts are drawn among those suiting each row's topic and
+    hashtags come from HashtagSampler.draw_block(), so the distributions
+    match the pure-Python path; the exact values differ.
+    """
+    
+    def __init__(self, catalog: ContentCatalog):
+        np = _import_numpy()
+        if np is None:
+            raise ImportError("The numpy backend requires NumPy (pip install numpy)")
+        self.np = np
+        self.catalog = catalog
+        self.hashtags = HashtagSampler(catalog)
+        
+        # Concept candidates per topic as a padded matrix plus row lengths
+        rows = []
+        for topic in catalog.topics:
+            try:
+                rows.append(catalog.concept_index.select(topic=topic))
+            except ValueError:
+                rows.append(())
+        width = max(1, max(len(row) for row in rows))
+        self._topic_concepts = np.array([row + (0,) * (width - len(row)) for row in rows], dtype=np.intp)
+        self._topic_concept_counts = np.array([len(row) for row in rows], dtype=np.intp)
+    
+    def draw(self, seed: Any, size: int, kind: str = "post", topic: str = None, total_tags: int = 0) -> Dict[str, List[Any]]:
+        """Draw the positions of `size` items of the given kind"""
+        np = self.np
+        catalog = self.catalog
+        rng = np.random.default_rng(seed)
+        columns = {}
+        
+        post = kind in ("post", "compact")
+        if post or kind == "caption":
+            if topic is None:
+                topic_rows = rng.integers(0, len(catalog.topics), size)
+                columns["topic_index"] = topic_rows.tolist()
+                columns["topic"] = [catalog.topics[i] for i in columns["topic_index"]]
+            else:
+                if kind == "compact":
+                    if topic not in catalog.topics:
+                        raise ValueError(f"Compact posts need a catalog topic, got {topic!r}")
+                    columns["topic_index"] = [catalog.topics.index(topic)] * size
+                columns["topic"] = [topic] * size
+            columns["hook"] = rng.integers(0, len(catalog.hooks), size).tolist()
+            columns["template"] = rng.integers(0, len(catalog.caption_templates), size).tolist()
+        
+        if post:
+            if topic is None:
+                counts = self._topic_concept_counts[topic_rows]
+                if not counts.all():
+                    raise ValueError("No video concepts match some of the catalog topics")
+                picks = (rng.random(size) * counts).astype(np.intp)
+                columns["concept"] = self._topic_concepts[topic_rows, picks].tolist()
+            else:
+                candidates = np.array(catalog.concept_index.select(topic=topic), dtype=np.intp)
+                columns["concept"] = candidates[rng.integers(0, len(candidates), size)].tolist()
+        
+        if post or kind == "hashtags":
+            columns["tags"] = self.hashtags.draw_block(rng, size, total_tags).tolist()
+        
+        if post:
+            columns["angle"] = rng.integers(0, len(catalog.trending_angles), size).tolist()
+        
+        return columns
+
+
+def shard_bounds(n: int, index: int, total: int) -> Tuple[int, int]:
+    """Return the [start, stop) item range owned by shard `index` of `total`
+    
+    Shards are contiguous and disjoint, so concatenating the output of
+    shards 0..total-1 reproduces the unsharded run item for item.
+    """
+    if total < 1:
+        raise ValueError(f"Shard total must be at least 1, got {total}")
+    if not 0 <= index < total:
+        raise ValueError(f"Shard index must be in [0, {total}), got {index}")
+    return n * index // total, n * (index + 1) // total
+
+
+class Post(_Record):
+    """A post stored as catalog positions instead of strings
+    
+    A few small integers replace the full nested dict; to_dict() expands
+    it again against the catalog whose version it was drawn from. tags
+    are positions in catalog.all_hashtags.
+    """
+    
+    __slots__ = _fields = ("catalog_version", "topic", "hook", "template", "concept", "angle", "tags")
+    
+    def __init__(self, catalog_version: str, topic: int, hook: int, template: int, concept: int, angle: int, tags: Tuple[int, ...]):
+        object.__setattr__(self, "catalog_version", catalog_version)
+        object.__setattr__(self, "topic", topic)
+        object.__setattr__(self, "hook", hook)
+        object.__setattr__(self, "template", template)
+        object.__setattr__(self, "concept", concept)
+        object.__setattr__(self, "angle", angle)
+        object.__setattr__(self, "tags", tags)
+    
+    def __reduce__(self):
+        return Post, (self.catalog_version, self.topic, self.hook, self.template, self.concept, self.angle, self.tags)
+    
+    def to_dict(self, catalog: ContentCatalog, budget: int = CAPTION_LIMIT) -> Dict[str, Any]:
+        """Expand to the same dict generate_post returns, reporting caption use against budget"""
+        if catalog.version != self.catalog_version:
+            raise ValueError(f"Post was drawn from catalog {self.catalog_version}, not {catalog.version}")
+        return render_post(
+            catalog,
+            catalog.topics[self.topic],
+            self.hook,
+            self.template,
+            self.concept,
+            self.angle,
+            self.tags,
+            budget
+        )
+
+
+class CaptionLengths:
+    """Character lengths of a catalog's caption parts and hashtags
+    
+    A caption's length is worked out from these tables (hook, template
+    text and one topic length per placeholder) instead of rendering it, so
+    fitting a post into a character budget costs a few additions.
+    """
+    
+    def __init__(self, catalog: ContentCatalog):
+        self.catalog = catalog
+        self.hooks = tuple(len(hook) for hook in catalog.hooks)
+        self.template_text = tuple(sum(map(len, template._literals)) for template in catalog.caption_templates)
+        self.template_topics = tuple(template._names.count("topic") for template in catalog.caption_templates)
+        self.hashtags = tuple(len(tag) for tag in catalog.all_hashtags)
+        # The most a post's drawn hashtags can add: a blank line, then tags
+        # separated by spaces
+        self._longest_tags = 1 + sum(
+            sum(sorted((len(tag) + 1 for tag in group.tags), reverse=True)[:group.quota])
+            for group in catalog.hashtag_groups
+        )
+        self._longest = {}
+    
+    def caption(self, topic: str, hook: int, template: int) -> int:
+        """Return the length of the full caption (hook, blank line, body)"""
+        return self.hooks[hook] + 2 + self.template_text[template] + self.template_topics[template] * len(topic)
+    
+    def longest_post(self, topic: str = None) -> int:
+        """Return an upper bound on the length of any post about topic (about any catalog topic when None)"""
+        topic_length = len(topic) if topic is not None else max(map(len, self.catalog.topics), default=0)
+        longest = self._longest.get(topic_length)
+        if longest is None:
+            body = max(text + count * topic_length for text, count in zip(self.template_text, self.template_topics))
+            longest = self._longest[topic_length] = max(self.hooks) + 2 + body + self._longest_tags
+        return longest
+    
+    def shortest_caption(self, topic: str = None) -> int:
+        """Return the length of the shortest caption about topic (about the catalog topic with the longest one when None)"""
+        if topic is None:
+            return max((self.shortest_caption(topic) for topic in self.catalog.topics), default=0)
+        body = min(text + count * len(topic) for text, count in zip(self.template_text, self.template_topics))
+        return min(self.hooks) + 2 + body
+    
+    def fitting_hooks(self, topic: str, budget: int) -> List[int]:
+        """Return the hooks that fit into budget with at least one template"""
+        body = min(text + count * len(topic) for text, count in zip(self.template_text, self.template_topics))
+        return [hook for hook, length in enumerate(self.hooks) if length + 2 + body <= budget]
+    
+    def fitting_templates(self, topic: str, hook: int, budget: int) -> List[int]:
+        """Return the templates whose caption with this hook fits into budget"""
+        room = budget - self.hooks[hook] - 2
+        return [
+            template
+            for template, (text, count) in enumerate(zip(self.template_text, self.template_topics))
+            if text + count * len(topic) <= room
+        ]
+    
+    def fit_tags(self, tags: Sequence[int], room: int) -> List[int]:
+        """Keep the most tags that fit in room characters after a caption, in their original order
+        
+        The tags take a blank line plus one space between each other. The
+        shortest are kept first, which keeps as many as possible.
+        """
+        lengths = self.hashtags
+        used = 1
+        kept = set()
+        for tag in sorted(tags, key=lengths.__getitem__):
+            if used + lengths[tag] + 1 > room:
+                break
+            used += lengths[tag] + 1
+            kept.add(tag)
+        return [tag for tag in tags if tag in kept]
+
+
+def custom_hashtags(include_custom: Iterable[str] = None) -> List[str]:
+    """Normalise custom hashtags to "#tag" form, dropping repeats"""
+    return list(dict.fromkeys(f"#{tag.replace('#', '')}" for tag in include_custom or ()))
+
+
+def fit_hashtags(drawn: Sequence[str], custom: Sequence[str], count: int, budget: int = None) -> List[str]:
+    """Choose up to count hashtags that fit into budget characters when joined by spaces
+    
+    Custom hashtags are never dropped to make room for drawn ones: they
+    take their places first, and the drawn tags fill the rest in order.
+    With a budget, the shortest tags of each kind are kept first, so the
+    list holds as many as fit. The result lists the drawn tags as drawn,
+    then the custom ones.
+    """
+    custom = [tag for tag in custom if tag not in drawn][:max(count, 0)]
+    drawn = list(drawn[:max(count - len(custom), 0)])
+    if budget is None:
+        return drawn + custom
+    used = -1
+    kept = set()
+    for tags in (custom, drawn):
+        for tag in sorted(tags, key=len):
+            if used + 1 + len(tag) > budget:
+                break
+            used += 1 + len(tag)
+            kept.add(tag)
+    return [tag for tag in drawn if tag in kept] + [tag for tag in custom if tag in kept]
+
+
+def render_caption(catalog: ContentCatalog, topic: str, hook: int, template: int) -> Dict[str, Any]:
+    """Build a caption dict from a topic and catalog positions"""
+    hook_text = catalog.hooks[hook]
+    body = catalog.caption_templates[template].render(topic=topic)
+    
+    return {
+        "hook": hook_text,
+        "body": body,
+        "full_caption": f"{hook_text}\n\n{body}",
+        "topic": topic
+    }
+
+
+def render_hashtags(
+    catalog: ContentCatalog,
+    tags: Iterable[int],
+    count: int = 15,
+    include_custom: List[str] = None,
+    budget: int = None
+) -> List[str]:
+    """Build a hashtag list from positions in catalog.all_hashtags, fitted by fit_hashtags()"""
+    all_hashtags = catalog.all_hashtags
+    return fit_hashtags([all_hashtags[tag] for tag in tags], custom_hashtags(include_custom), count, budget)
+
+
+def render_post(
+    catalog: ContentCatalog,
+    topic: str,
+    hook: int,
+    template: int,
+    concept: int,
+    angle: int,
+    tags: Iterable[int],
+    budget: int = CAPTION_LIMIT
+) -> Dict[str, Any]:
+    """Build a complete post dict from a topic and catalog positions
+    
+    caption_budget reports the characters the caption and hashtags take
+    together (joined by a blank line) against the budget.
+    """
+    hook_text = catalog.hooks[hook]
+    body = catalog.caption_templates[template].render(topic=topic)
+    video_concept = catalog.video_concepts[concept]
+    all_hashtags = catalog.all_hashtags
+    caption = f"{hook_text}\n\n{body}"
+    hashtags = [all_hashtags[tag] for tag in tags]
+    used = len(caption) + (1 + sum(len(tag) + 1 for tag in hashtags) if hashtags else 0)
+    
+    return {
+        "video_concept": {
+            "title": video_concept.title,
+            "description": video_concept.description,
+            "shots": list(video_concept.shots),
+            "duration": video_concept.duration
+        },
+        "hook": hook_text,
+        "caption": caption,
+        "hashtags": hashtags,
+        "caption_budget": {"used": used, "limit": budget},
+        "trending_angle": catalog.trending_angles[angle],
+        "best_posting_times": list(BEST_POSTING_TIMES),
+        "engagement_tips": list(ENGAGEMENT_TIPS)
+    }
+
+
+class RepeatAvoidingSampler:
+    """Draw positions 0..size-1 so that none repeats within `window` draws
+    
+    Positions outside the window live in an array; a draw picks one
+    uniformly and swap-removes it, and the position falling out of the
+    window goes back in, so every draw is O(1). The window is capped at
+    size - 1 so there is always something to draw.
+    """
+    
+    __slots__ = ("size", "window", "_available", "_slot", "_recent")
+    
+    # Rejection attempts before a filtered draw scans its candidates
+    _ATTEMPTS = 8
+    
+    def __init__(self, size: int, window: int):
+        if size < 1:
+            raise ValueError("Cannot sample from an empty collection")
+        self.size = size
+        self.window = max(0, min(window, size - 1))
+        self._available = list(range(size))
+        self._slot = list(range(size))  # Index in _available, -1 while in the window
+        self._recent = deque()
+    
+    def _take(self, position: int):
+        """Move position from the available array into the window"""
+        slot = self._slot[position]
+        last = self._available.pop()
+        if last != position:
+            self._available[slot] = last
+            self._slot[last] = slot
+        self._slot[position] = -1
+        self._recent.append(position)
+        if len(self._recent) > self.window:
+            released = self._recent.popleft()
+            self._slot[released] = len(self._available)
+            self._available.append(released)
+    
+    def draw(self, rng: random.Random, candidates: Sequence[int] = None) -> int:
+        """Draw a position, restricted to candidates when given
+        
+        With candidates, a position outside the window is preferred; if
+        every candidate is inside it, the least recently drawn one is used.
+        """
+        if candidates is None or len(candidates) == self.size:
+            position = rng.choice(self._available)
+            self._take(position)
+            return position
+        
+        slot = self._slot
+        for _ in range(self._ATTEMPTS):
+            position = rng.choice(candidates)
+            if slot[position] >= 0:
+                self._take(position)
+                return position
+        
+        fresh = [position for position in candidates if slot[position] >= 0]
+        if fresh:
+            position = rng.choice(fresh)
+            self._take(position)
+            return position
+        
+        wanted = set(candidates)
+        position = next(recent for recent in self._recent if recent in wanted)
+        self._recent.remove(position)
+        self._recent.append(position)
+        return position
+    
+    def get_state(self) -> Dict[str, Any]:
+        """Return the sampler state as JSON-ready data"""
+        return {
+            "size": self.size,
+            "window": self.window,
+            "available": list(self._available),
+            "recent": list(self._recent)
+        }
+    
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "RepeatAvoidingSampler":
+        """Rebuild a sampler saved with get_state()"""
+        sampler = cls(state["size"], state["window"])
+        sampler._available = list(state["available"])
+        sampler._recent = deque(state["recent"])
+        sampler._slot = [-1] * sampler.size
+        for slot, position in enumerate(sampler._available):
+            sampler._slot[position] = slot
+        if sorted(sampler._available + list(sampler._recent)) != list(range(sampler.size)):
+            raise ValueError("Corrupt repeat-avoidance state")
+        return sampler
+
+
+# Catalog components that repeat avoidance applies to
+REPEAT_COMPONENTS = ("hook", "template", "topic", "concept", "angle")
+
+# Record kinds --history records (see history.py)
+HISTORY_KINDS = ("post", "caption", "calendar")
+
+# Caption draws tried before a near-duplicate is accepted (see dedup.py)
+DEDUP_ATTEMPTS = 10
+
+
+class TikTokContentGenerator:
+    """Generate TikTok content for mobile detailing business
+    
+    Every instance owns a `random.Random` seeded from `seed` (a fresh random
+    seed when omitted). Batch and calendar items are reseeded from
+    (seed, batch number, item index), so a seeded run produces the same
+    items whether it is generated in one go or split with `shard()`.
+    
+    With `repeat_window` set, hooks, templates, topics, concepts and angles
+    do not repeat within that many draws of the same component. That state
+    is carried across calls on the instance and can be saved with
+    repeat_state() to continue an account's history later.
+    
+    set_exclusions() keeps given catalog positions (e.g. everything posted
+    in the last 30 days, see history.py) out of every draw.
+    
+    With `caption_index` set to a dedup.CaptionIndex, captions that nearly
+    duplicate one already in the index are redrawn, and every caption drawn
+    is added to it.
+    """
+    
+    def __init__(
+        self,
+        seed: int = None,
+        caption_templates: Iterable[Any] = None,
+        catalog: ContentCatalog = None,
+        repeat_window: int = 0
+    ):
+        self.seed = seed if seed is not None else random.randrange(1 << 63)
+        self.rng = random.Random(self.seed)
+        self.shard_index = 0
+        self.shard_total = 1
+        self._batches = 0
+        self.catalog = catalog if catalog is not None else default_catalog()
+        self._numpy_sampler = None
+        if caption_templates is not None:
+            self.catalog = self.catalog.replace(caption_templates=compile_caption_templates(caption_templates))
+        if repeat_window < 0:
+            raise ValueError(f"repeat_window must not be negative, got {repeat_window}")
+        self.repeat_window = repeat_window
+        self._samplers = {}
+        self.exclusions = {}
+        self._allowed = {}
+        self._exclusions_catalog = None
+        self.caption_index = None
+        self.caption_budget = CAPTION_LIMIT
+        self._lengths = None
+        self._hashtag_sampler = None
+    
+    def _caption_lengths(self) -> CaptionLengths:
+        """Return the length tables of the current catalog"""
+        if self._lengths is None or self._lengths.catalog is not self.catalog:
+            self._lengths = CaptionLengths(self.catalog)
+        return self._lengths
+    
+    def _component_size(self, component: str) -> int:
+        """Return how many items the catalog has for a REPEAT_COMPONENTS name"""
+        catalog = self.catalog
+        if component == "hook":
+            return len(catalog.hooks)
+        if component == "template":
+            return len(catalog.caption_templates)
+        if component == "topic":
+            return len(catalog.topics)
+        if component == "concept":
+            return len(catalog.video_concepts)
+        return len(catalog.trending_angles)
+    
+    def set_exclusions(self, exclusions: Dict[str, Iterable[int]]):
+        """Never draw the given positions of each REPEAT_COMPONENTS component
+        
+        The allowed positions are worked out once here, so draws only pay
+        for a dict lookup. Where exclusion would leave nothing to draw, it is
+        ignored for that draw. Exclusions apply to the current catalog and
+        lapse when it is replaced.
+        """
+        excluded = {}
+        allowed = {}
+        for component, positions in exclusions.items():
+            if component not in REPEAT_COMPONENTS:
+                raise ValueError(f"Unknown exclusion component {component!r}")
+            positions = frozenset(positions)
+            if positions:
+                excluded[component] = positions
+                allowed[component] = tuple(
+                    position for position in range(self._component_size(component)) if position not in positions
+                )
+        self.exclusions = excluded
+        self._allowed = allowed
+        self._exclusions_catalog = self.catalog
+    
+    def _allowed_candidates(self, component: str, candidates: Sequence[int]) -> Sequence[int]:
+        """Return the candidates that are not excluded, or all of them if none is left"""
+        excluded = self.exclusions.get(component)
+        if excluded is None or self.catalog is not self._exclusions_catalog:
+            return candidates
+        if len(candidates) == self._component_size(component):
+            allowed = self._allowed[component]
+        else:
+            allowed = [position for position in candidates if position not in excluded]
+        return allowed or candidates
+    
+    def _pick(self, component: str, candidates: Sequence[int]) -> int:
+        """Pick one of the candidate positions, avoiding recent repeats and exclusions when enabled"""
+        if self.exclusions:
+            candidates = self._allowed_candidates(component, candidates)
+        if not self.repeat_window:
+            return self.rng.choice(candidates)
+        
+        size = self._component_size(component)
+        sampler = self._samplers.get(component)
+        if sampler is None or sampler.size != size:
+            sampler = self._samplers[component] = RepeatAvoidingSampler(size, self.repeat_window)
+        return sampler.draw(self.rng, candidates)
+    
+    def repeat_state(self) -> Dict[str, Any]:
+        """Return the repeat-avoidance state of every component as JSON-ready data"""
+        return {component: sampler.get_state() for component, sampler in self._samplers.items()}
+    
+    def load_repeat_state(self, state: Dict[str, Any]):
+        """Continue from a repeat_state() snapshot, e.g. one saved for the same account"""
+        samplers = {}
+        for component, sampler_state in state.items():
+            if component not in REPEAT_COMPONENTS:
+                raise ValueError(f"Unknown repeat-avoidance component {component!r}")
+            samplers[component] = RepeatAvoidingSampler.from_state(sampler_state)
+        self._samplers = samplers
+    
+    def generate_hook(self) -> str:
+        """Generate an attention-grabbing hook"""
+        return self.catalog.hooks[self._draw_hook()]
+    
+    def _draw_hook(self) -> int:
+        """Draw a hook position"""
+        return self._pick("hook", range(len(self.catalog.hooks)))
+    
+    def _draw_caption(self, topic: str = None) -> Tuple[str, int, int]:
+        """Draw the topic (unless given), hook position and template position of a caption"""
+        if self.caption_index is None:
+            return self._draw_caption_once(topic)
+        
+        # After DEDUP_ATTEMPTS near-duplicates in a row the last one is kept,
+        # so a saturated index slows nothing down
+        catalog = self.catalog
+        for _ in range(DEDUP_ATTEMPTS):
+            drawn = self._draw_caption_once(topic)
+            text = f"{catalog.hooks[drawn[1]]}\n\n{catalog.caption_templates[drawn[2]].render(topic=drawn[0])}"
+            if not self.caption_index.is_duplicate(text):
+                break
+        self.caption_index.add(text)
+        return drawn
+    
+    def _draw_caption_once(self, topic: str = None) -> Tuple[str, int, int]:
+        catalog = self.catalog
+        if topic is None:
+            topic = catalog.topics[self._pick("topic", range(len(catalog.topics)))]
+        lengths = self._caption_lengths()
+        budget = self.caption_budget
+        if lengths.longest_post(topic) <= budget:
+            hook = self._draw_hook()
+            template = self._pick("template", range(len(catalog.caption_templates)))
+            return topic, hook, template
+        
+        # Only draw among hooks and templates that fit, rather than drawing
+        # again until something does
+        hooks = lengths.fitting_hooks(topic, budget)
+        if not hooks:
+            raise ValueError(f"No caption about {topic!r} fits in {budget} characters")
+        hook = self._pick("hook", hooks)
+        template = self._pick("template", lengths.fitting_templates(topic, hook, budget))
+        return topic, hook, template
+    
+    def _draw_hashtags(self, total: int = 0) -> List[int]:
+        """Draw each group's quota of hashtags as positions in catalog.all_hashtags
+        
+        Tags are picked by their weights (see HashtagSampler). A total
+        below the quotas' sum scales the quotas down to it (see
+        HashtagSampler.split), so small totals still cover the groups.
+        When total asks for more tags than the quotas add up to, the rest
+        are drawn from the tags of every group not drawn yet.
+        """
+        if self._hashtag_sampler is None or self._hashtag_sampler.catalog is not self.catalog:
+            self._hashtag_sampler = HashtagSampler(self.catalog)
+        return self._hashtag_sampler.draw(self.rng, total)
+    
+    def generate_caption(self, topic: str = None) -> Dict[str, Any]:
+        """Generate a complete caption with hook and body"""
+        return render_caption(self.catalog, *self._draw_caption(topic))
+    
+    def generate_hashtags(self, count: int = 15, include_custom: List[str] = None, budget: int = None) -> List[str]:
+        """Generate a mix of up to count hashtags for maximum reach
+        
+        Custom hashtags are always kept (up to count), and only the tags
+        still wanted are drawn: the group quotas are scaled down to fewer,
+        or topped up from all groups for more. With a budget the tags
+        joined by spaces fit in that many characters; see fit_hashtags().
+        """
+        wanted = count - len(custom_hashtags(include_custom))
+        tags = self._draw_hashtags(wanted) if wanted > 0 else []
+        return render_hashtags(self.catalog, tags, count, include_custom, budget)
+    
+    def _pick_concept(self, difficulty: str = None, duration: str = None, topic: str = None) -> VideoConcept:
+        """Pick a video concept matching the optional difficulty, duration bucket and topic"""
+        catalog = self.catalog
+        positions = catalog.concept_index.select(difficulty, duration, topic)
+        return catalog.video_concepts[self._pick("concept", positions)]
+    
+    def generate_video_concept(self, difficulty: str = None, duration: str = None, topic: str = None) -> Dict[str, Any]:
+        """Generate a complete video concept
+        
+        difficulty is easy/medium/hard and duration is a DURATION_BUCKETS
+        name (short/medium/long). Without a topic, one the concept suits is
+        suggested. Raises ValueError when no concept matches the filters.
+        """
+        concept = self._pick_concept(difficulty, duration, topic)
+        catalog = self.catalog
+        if topic is None and concept.topics:
+            topic = self.rng.choice(concept.topics)
+        elif topic is None:
+            topic = catalog.topics[self._pick("topic", range(len(catalog.topics)))]
+        angle = catalog.trending_angles[self._pick("angle", range(len(catalog.trending_angles)))]
+        caption = self.generate_caption(topic)
+        
+        return {
+            **concept.to_dict(),
+            "suggested_topic": topic,
+            "trending_angle": angle,
+            "hook": caption["hook"],
+            "caption": caption,
+            "hashtags": self.generate_hashtags()
+        }
+    
+    def generate_content_idea(self) -> Dict[str, Any]:
+        """Generate a single content idea"""
+        catalog = self.catalog
+        topic = catalog.topics[self._pick("topic", range(len(catalog.topics)))]
+        angle = catalog.trending_angles[self._pick("angle", range(len(catalog.trending_angles)))]
+        
+        return {
+            "topic": topic,
+            "angle": angle,
+            "hook": self.generate_hook(),
+            "video_concept": self._pick_concept(topic=topic).title
+        }
+    
+    def generate_content_ideas(self, count: int = 5) -> List[Dict[str, Any]]:
+        """Generate multiple content ideas"""
+        return [self.generate_content_idea() for _ in range(count)]
+    
+    def _draw_post(self, topic: str = None, concept: int = None) -> Tuple[str, int, int, int, int, List[int]]:
+        """Draw a post's topic and the positions of its hook, template, concept, angle and hashtags
+        
+        With a concept position given, the topic (unless given) is one the
+        concept suits.
+        """
+        catalog = self.catalog
+        if concept is not None and topic is None and catalog.video_concepts[concept].topics:
+            topic = self.rng.choice(catalog.video_concepts[concept].topics)
+        topic, hook, template = self._draw_caption(topic)
+        if concept is None:
+            concept = self._pick("concept", catalog.concept_index.select(topic=topic))
+        tags = self._draw_hashtags()
+        lengths = self._caption_lengths()
+        if lengths.longest_post(topic) > self.caption_budget:
+            tags = lengths.fit_tags(tags, self.caption_budget - lengths.caption(topic, hook, template))
+        angle = self._pick("angle", range(len(catalog.trending_angles)))
+        return topic, hook, template, concept, angle, tags
+    
+    def generate_compact_post(self, topic: str = None) -> Post:
+        """Generate a post as catalog positions; see Post
+        
+        The topic, when given, must be one of the catalog topics.
+        """
+        catalog = self.catalog
+        if topic is not None and topic not in catalog.topics:
+            raise ValueError(f"Compact posts need a catalog topic, got {topic!r}")
+        topic, hook, template, concept, angle, tags = self._draw_post(topic)
+        return Post(catalog.version, catalog.topics.index(topic), hook, template, concept, angle, tuple(tags))
+    
+    def generate_post(self, topic: str = None, concept: int = None) -> Dict[str, Any]:
+        """Generate a complete TikTok post ready to use
+        
+        Each component (caption, concept, angle, hashtags) is generated
+        exactly once; the concept is picked directly rather than through
+        generate_video_concept, which would build a caption and hashtag
+        set of its own. `concept` fixes the video concept by catalog position.
+        """
+        return render_post(self.catalog, *self._draw_post(topic, concept), self.caption_budget)
+    
+    def generate_calendar_day(self, start_date: "datetime", index: int, content_type: str = None, concept: int = None) -> Dict[str, Any]:
+        """Generate the calendar entry for day `index` counted from start_date
+        
+        The content type follows CONTENT_MIX and the concept is drawn unless
+        given, e.g. by a schedule from optimizer.py.
+        """
+        date, day = calendar_date(start_date, index)
+        if content_type is None:
+            content_type = CONTENT_MIX[index % len(CONTENT_MIX)]
+        
+        return {
+            "date": date,
+            "day": day,
+            "content_type": content_type,
+            "post": self.generate_post(concept=concept)
+        }
+    
+    def generate_content_calendar(self, days: int = 7, start_date: "datetime" = None, workers: int = 1) -> List[Dict[str, Any]]:
+        """Generate a content calendar for specified days, optionally across worker processes"""
+        return list(self.generate_batch("calendar", days, workers=workers, start_date=start_date))
+    
+    def extend_calendar(self, calendar: List[Dict[str, Any]], days: int, workers: int = 1) -> List[Dict[str, Any]]:
+        """Generate the `days` days that follow an existing calendar
+        
+        Dates and the content mix rotation carry on from the last day. Days
+        are seeded by their position in the calendar, so with the seed that
+        made the calendar (as its first batch) the new days are exactly
+        those a longer run would have produced.
+        """
+        if not calendar:
+            raise ValueError("Cannot extend an empty calendar")
+        from datetime import datetime
+        start_date = datetime.strptime(calendar[0]["date"], "%Y-%m-%d")
+        if calendar_date(start_date, len(calendar) - 1)[0] != calendar[-1]["date"]:
+            raise ValueError(f"Calendar days must be consecutive, but {len(calendar)} days end on {calendar[-1]['date']}")
+        return list(self.generate_batch(
+            "calendar",
+            len(calendar) + days,
+            workers=workers,
+            skip=len(calendar),
+            start_date=start_date
+        ))
+    
+    def shard(self, index: int, total: int) -> "TikTokContentGenerator":
+        """Return a copy that only produces shard `index` of `total` of each batch
+        
+        All shards of a seeded generator share its seed, so running every
+        shard (in any process) yields exactly the items of the unsharded run.
+        """
+        import copy
+        
+        shard_bounds(0, index, total)
+        sharded = copy.copy(self)
+        sharded.rng = random.Random(self.seed)
+        sharded._samplers = copy.deepcopy(self._samplers)
+        sharded.shard_index = index
+        sharded.shard_total = total
+        return sharded
+    
+    def _seed_item(self, batch: int, index: int):
+        """Reseed the RNG for one batch item so it does not depend on its neighbours"""
+        self.rng.seed(f"{self.seed}:{batch}:{index}")
+    
+    def _batch_item(self, kind: str, options: Dict[str, Any]) -> Any:
+        """Build one batch record of the given kind"""
+        if kind == "ideas":
+            return self.generate_content_idea()
+        if kind == "post":
+            return self.generate_post(options.get("topic"))
+        if kind == "caption":
+            return self.generate_caption(options.get("topic"))
+        if kind == "hashtags":
+            return self.generate_hashtags(options.get("count", 15), options.get("include_custom"))
+        if kind == "compact":
+            return self.generate_compact_post(options.get("topic"))
+        return self.generate_video_concept(options.get("difficulty"), options.get("duration"), options.get("topic"))
+    
+    def generate_batch(self, kind: str, n: int, workers: int = 1, skip: int = 0, **options) -> Iterator[Any]:
+        """Lazily generate n records of one kind, yielding each as soon as it is built
+        
+        kind is one of BATCH_KINDS. Options are passed to the underlying
+        generator: `topic` for post/caption/concept, `difficulty`/`duration` for concept and
+        `count`/`include_custom` for hashtags. For "calendar" each record is
+        one calendar day, so n is the number of days, and `start_date`
+        (default: now) fixes the first date; `plan`, a (content type, concept
+        position) pair per day, overrides the content mix and concept draws.
+        "compact" yields Post objects
+        instead of dicts. A sharded generator only yields its own slice of
+        the n records. `skip` leaves out the first records, e.g. those an
+        interrupted run already wrote; the rest are unchanged.
+        
+        `backend="numpy"` samples post, compact, caption and hashtag batches in
+        blocks with NumPy (see NumpySampler); other kinds, or a missing
+        NumPy, use the default pure-Python backend.
+        
+        With workers > 1 the items are generated in a process pool and
+        yielded in order; the records are identical to a single-process run.
+        """
+        if kind not in BATCH_KINDS:
+            raise ValueError(f"Unknown batch kind {kind!r}, expected one of {', '.join(BATCH_KINDS)}")
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        
+        batch = self._batches
+        self._batches += 1
+        start, stop = shard_bounds(n, self.shard_index, self.shard_total)
+        start = min(max(start, skip), stop)
+        if kind == "calendar" and not options.get("start_date"):
+            from datetime import datetime
+            options["start_date"] = datetime.now()
+        backend = options.get("backend", "python")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+        if backend == "numpy" and _import_numpy() is None:
+            warnings.warn("NumPy is not installed; falling back to the python backend", RuntimeWarning)
+            options["backend"] = "python"
+        if self.repeat_window and (workers > 1 or options.get("backend") == "numpy"):
+            warnings.warn(
+                "Repeat avoidance depends on every earlier draw; generating this batch "
+                "in one process with the python backend",
+                RuntimeWarning
+            )
+            workers = 1
+            options["backend"] = "python"
+        if self.caption_index is not None and (workers > 1 or options.get("backend") == "numpy"):
+            warnings.warn(
+                "Caption deduplication checks every caption against the ones before it; "
+                "generating this batch in one process with the python backend",
+                RuntimeWarning
+            )
+            workers = 1
+            options["backend"] = "python"
+        if self.exclusions and options.get("backend") == "numpy":
+            warnings.warn("Exclusions are applied by the python backend; generating this batch with it", RuntimeWarning)
+            options["backend"] = "python"
+        if (
+            options.get("backend") == "numpy"
+            and kind in ("post", "compact", "caption")
+            and self._caption_lengths().longest_post(options.get("topic")) > self.caption_budget
+        ):
+            warnings.warn(
+                f"Some posts may not fit in {self.caption_budget} characters and are fitted by "
+                "the python backend; generating this batch with it",
+                RuntimeWarning
+            )
+            options["backend"] = "python"
+        
+        if workers == 1 or stop - start <= PARALLEL_CHUNK_SIZE:
+            return self._iter_batch(kind, batch, start, stop, options)
+        return self._iter_parallel(kind, batch, start, stop, options, workers)
+    
+    def _iter_parallel(self, kind: str, batch: int, start: int, stop: int, options: Dict[str, Any], workers: int) -> Iterator[Any]:
+        """Yield items start..stop-1 in order, generating chunks in a process pool
+        
+        At most two chunks per worker are in flight, so memory stays bounded
+        no matter how large the batch is.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        
+        chunks = chunk_bounds(start, stop, PARALLEL_CHUNK_SIZE)
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(self,)) as executor:
+            pending = deque()
+            for chunk_start, chunk_stop in chunks:
+                pending.append(executor.submit(_generate_chunk, kind, batch, chunk_start, chunk_stop, options))
+                if len(pending) >= 2 * workers:
+                    break
+            
+            while pending:
+                yield from pending.popleft().result()
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    pending.append(executor.submit(_generate_chunk, kind, batch, *chunk, options))
+    
+    def _iter_batch(self, kind: str, batch: int, start: int, stop: int, options: Dict[str, Any]) -> Iterator[Any]:
+        """Yield the records of items start..stop-1 of a batch"""
+        if kind in BULK_KINDS and options.get("backend") == "numpy":
+            yield from self._iter_bulk(kind, batch, start, stop, options)
+        elif kind == "calendar":
+            start_date = options["start_date"]
+            plan = options.get("plan")
+            for i in range(start, stop):
+                self._seed_item(batch, i)
+                if plan is None:
+                    yield self.generate_calendar_day(start_date, i)
+                else:
+                    yield self.generate_calendar_day(start_date, i, *plan[i])
+        else:
+            for i in range(start, stop):
+                self._seed_item(batch, i)
+                yield self._batch_item(kind, options)
+    
+    def _iter_bulk(self, kind: str, batch: int, start: int, stop: int, options: Dict[str, Any]) -> Iterator[Any]:
+        """Yield items start..stop-1 from NumPy-drawn blocks of PARALLEL_CHUNK_SIZE items
+        
+        Each aligned block is drawn from its own seed, so any slice of the
+        batch (shard or worker chunk) reproduces the same items.
+        """
+        catalog = self.catalog
+        if self._numpy_sampler is None or self._numpy_sampler.catalog is not catalog:
+            self._numpy_sampler = NumpySampler(catalog)
+        sampler = self._numpy_sampler
+        topic = options.get("topic")
+        count = options.get("count", 15)
+        include_custom = options.get("include_custom")
+        total_tags = count - len(custom_hashtags(include_custom)) if kind == "hashtags" else 0
+        seed = divmod(self.seed % (1 << 128), 1 << 64)
+        
+        for chunk_start, chunk_stop in chunk_bounds(start, stop, PARALLEL_CHUNK_SIZE):
+            block = chunk_start // PARALLEL_CHUNK_SIZE
+            columns = sampler.draw([*seed, batch, block], PARALLEL_CHUNK_SIZE, kind, topic, total_tags)
+            for row in range(chunk_start - block * PARALLEL_CHUNK_SIZE, chunk_stop - block * PARALLEL_CHUNK_SIZE):
+                if kind == "post":
+                    yield render_post(
+                        catalog,
+                        columns["topic"][row],
+                        columns["hook"][row],
+                        columns["template"][row],
+                        columns["concept"][row],
+                        columns["angle"][row],
+                        columns["tags"][row],
+                        self.caption_budget
+                    )
+                elif kind == "compact":
+                    yield Post(
+                        catalog.version,
+                        columns["topic_index"][row],
+                        columns["hook"][row],
+                        columns["template"][row],
+                        columns["concept"][row],
+                        columns["angle"][row],
+                        tuple(columns["tags"][row])
+                    )
+                elif kind == "caption":
+                    yield render_caption(catalog, columns["topic"][row], columns["hook"][row], columns["template"][row])
+                else:
+                    yield render_hashtags(catalog, columns["tags"][row], count, include_custom)
+
+
+_worker_generator = None
+
+
+def _init_worker(generator: TikTokContentGenerator):
+    """Process pool initializer: keep one copy of the parent generator per worker"""
+    global _worker_generator
+    _worker_generator = generator
+
+
+def _generate_chunk(kind: str, batch: int, start: int, stop: int, options: Dict[str, Any]) -> List[Any]:
+    """Process pool task: build items start..stop-1 of a batch"""
+    return list(_worker_generator._iter_batch(kind, batch, start, stop, options))
+
+
+def write_jsonl(records: Iterable[Any], stream: IO[str], flush_every: int = 0) -> int:
+    """Write records to stream as JSON Lines, one record per line as it arrives
+    
+    With flush_every, the stream is flushed after every that many records,
+    so a killed process leaves at most that many records unwritten.
+    """
+    import json
+    
+    written = 0
+    for record in records:
+        stream.write(json.dumps(record))
+        stream.write("\n")
+        written += 1
+        if flush_every and written % flush_every == 0:
+            stream.flush()
+    return written
+
+
+def complete_lines(path: str) -> int:
+    """Count the complete lines of a JSON Lines file, cutting off a torn last line"""
+    count = 0
+    end = 0
+    offset = 0
+    with open(path, "rb+") as f:
+        while True:
+            block = f.read(1 << 20)
+            if not block:
+                break
+            newlines = block.count(b"\n")
+            if newlines:
+                count += newlines
+                end = offset + block.rindex(b"\n") + 1
+            offset += len(block)
+        if end != offset:
+            f.truncate(end)
+    return count
+
+
+def calendar_date(start_date: "datetime", index: int) -> Tuple[str, str]:
+    """Return the date and weekday name of day `index` counted from start_date"""
+    from datetime import timedelta
+    post_date = start_date + timedelta(days=index)
+    return post_date.strftime("%Y-%m-%d"), post_date.strftime("%A")
+
+
+def save_json(result: Any, path: str):
+    """Save a result to path as indented JSON"""
+    import json
+    
+    with open(path, 'w') as f:
+        json.dump(result, f, indent=2)
+
+
+def _styled(text: str, style: str) -> str:
+    global _emoji_regex
+    if style != "no-emoji":
+        return text
+    if _emoji_regex is None:
+        import re
+        _emoji_regex = re.compile(EMOJI_PATTERN)
+    return _emoji_regex.sub("", text)
+
+
+def _heading(title: str, style: str) -> str:
+    if style == "markdown":
+        return f"\n## {title}\n"
+    return f"\n{'='*60}\n{title}\n{'='*60}\n"
+
+
+def _field(label: str, value: Any, style: str) -> str:
+    if style == "markdown":
+        return f"**{label}:** {value}\n"
+    return f"{label}: {value}\n"
+
+
+def _bullets(items: Iterable[str], style: str) -> str:
+    bullet = "- " if style == "markdown" else "  • "
+    return "".join(f"{bullet}{item}\n" for item in items)
+
+
+def _numbered(items: Iterable[str], style: str) -> str:
+    indent = "" if style == "markdown" else "  "
+    return "".join(f"{indent}{i}. {item}\n" for i, item in enumerate(items, 1))
+
+
+def format_post(post: Dict[str, Any], style: str = "plain") -> str:
+    """Render a post as one string in the given style"""
+    concept = post['video_concept']
+    return _styled("".join((
+        _heading("🎬 VIDEO CONCEPT", style),
+        _field("Title", concept['title'], style),
+        _field("Description", concept['description'], style),
+        _field("Duration", concept['duration'], style),
+        "\n",
+        _field("Trending Angle", post['trending_angle'], style),
+        "\n**Shot List:**\n" if style == "markdown" else "\nShot List:\n",
+        _numbered(concept['shots'], style),
+        _heading("📝 CAPTION", style),
+        f"\n{post['caption']}\n",
+        _heading("🏷️  HASHTAGS", style),
+        " ".join(post['hashtags']),
+        "\n",
+        _field("Length", "{used}/{limit} characters".format(**post['caption_budget']), style) if 'caption_budget' in post else "",
+        _heading("⏰ BEST POSTING TIMES", style),
+        _bullets(post['best_posting_times'], style),
+        _heading("💡 ENGAGEMENT TIPS", style),
+        _bullets(post['engagement_tips'], style),
+        "\n\n"
+    )), style)
+
+
+def format_records(kind: str, records: Sequence[Any], style: str = "plain") -> Iterator[str]:
+    """Yield the console listing for a result of --type kind, one string per record"""
+    if kind == "post":
+        for post in [records] if isinstance(records, dict) else records:
+            yield format_post(post, style)
+        return
+    
+    titles = {
+        "ideas": "💡 CONTENT IDEAS",
+        "caption": "📝 CAPTIONS",
+        "hashtags": "🏷️  HASHTAGS",
+        "concept": "🎬 VIDEO CONCEPTS",
+        "calendar": "📅 CONTENT CALENDAR"
+    }
+    yield _styled(f"\n## {titles[kind]}\n\n" if style == "markdown" else f"\n{titles[kind]}\n\n", style)
+    
+    if kind == "hashtags":
+        # One set of tags, or a list of sets from --sets
+        for tags in records if records and isinstance(records[0], list) else [records]:
+            yield " ".join(tags) + "\n\n"
+        return
+    for i, record in enumerate(records, 1):
+        if kind == "ideas":
+            text = f"{i}. {record['topic']} - {record['angle']}\n   Hook: {record['hook']}\n\n"
+        elif kind == "caption":
+            text = f"{i}.\n{record['full_caption']}\n\n"
+        elif kind == "concept":
+            text = f"{i}. {record['title']} ({record['difficulty']})\n   {record['description']}\n\n"
+        else:
+            text = f"{record['date']} - {record['day']}: {record['post']['video_concept']['title']}\n"
+        yield _styled(text, style)
+
+
+def write_buffered(texts: Iterable[str], stream: IO[str] = None, buffer_size: int = RENDER_BUFFER_SIZE) -> int:
+    """Write pre-rendered strings to stream (default stdout) in large blocks
+
+    Returns the number of strings written.
+    """
+    stream = stream if stream is not None else sys.stdout
+    pending = []
+    size = 0
+    written = 0
+    for text in texts:
+        pending.append(text)
+        size += len(text)
+        written += 1
+        if size >= buffer_size:
+            stream.write("".join(pending))
+            pending = []
+            size = 0
+    if pending:
+        stream.write("".join(pending))
+    stream.flush()
+    return written
+
+
+def print_formatted_post(post: Dict[str, Any], style: str = "plain"):
+    """Pretty print a post"""
+    write_buffered((format_post(post, style),))
+
+
+def interactive_mode():
+    """Run the generator in interactive mode"""
+    generator = TikTokContentGenerator()
+    
+    print("\n" + "="*60)
+    print("🚗 TikTok Content Generator for Mobile Detailing")
+    print("="*60)
+    
+    while True:
+        print("\nWhat would you like to generate?")
+        print("1. Complete Post")
+        print("2. Content Ideas")
+        print("3. Just Captions")
+        print("4. Just Hashtags")
+        print("5. Video Concepts")
+        print("6. Content Calendar")
+        print("7. Exit")
+        
+        choice = input("\nEnter your choice (1-7): ").strip()
+        
+        if choice == "1":
+            topic = input("Enter a specific topic (or press Enter for random): ").strip()
+            topic = topic if topic else None
+            post = generator.generate_post(topic)
+            print_formatted_post(post)
+            
+        elif choice == "2":
+            count = input("How many ideas? (default 5): ").strip()
+            count = int(count) if count.isdigit() else 5
+            ideas = generator.generate_content_ideas(count)
+            
+            write_buffered((
+                _heading("💡 CONTENT IDEAS", "plain"),
+                *(
+                    f"\n{i}. Topic: {idea['topic']}\n"
+                    f"   Angle: {idea['angle']}\n"
+                    f"   Concept: {idea['video_concept']}\n"
+                    f"   Hook: {idea['hook']}\n"
+                    for i, idea in enumerate(ideas, 1)
+                ),
+                "\n"
+            ))
+            
+        elif choice == "3":
+            count = input("How many captions? (default 3): ").strip()
+            count = int(count) if count.isdigit() else 3
+            
+            write_buffered((
+                _heading("📝 CAPTIONS", "plain"),
+                *(f"\n{i+1}.\n{generator.generate_caption()['full_caption']}\n" for i in range(count)),
+                "\n"
+            ))
+            
+        elif choice == "4":
+            count = input("How many hashtags? (default 15): ").strip()
+            count = int(count) if count.isdigit() else 15
+            hashtags = generator.generate_hashtags(count)
+            
+            write_buffered((_heading("🏷️  HASHTAGS", "plain"), " ".join(hashtags), "\n\n"))
+            
+        elif choice == "5":
+            difficulty = input("Difficulty? (easy/medium/hard or press Enter for any): ").strip()
+            difficulty = difficulty if difficulty else None
+            try:
+                concept = generator.generate_video_concept(difficulty)
+            except ValueError as e:
+                print(f"\n❌ {e}")
+                continue
+            
+            write_buffered((
+                _heading("🎬 VIDEO CONCEPT", "plain"),
+                f"Title: {concept['title']}\n",
+                f"Description: {concept['description']}\n",
+                f"Duration: {concept['duration']}\n",
+                f"Difficulty: {concept['difficulty']}\n",
+                f"Suggested Topic: {concept['suggested_topic']}\n",
+                f"Trending Angle: {concept['trending_angle']}\n",
+                "\nShot List:\n",
+                _numbered(concept['shots'], "plain"),
+                "\n"
+            ))
+            
+        elif choice == "6":
+            days = input("How many days? (default 7): ").strip()
+            days = int(days) if days.isdigit() else 7
+            calendar = generator.generate_content_calendar(days)
+            
+            write_buffered((
+                _heading("📅 CONTENT CALENDAR", "plain"),
+                *(
+                    f"\n📆 {day['date']} - {day['day']}\n"
+                    f"Type: {day['content_type']}\n"
+                    f"Concept: {day['post']['video_concept']['title']}\n"
+                    f"Hook: {day['post']['hook']}\n"
+                    for day in calendar
+                ),
+                "\n"
+            ))
+            
+        elif choice == "7":
+            print("\n👋 Thanks for using TikTok Content Generator!")
+            break
+        
+        else:
+            print("\n❌ Invalid choice. Please try again.")
+
+
+def _resume_point(generator: TikTokContentGenerator, args: "argparse.Namespace", settings: Dict[str, Any]) -> int:
+    """Return how many records of --output an interrupted run already wrote, 0 for a new run
+    
+    A new run saves its settings to the checkpoint file. A resumed run takes
+    the seed and start date from it (so an unseeded run continues with the
+    same random seed) and refuses to continue with different settings.
+    """
+    import json
+    
+    checkpoint = args.output + CHECKPOINT_SUFFIX
+    if not (os.path.exists(checkpoint) and os.path.exists(args.output)):
+        with open(checkpoint, 'w') as f:
+            json.dump(settings, f)
+        return 0
+    
+    with open(checkpoint) as f:
+        saved = json.load(f)
+    if args.seed is None:
+        settings["seed"] = saved.get("seed")
+    if args.start_date is None:
+        settings["start_date"] = saved.get("start_date")
+    if saved != settings:
+        changed = ", ".join(sorted(key for key in settings if saved.get(key) != settings[key]))
+        raise ValueError(f"{args.output} was started with different settings ({changed}); remove {checkpoint} to start over")
+    generator.seed = settings["seed"]
+    return complete_lines(args.output)
+
+
+def stream_records(generator: TikTokContentGenerator, args: "argparse.Namespace", history: Any = None):
+    """Write a batch straight to --output (or stdout) as JSON Lines, recording it in history if given
+    
+    With --resume, a run that was killed continues after the last record
+    it wrote instead of starting over.
+    """
+    from datetime import datetime
+    
+    n = {"calendar": args.days, "hashtags": args.sets}.get(args.type, args.count)
+    options = {
+        "topic": args.topic,
+        "difficulty": args.difficulty,
+        "duration": args.duration,
+        "backend": args.backend
+    }
+    start_date = args.start_date or datetime.now()
+    skip = 0
+    if args.resume:
+        settings = {"type": args.type, "n": n, "seed": generator.seed, "shard": args.shard, **options}
+        settings["start_date"] = start_date.strftime("%Y-%m-%d") if args.type == "calendar" else None
+        skip = _resume_point(generator, args, settings)
+        if settings["start_date"]:
+            start_date = datetime.strptime(settings["start_date"], "%Y-%m-%d")
+    if args.type == "calendar":
+        options["start_date"] = start_date
+    if args.type == "hashtags":
+        options["count"] = args.count
+    
+    records = generator.generate_batch(args.type, n, workers=args.workers, skip=skip, **options)
+    if history is not None and args.type in HISTORY_KINDS:
+        records = history.recording(generator.catalog, args.type, records)
+    
+    if args.output:
+        with open(args.output, 'a' if skip else 'w') as f:
+            written = write_jsonl(records, f, CHECKPOINT_INTERVAL if args.resume else 0)
+        if args.resume:
+            os.remove(args.output + CHECKPOINT_SUFFIX)
+        resumed = f" after {skip} already written" if skip else ""
+        print(f"✅ Streamed {written} records to {args.output}{resumed}", file=sys.stderr)
+    else:
+        try:
+            write_jsonl(records, sys.stdout)
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # The reader stopped early (e.g. `| head`). Point stdout at
+            # devnull so the flush at exit cannot raise again, then stop
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+            sys.exit(1)
+
+
+def extend_calendar_file(generator: TikTokContentGenerator, args: "argparse.Namespace") -> List[Dict[str, Any]]:
+    """Add --days days to the calendar saved in --extend and return the new days
+    
+    The whole calendar is saved to --output, or back to the --extend file.
+    """
+    import json
+    
+    with open(args.extend) as f:
+        calendar = json.load(f)
+    if not isinstance(calendar, list):
+        raise ValueError(f"{args.extend} does not hold a calendar")
+    days = generator.extend_calendar(calendar, args.days, args.workers)
+    
+    if not args.quiet:
+        write_buffered(format_records("calendar", days, args.style))
+    target = args.output or args.extend
+    save_json(calendar + days, target)
+    if not args.quiet:
+        print(f"\n✅ Added {len(days)} days; {len(calendar) + len(days)} days saved to {target}")
+    return days
+
+
+def archive_posts(generator: TikTokContentGenerator, args: "argparse.Namespace"):
+    """Write --count compact posts to a binary archive at --output"""
+    from post_archive import PostArchiveWriter
+    
+    posts = generator.generate_batch(
+        "compact",
+        args.count,
+        topic=args.topic,
+        backend=args.backend,
+        workers=args.workers
+    )
+    with PostArchiveWriter(args.output, generator.catalog) as archive:
+        written = archive.write_all(posts)
+    print(f"✅ Archived {written} posts to {args.output}", file=sys.stderr)
+
+
+def print_results(generator: TikTokContentGenerator, args: "argparse.Namespace"):
+    """Generate the requested content, print it, optionally save it as JSON and return it
+    
+    With --quiet nothing is rendered; the result is only saved to --output.
+    """
+    if args.type == "ideas":
+        result = list(generator.generate_batch("ideas", args.count, args.workers))
+    elif args.best_of:
+        from scoring import top_candidates
+        best = top_candidates(generator, args.type, args.count, args.best_of, args.scorer, args.backend, args.topic)
+        result = [record for _, record in best]
+    elif args.type == "post":
+        result = generator.generate_post(args.topic)
+    elif args.type == "caption":
+        result = list(generator.generate_batch("caption", args.count, args.workers, topic=args.topic))
+    elif args.type == "hashtags":
+        # Drawn as a batch so --shard splits the sets; a single set stays a plain list
+        sets = list(generator.generate_batch("hashtags", args.sets, args.workers, count=args.count))
+        result = sets[0] if args.sets == 1 and sets else sets
+    elif args.type == "concept":
+        result = list(generator.generate_batch(
+            "concept",
+            args.count,
+            args.workers,
+            difficulty=args.difficulty,
+            duration=args.duration,
+            topic=args.topic
+        ))
+    elif args.optimize:
+        from optimizer import optimized_calendars
+        result = optimized_calendars(generator, args.days, args.start_date, args.optimize, workers=args.workers)[0]
+    else:
+        result = generator.generate_content_calendar(args.days, args.start_date, args.workers)
+    
+    if not args.quiet:
+        write_buffered(format_records(args.type, result, args.style))
+    
+    if args.output and result:
+        save_json(result, args.output)
+        if not args.quiet:
+            print(f"\n✅ Results saved to {args.output}")
+    return result
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        description="TikTok Content Generator for Mobile Detailing Business"
+    )
+    parser.add_argument(
+        "--type",
+        choices=["ideas", "post", "caption", "hashtags", "concept", "calendar"],
+        help="Type of content to generate"
+    )
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=5,
+        help="Number of items to generate (for --type hashtags, tags per set)"
+    )
+    parser.add_argument(
+        "--sets",
+        type=int,
+        default=1,
+        help="Number of hashtag sets for --type hashtags, each of --count tags"
+    )
+    parser.add_argument(
+        "--topic",
+        type=str,
+        help="Specific topic for content"
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=7,
+        help="Number of days for content calendar"
+    )
+    parser.add_argument(
+        "--optimize",
+        type=str,
+        metavar="FILE",
+        help="Plan calendar concepts and content types under the JSON constraints in FILE (see optimizer.py)"
+    )
+    parser.add_argument(
+        "--start-date",
+        type=str,
+        metavar="YYYY-MM-DD",
+        help="First day of the content calendar (default: today)"
+    )
+    parser.add_argument(
+        "--extend",
+        type=str,
+        metavar="FILE",
+        help="Add --days days to the calendar saved in FILE, continuing its dates and content mix"
+    )
+    parser.add_argument(
+        "--difficulty",
+        choices=["easy", "medium", "hard"],
+        help="Difficulty level for video concepts"
+    )
+    parser.add_argument(
+        "--duration",
+        choices=[name for name, _ in DURATION_BUCKETS],
+        help="Video length for concepts (short: up to 30s, medium: up to 45s, long: over 45s)"
+    )
+    parser.add_argument(
+        "--interactive",
+        action="store_true",
+        help="Run in interactive mode"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        help="Output results to JSON file"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["json", "jsonl", "archive"],
+        default="json",
+        help="Output format; jsonl writes one record per line as it is generated, "
+             "archive writes posts to a compact binary file (see post_archive.py)"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream records as JSON Lines to --output (or stdout) instead of printing"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue a killed --stream run to --output where it stopped"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Seed for reproducible output"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes for batches and calendars"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        help="Sampling backend for streamed post/caption/hashtag batches (numpy needs NumPy; "
+             "default: python, or numpy for --best-of when NumPy is installed)"
+    )
+    parser.add_argument(
+        "--avoid-repeats",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Never reuse a hook, template, topic, concept or angle within N draws"
+    )
+    parser.add_argument(
+        "--repeat-state",
+        type=str,
+        metavar="FILE",
+        help="JSON file that carries repeat avoidance across runs (read if present, then updated)"
+    )
+    parser.add_argument(
+        "--history",
+        type=str,
+        metavar="DB",
+        help="SQLite posting history: skip items used in the last --history-days and record new posts, captions and calendars"
+    )
+    parser.add_argument(
+        "--history-days",
+        type=int,
+        default=30,
+        metavar="N",
+        help="How many days of --history to avoid reusing"
+    )
+    parser.add_argument(
+        "--dedup",
+        type=str,
+        metavar="FILE",
+        help="Caption index (see dedup.py): redraw captions that nearly duplicate ones already in it, then save it"
+    )
+    parser.add_argument(
+        "--dedup-threshold",
+        type=float,
+        default=0.6,
+        help="Shingle similarity from which --dedup treats captions as duplicates"
+    )
+    parser.add_argument(
+        "--caption-budget",
+        type=int,
+        default=CAPTION_LIMIT,
+        metavar="N",
+        help=f"Characters a post's caption and hashtags may take together (TikTok allows {CAPTION_LIMIT})"
+    )
+    parser.add_argument(
+        "--best-of",
+        type=int,
+        metavar="N",
+        help="Score N candidate posts or captions and keep the best --count (see scoring.py)"
+    )
+    parser.add_argument(
+        "--score-weights",
+        type=str,
+        metavar="NAME=W,...",
+        help="Weights of the --best-of heuristics (hook, length, hashtags, freshness), e.g. hook=2,length=0.5"
+    )
+    parser.add_argument(
+        "--shard",
+        type=str,
+        metavar="INDEX/TOTAL",
+        help="Only generate shard INDEX of TOTAL of a batch or calendar (e.g. 0/4)"
+    )
+    parser.add_argument(
+        "--style",
+        choices=RENDER_STYLES,
+        default="plain",
+        help="Console rendering style"
+    )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Do not print results; only save them to --output"
+    )
+    parser.add_argument(
+        "--catalog",
+        type=str,
+        metavar="PATH",
+        help="Load content from a JSON catalog file or directory (see catalog_files.py)"
+    )
+    parser.add_argument(
+        "--reload-interval",
+        type=float,
+        default=2.0,
+        metavar="SECONDS",
+        help="How often --serve checks --catalog files for changes (0 disables)"
+    )
+    parser.add_argument(
+        "--tenants",
+        type=str,
+        metavar="DIR",
+        help="Directory of <tenant>.json files (see tenants.py); --serve answers ?tenant=ID from it"
+    )
+    parser.add_argument(
+        "--tenant",
+        type=str,
+        metavar="ID",
+        help="Generate for one tenant from --tenants"
+    )
+    parser.add_argument(
+        "--max-tenants",
+        type=int,
+        default=1000,
+        help="Most tenant generators --serve keeps loaded"
+    )
+    parser.add_argument(
+        "--tenant-memory-mb",
+        type=float,
+        default=256,
+        metavar="MB",
+        help="Estimated memory limit for tenant generators --serve keeps loaded"
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run an HTTP service for content instead of generating once (see server.py)"
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="Address for --serve to listen on"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8080,
+        help="Port for --serve to listen on"
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="-",
+        metavar="FILE",
+        help="Profile generation: print a table to stderr, or save JSON (.json) "
+             "or cProfile stats (.pstats/.prof) to FILE"
+    )
+    
+    args = parser.parse_args()
+    if args.avoid_repeats < 0:
+        parser.error("--avoid-repeats must not be negative")
+    if args.start_date:
+        from datetime import datetime
+        try:
+            args.start_date = datetime.strptime(args.start_date, "%Y-%m-%d")
+        except ValueError:
+            parser.error(f"--start-date must look like 2024-01-31, got {args.start_date!r}")
+    if args.extend and args.type != "calendar":
+        parser.error("--extend needs --type calendar")
+    if args.extend and args.start_date:
+        parser.error("--extend continues from the calendar's own dates; drop --start-date")
+    if args.optimize:
+        from optimizer import load_constraints
+        if args.type != "calendar" or args.extend or args.stream or args.format != "json":
+            parser.error("--optimize needs --type calendar without --extend or --stream")
+        try:
+            args.optimize = load_constraints(args.optimize)
+        except (OSError, ValueError) as e:
+            parser.error(f"invalid --optimize: {e}")
+    if args.best_of is not None:
+        if args.type not in ("post", "caption") or args.stream or args.format != "json":
+            parser.error("--best-of needs --type post or caption without --stream")
+        if args.best_of < args.count:
+            parser.error("--best-of must be at least --count")
+    if args.caption_budget < 1:
+        parser.error("--caption-budget must be at least 1")
+    if args.sets < 1:
+        parser.error("--sets must be at least 1")
+    if args.resume and not ((args.stream or args.format == "jsonl") and args.output):
+        parser.error("--resume needs --stream (or --format jsonl) and --output")
+    if args.resume and args.avoid_repeats:
+        parser.error("--resume cannot reproduce --avoid-repeats draws")
+    if args.resume and args.dedup:
+        parser.error("--resume cannot reproduce --dedup draws")
+    if args.resume and args.history:
+        # History is written in large chunks, so a killed run leaves records
+        # in the output it never recorded, and the resumed run would draw
+        # against exclusions that include the killed run's own records
+        parser.error("--resume cannot reproduce --history exclusions or record a killed run's records")
+    if args.serve and args.dedup:
+        parser.error("--dedup applies to generated batches, not --serve")
+    catalog_source = None
+    catalog = None
+    if args.catalog:
+        from catalog_files import CatalogSource
+        catalog_source = CatalogSource(args.catalog)
+        try:
+            catalog = catalog_source.load()
+        except (OSError, ValueError) as e:
+            parser.error(f"invalid --catalog: {e}")
+    tenants = None
+    seed = args.seed
+    if args.tenant and not args.tenants:
+        parser.error("--tenant needs --tenants")
+    if args.tenants:
+        from tenants import tenant_registry
+        try:
+            tenants = tenant_registry(args.tenants, args.max_tenants, args.tenant_memory_mb, args.seed, catalog)
+            if args.tenant:
+                # Seed as the service does, so --tenant output matches ?tenant=
+                catalog = tenants.loader(args.tenant)
+                seed = tenants.tenant_seed(args.tenant)
+        except KeyError as e:
+            parser.error(e.args[0])
+        except ValueError as e:
+            parser.error(str(e))
+    generator = TikTokContentGenerator(seed, catalog=catalog, repeat_window=args.avoid_repeats)
+    shortest = generator._caption_lengths().shortest_caption(args.topic)
+    if args.caption_budget < shortest:
+        if args.topic:
+            parser.error(f"--caption-budget {args.caption_budget} cannot hold any caption about {args.topic!r}; the shortest takes {shortest} characters")
+        parser.error(f"--caption-budget {args.caption_budget} cannot hold a caption about every topic; "
+                     f"some need {shortest} characters (or pick a --topic)")
+    generator.caption_budget = args.caption_budget
+    history = None
+    if args.history:
+        from history import PostHistory
+        if args.history_days < 1:
+            parser.error("--history-days must be at least 1")
+        history = PostHistory(args.history, args.tenant or "default")
+        generator.set_exclusions(history.exclusions(generator.catalog, args.history_days))
+    if args.repeat_state and os.path.exists(args.repeat_state):
+        import json
+        with open(args.repeat_state) as f:
+            generator.load_repeat_state(json.load(f))
+    if args.backend is None:
+        # Scoring a large pool is only fast with NumPy drawing the candidates
+        args.backend = "numpy" if args.best_of and _import_numpy() is not None else "python"
+    if args.best_of:
+        from scoring import HEURISTICS, Scorer, TopicFreshness, parse_weights
+        if args.topic and args.topic not in generator.catalog.topics:
+            parser.error(f"--best-of needs a catalog topic, got {args.topic!r} (expected one of {', '.join(generator.catalog.topics)})")
+        heuristics = dict(HEURISTICS)
+        if history is not None:
+            heuristics["freshness"] = TopicFreshness(history.usage(generator.catalog, "topic", args.history_days))
+        try:
+            args.scorer = Scorer(parse_weights(args.score_weights) if args.score_weights else None, heuristics)
+        except ValueError as e:
+            parser.error(f"invalid --score-weights: {e}")
+    if args.dedup:
+        from dedup import CaptionIndex
+        try:
+            generator.caption_index = CaptionIndex.open(args.dedup, args.dedup_threshold)
+        except (OSError, ValueError) as e:
+            parser.error(f"invalid --dedup: {e}")
+    
+    if args.shard:
+        if args.seed is None:
+            parser.error("--shard needs --seed; unseeded shards draw from different seeds, so they overlap and cannot be reproduced")
+        if args.type == "post" and not (args.stream or args.format != "json"):
+            parser.error("--shard splits batches, but --type post prints one post; add --stream to shard --count posts")
+        try:
+            index, total = (int(part) for part in args.shard.split("/"))
+            generator = generator.shard(index, total)
+        except ValueError as e:
+            parser.error(f"invalid --shard {args.shard!r}: {e}")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.type == "concept":
+        try:
+            generator.catalog.concept_index.select(args.difficulty, args.duration, args.topic)
+        except ValueError as e:
+            parser.error(str(e))
+    
+    if args.serve:
+        from server import serve
+        serve(generator, args.host, args.port, args.workers, catalog_source, args.reload_interval, tenants)
+        return
+    
+    if args.interactive or not args.type:
+        interactive_mode()
+        return
+    
+    if args.format == "archive" and (args.type != "post" or not args.output):
+        parser.error("--format archive needs --type post and --output")
+    
+    profiler = None
+    if args.profile:
+        from profiling import Profiler, finish_profile
+        profiler = Profiler(sys.modules[__name__], cprofile=args.profile.endswith((".pstats", ".prof")))
+        profiler.enable()
+    try:
+        if args.format == "archive":
+            archive_posts(generator, args)
+        elif args.stream or args.format == "jsonl":
+            try:
+                stream_records(generator, args, history)
+            except ValueError as e:
+                parser.error(str(e))
+        elif args.extend:
+            try:
+                result = extend_calendar_file(generator, args)
+            except (OSError, ValueError, KeyError) as e:
+                parser.error(f"cannot extend {args.extend}: {e}")
+            if history is not None:
+                history.record(generator.catalog, "calendar", result)
+        else:
+            try:
+                result = print_results(generator, args)
+            except ValueError as e:
+                if not args.optimize:
+                    raise
+                parser.error(f"cannot plan the calendar: {e}")
+            if history is not None and args.type in HISTORY_KINDS:
+                history.record(generator.catalog, args.type, [result] if isinstance(result, dict) else result)
+    finally:
+        if profiler is not None:
+            finish_profile(profiler, args.profile)
+        if history is not None:
+            history.close()
+    
+    if args.repeat_state:
+        import json
+        with open(args.repeat_state, 'w') as f:
+            json.dump(generator.repeat_state(), f)
+    if args.dedup:
+        generator.caption_index.save(args.dedup)
+